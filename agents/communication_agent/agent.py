@@ -1,22 +1,18 @@
 import os
-import json
+import sys
+import signal
+import time
+import types
 import logging
 import asyncio
-import nats
-from nats.js.api import ConsumerConfig, DeliverPolicy
-from datetime import datetime
-from crewai import Agent, Task, Crew
-from crewai.llm import LLM
-from crewai.tools import tool
-from crewai import process
+from typing import Optional
+import msgspec
+import yaml
 from dotenv import load_dotenv
-# Import simplified tools manager
-from common.simplified_tools import SimplifiedToolManager
+from common.agent_status import start_agent_status_publishing
 
-# Legacy tools for fallback (if needed)
-from common.tools.notification_tools import NotificationTools
-from common.tools.knowledge_tools import PostmortemTemplateTool, PostmortemGeneratorTool, RunbookUpdateTool
-from common.tools.status_tools import StatusPublisher
+# CrewAI, NATS and the tool modules take seconds to import, so they are imported
+# where first used; the wire types and helpers below stay cheap to import.
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,21 +20,248 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+
+# Wire payloads exchanged with the orchestrator and root cause agent. Frames are
+# msgpack-encoded; JSON frames from components that have not migrated yet are
+# detected by their leading "{" byte and decoded with the same typed schema.
+class Labels(msgspec.Struct, frozen=True):
+    """Alert labels read by the communication agent; other labels are ignored"""
+    alertname: str = "Unknown Alert"
+    service: str = "unknown"
+    # No default here: notifications assume "warning", postmortems "unknown"
+    severity: Optional[str] = None
+
+
+class Annotations(msgspec.Struct, frozen=True):
+    """Alert annotations read by the communication agent"""
+    description: str = "No description provided"
+
+
+class AlertEnvelope(msgspec.Struct, frozen=True):
+    """Alert (or communication task) delivered to the communication agent"""
+    alert_id: str = "unknown"
+    labels: Labels = msgspec.field(default_factory=Labels)
+    annotations: Annotations = msgspec.field(default_factory=Annotations)
+    task_type: str = "notification"
+    root_cause: Optional[str] = None
+    force_llm: bool = False
+    error: Optional[str] = None
+
+
+class RootCauseEnvelope(msgspec.Struct, frozen=True):
+    """Root cause result published by the root cause agent"""
+    alert_id: str = "unknown"
+    root_cause: str = "Unknown root cause"
+
+
+class OrchestratorResponse(msgspec.Struct, omit_defaults=True):
+    """Result published back to the orchestrator"""
+    agent: str
+    sub_function: str
+    alert_id: str
+    timestamp: str
+    result: str = ""
+    postmortem: str = ""
+
+
+# Outbound frames are msgpack unless COMMUNICATION_WIRE_FORMAT=json is set for
+# consumers that still expect JSON
+WIRE_FORMAT = os.environ.get("COMMUNICATION_WIRE_FORMAT", "msgpack").lower()
+
+_ENC = msgspec.json.Encoder() if WIRE_FORMAT == "json" else msgspec.msgpack.Encoder()
+_DEC_ALERT = msgspec.msgpack.Decoder(AlertEnvelope)
+_DEC_ROOT_CAUSE = msgspec.msgpack.Decoder(RootCauseEnvelope)
+_JSON_DEC_ALERT = msgspec.json.Decoder(AlertEnvelope)
+_JSON_DEC_ROOT_CAUSE = msgspec.json.Decoder(RootCauseEnvelope)
+
+ALERT_DATA_RESPONSE_PREFIX = "alert_data_response."
+
+# Tasks running longer than this get a "processing" status before their "completed" one
+STATUS_HEARTBEAT_AFTER = 1.0
+
+# How long a finished task keeps deduplicating late redeliveries of the same alert
+INFLIGHT_RESULT_TTL = 60.0
+
+# Seconds to wait for a result's PubAck before the handler naks for redelivery
+PUBACK_TIMEOUT = 5.0
+
+# Postmortem sections analysed independently before the editor combines them
+POSTMORTEM_SECTIONS = ("technical", "impact", "timeline", "remediation")
+
+# Deterministic notification routing rules, overridable via NOTIFICATION_POLICY_FILE
+DEFAULT_NOTIFICATION_POLICY_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "notification_policy.yaml"
+)
+
+
+def _decode(data, msgpack_decoder, json_decoder):
+    """Decode a NATS payload, falling back to JSON for legacy producers"""
+    if data[:1] == b"{":
+        return json_decoder.decode(data)
+    return msgpack_decoder.decode(data)
+
+
 class CommunicationAgent:
+    # Prompt templates shared by every kickoff; {placeholders} are filled from crew inputs
+    _ALERT_INFO = """
+        ## Alert Information
+        - Alert ID: {alert_id}
+        - Alert Name: {alert_name}
+        - Service: {service}
+        - Severity: {severity}
+        - Description: {description}
+        - Root Cause: {root_cause}
+        """
+    
+    _PRIORITIZATION_PROMPT = """
+            Analyze this alert and determine the appropriate notification strategy:
+            1. Which communication channels should be used (Slack, PagerDuty, WebEx)
+            2. What is the appropriate urgency level
+            3. Who should be notified (engineering, management, customers)
+            4. What is the escalation timeline
+            
+            Base your decisions on the severity level and service impact.
+            Return a JSON object with your recommendations.
+            """
+    
+    _NOTIFICATION_PROMPT = """
+            Based on the prioritization analysis, send appropriate notifications:
+            1. Format messages appropriately for each channel
+            2. For Slack: Use formatting to highlight severity and include key details
+            3. For PagerDuty: Ensure title is clear and actionable for on-call engineers
+            4. For WebEx: Keep concise but informative for management updates
+            
+            Send notifications to the channels recommended by the prioritization analysis.
+            Return a JSON object with the notification results and status.
+            """
+    
+    _INCIDENT_INFO = """
+        ## Incident Information
+        - Incident ID: {alert_id}
+        - Service: {service}
+        - Severity: {severity}
+        - Description: {description}
+        
+        ## Root Cause Analysis
+        {root_cause}
+        """
+    
+    _TECHNICAL_PROMPT = """
+            Analyze the technical aspects of this incident:
+            1. Identify the exact technical root cause and failure mechanisms
+            2. Determine which systems and components were involved
+            3. Explain how the systems failed and interacted during the incident
+            4. Identify any technical debt or system limitations that contributed
+            
+            Format your analysis in markdown format, focusing on technical precision.
+            """
+    
+    _IMPACT_PROMPT = """
+            Analyze the business and user impact of this incident:
+            1. Determine which users or customers were affected and how
+            2. Quantify the impact (e.g., downtime, errors, latency)
+            3. Assess any financial, reputation, or compliance implications
+            4. Identify any customer or stakeholder communications needed
+            
+            Format your analysis in markdown format, focusing on clear impact statements.
+            """
+    
+    _TIMELINE_PROMPT = """
+            Construct a detailed timeline of this incident:
+            1. When the incident began (based on available evidence)
+            2. When it was detected and by what means
+            3. Key actions taken during response
+            4. Resolution timing and verification
+            
+            Present this as a chronological timeline in markdown format.
+            """
+    
+    _REMEDIATION_PROMPT = """
+            Develop a comprehensive remediation and prevention plan:
+            1. Immediate actions needed to prevent recurrence
+            2. Medium-term improvements to increase resilience
+            3. Long-term architectural or process changes
+            4. Specific, actionable follow-up items with suggested owners
+            
+            Format your plan in markdown with clear, actionable items.
+            """
+    
+    _EDITOR_PROMPT = """
+            ## Technical Analysis
+            {technical}
+            
+            ## Impact Analysis
+            {impact}
+            
+            ## Incident Timeline
+            {timeline}
+            
+            ## Remediation Plan
+            {remediation}
+            
+            As the Postmortem Editor, you have received the four analyses above:
+            1. Technical analysis of the root cause
+            2. Business and user impact assessment
+            3. Detailed incident timeline
+            4. Remediation and prevention plan
+            
+            Your job is to compile these into a cohesive, well-structured postmortem document following this outline:
+            1. Executive Summary - A brief overview synthesizing key points from all analyses
+            2. Incident Timeline - From the timeline analysis
+            3. Technical Root Cause - From the technical analysis
+            4. Impact Assessment - From the impact analysis
+            5. Mitigation Steps - Based on the timeline and technical analysis
+            6. Prevention Measures - From the remediation plan
+            7. Lessons Learned - Synthesize insights from all sections
+            8. Action Items - From the remediation plan, organized by priority
+            
+            Format the document in professional Markdown format.
+            """
+    
     def __init__(self, template_dir="/templates", nats_server="nats://nats:4222"):
         # NATS connection parameters
         self.nats_server = nats_server
         self.nats_client = None
         self.js = None  # JetStream context
+        self.status_publisher = None  # Shares the agent's JetStream context once connected
+        
+        # In-flight alert data requests keyed by alert ID
+        self._pending_alerts = {}
+        # (alert_id, task_type) -> Future shared by duplicate deliveries of the same task
+        self._inflight = {}
+        # Second-resolution prefix reused by _get_current_timestamp within the same second
+        self._ts_last_sec = None
+        self._ts_prefix = ""
         
         # Template configuration
         self.template_dir = template_dir
         
+        # Messages fetched per pull and handled concurrently across all consumers
+        self.max_concurrency = int(os.environ.get("COMMUNICATION_MAX_CONCURRENCY", "8"))
+        self._handler_slots = asyncio.Semaphore(self.max_concurrency)
+        # Caps crew kickoffs running on worker threads (and so LLM request rate)
+        self._kickoff_slots = asyncio.Semaphore(self.max_concurrency)
+        self._consumer_tasks = []
+        self._handler_tasks = set()
+        # Set by the signal handlers installed in main() to stop listen()
+        self._shutdown = asyncio.Event()
+        
+        # Seconds to wait for each postmortem section before compiling without it
+        self.postmortem_section_timeout = float(os.environ.get("POSTMORTEM_SECTION_TIMEOUT", "180"))
+        
         # OpenAI API key from environment
         self.openai_api_key = os.environ.get("OPENAI_API_KEY")
         if not self.openai_api_key:
             logger.warning("OPENAI_API_KEY environment variable not set")
         
+        # CrewAI step-by-step logging is costly on short crews; enable with CREWAI_VERBOSE=1
+        self._verbose = os.environ.get("CREWAI_VERBOSE", "0") == "1"
+        
+        from crewai.llm import LLM
+        # Import simplified tools manager
+        from common.simplified_tools import SimplifiedToolManager
+        from common.tools.notification_tools import NotificationTools
+        
         # Initialize OpenAI model
         self.llm = LLM(model=os.environ.get("OPENAI_MODEL", "gpt-4"))
         
@@ -50,11 +273,19 @@ class CommunicationAgent:
         # Initialize legacy tools for fallback if needed
         self._initialize_legacy_tools()
         
+        # Routing rules for alerts that can be notified without the LLM crew, plus the
+        # severities they mention so other severities skip the table entirely
+        self._notification_policy = self._load_notification_policy()
+        self._policy_severities = frozenset(severity for severity, _ in self._notification_policy)
+        
         # Create specialized agents for different aspects of communication
         self._create_communication_agents()
     
     def _initialize_legacy_tools(self):
         """Initialize legacy tools for fallback if simplified tools are unavailable"""
+        from common.tools.notification_tools import NotificationTools
+        from common.tools.knowledge_tools import PostmortemTemplateTool, PostmortemGeneratorTool, RunbookUpdateTool
+        
         # Initialize notification tools
         self.notification_tools = NotificationTools()
         
@@ -63,11 +294,62 @@ class CommunicationAgent:
         self.generator_tool = PostmortemGeneratorTool()
         self.runbook_update_tool = RunbookUpdateTool()
         
-        # Initialize status publisher
-        self.status_publisher = StatusPublisher(nats_server=self.nats_server)
+    def _load_notification_policy(self):
+        """Load (severity, service) -> channels rules for deterministic notification routing
+        
+        Returns a read-only mapping; rules without a severity are skipped.
+        """
+        policy_file = os.environ.get("NOTIFICATION_POLICY_FILE", DEFAULT_NOTIFICATION_POLICY_FILE)
+        try:
+            with open(policy_file) as f:
+                rules = (yaml.safe_load(f) or {}).get("rules", [])
+        except FileNotFoundError:
+            logger.warning(f"Notification policy file {policy_file} not found; all notifications will use the crew")
+            return types.MappingProxyType({})
+        
+        policy = {}
+        for rule in rules:
+            if rule.get("severity") is None:
+                logger.warning(f"Skipping notification policy rule without a severity in {policy_file}: {rule}")
+                continue
+            key = (sys.intern(str(rule["severity"]).lower()), sys.intern(str(rule.get("service", "*"))))
+            policy[key] = tuple(rule.get("channels", ()))
         
+        logger.info(f"Loaded {len(policy)} notification policy rules from {policy_file}")
+        return types.MappingProxyType(policy)
+    
+    def _match_notification_policy(self, severity, service):
+        """Return the channels for a routine alert, or None if the crew should decide"""
+        severity = severity.lower()
+        if severity not in self._policy_severities:
+            return None
+        return self._notification_policy.get((severity, service)) or self._notification_policy.get((severity, "*"))
+    
+    def _send_policy_notification(self, channels, inputs):
+        """Send a notification for a routine alert directly to the policy channels"""
+        title = f"[{inputs['severity'].upper()}] {inputs['alert_name']} on {inputs['service']}"
+        message = (
+            f"{title}\n"
+            f"{inputs['description']}\n"
+            f"Alert ID: {inputs['alert_id']}\n"
+            f"Root Cause: {inputs['root_cause']}"
+        )
+        
+        return self.notification_tools.deliver_multi_channel_notification(
+            message=message,
+            title=title,
+            send_slack="slack" in channels,
+            send_pagerduty="pagerduty" in channels,
+            severity=inputs["severity"],
+            send_webex="webex" in channels
+        )
+    
     def _create_communication_agents(self):
         """Create specialized agents for communication tasks"""
+        from crewai import Agent, Crew, Process
+        
+        # Both agents share the same communication tool bundle
+        self._comm_tools = self.simplified_tools.get_tools_for_agent("communication")
         
         # Comprehensive Notification Manager
         self.notification_manager = Agent(
@@ -84,9 +366,9 @@ class CommunicationAgent:
             **Escalation Management**: Understanding escalation paths based on incident severity, response time requirements, and when to involve different teams or management levels.
             
             **Multi-Channel Coordination**: Managing notifications across multiple platforms to ensure consistent messaging and avoid communication gaps during incidents.""",
-            verbose=True,  # Keep detailed for quality analysis
+            verbose=self._verbose,
             llm=self.llm,
-            tools=self.simplified_tools.get_tools_for_agent("communication")
+            tools=self._comm_tools
         )
         
         # Comprehensive Postmortem Analyst
@@ -104,13 +386,50 @@ class CommunicationAgent:
             **Remediation Planning**: Developing comprehensive action plans to prevent recurrence, including immediate fixes, system improvements, process changes, and monitoring enhancements.
             
             **Document Creation**: Synthesizing complex technical analysis into clear, actionable postmortem documents that serve both technical teams and business stakeholders.""",
-            verbose=True,  # Keep detailed for quality analysis
+            verbose=self._verbose,
             llm=self.llm,
-            tools=self.simplified_tools.get_tools_for_agent("communication")
+            tools=self._comm_tools
+        )
+        
+        # Crews are built once from templated tasks; per-alert details are
+        # supplied through kickoff(inputs=...)
+        self._notification_crew = Crew(
+            agents=[self.notification_manager],
+            tasks=self._create_notification_tasks(),
+            verbose=self._verbose,
+            process=Process.sequential
+        )
+        
+        # The four postmortem sections only depend on the incident details, so
+        # each runs in its own single-task crew (with its own copy of the analyst
+        # so concurrent runs don't share executor state) and the editor crew
+        # combines their outputs
+        self._postmortem_section_analysts = {
+            section: self.postmortem_analyst.copy() for section in POSTMORTEM_SECTIONS
+        }
+        section_tasks, editor_task = self._create_postmortem_tasks()
+        
+        self._postmortem_section_crews = {
+            section: Crew(
+                agents=[self._postmortem_section_analysts[section]],
+                tasks=[task],
+                verbose=self._verbose,
+                process=Process.sequential
+            )
+            for section, task in section_tasks.items()
+        }
+        
+        self._postmortem_editor_crew = Crew(
+            agents=[self.postmortem_analyst],
+            tasks=[editor_task],
+            verbose=self._verbose,
+            process=Process.sequential
         )
     
     async def connect(self):
         """Connect to NATS server and set up JetStream"""
+        import nats
+        
         try:
             # Connect to NATS server
             self.nats_client = await nats.connect(self.nats_server)
@@ -119,11 +438,27 @@ class CommunicationAgent:
             # Create JetStream context
             self.js = self.nats_client.jetstream()
             
-            # Initialize status publisher
-            await self.status_publisher.connect()
+            # Single long-lived subscription that routes alert data responses to
+            # the pending fetch_alert_data request waiting on that alert ID
+            await self.nats_client.subscribe(
+                f"{ALERT_DATA_RESPONSE_PREFIX}*",
+                cb=self._alert_data_cb
+            )
+            
+            # Initialize agent status publisher on this connection
+            try:
+                self.status_publisher = await start_agent_status_publishing(
+                    agent_id="communication-agent",
+                    agent_name="Communication Agent",
+                    js=self.js,
+                    publish_interval=30  # Publish status every 30 seconds
+                )
+                logger.info("[CommunicationAgent] Agent status publishing started")
+            except Exception as e:
+                logger.warning(f"[CommunicationAgent] Failed to start agent status publishing: {e}")
             
             # Publish initial status
-            await self.status_publisher.publish_status("communication", "starting", {
+            await self._publish_status("starting", {
                 "message": "Communication Agent initializing"
             })
             
@@ -133,311 +468,368 @@ class CommunicationAgent:
             logger.error(f"Failed to connect to NATS: {str(e)}")
             raise
     
+    async def _publish_status(self, status, details):
+        """Publish a task status event when status publishing is available"""
+        if self.status_publisher:
+            await self.status_publisher.publish_event(status, details)
+    
+    async def _publish_async(self, subject, payload):
+        """Publish to JetStream and return the PubAck future without waiting on it"""
+        return await self.js.publish_async(subject, payload)
+    
+    async def _single_flight(self, key, work):
+        """Run work() once per key; concurrent and recent duplicates share its result
+        
+        A result is cached for INFLIGHT_RESULT_TTL and redeliveries inside that window
+        are acked without redoing the work, so work() must only return once its
+        results are stored, i.e. after awaiting the PubAcks of its own publishes. A
+        publish failure then raises out of work(), nothing is cached, and the nak'd
+        message is retried in full.
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            logger.info(f"[CommunicationAgent] Reusing in-flight {key[1]} for alert ID: {key[0]}")
+            return await asyncio.shield(future)
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            result = await work()
+        except BaseException as e:
+            # Failures are not cached so a redelivery retries the work
+            self._inflight.pop(key, None)
+            future.set_exception(e if isinstance(e, Exception) else RuntimeError(f"{key[1]} for alert {key[0]} was cancelled"))
+            future.exception()
+            raise
+        
+        future.set_result(result)
+        loop.call_later(INFLIGHT_RESULT_TTL, self._evict_inflight, key, future)
+        return result
+    
+    def _evict_inflight(self, key, future):
+        """Drop a completed single-flight entry once its TTL expires"""
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+    
     def _get_current_timestamp(self):
-        """Get current timestamp in ISO format"""
-        return datetime.utcnow().isoformat() + "Z"
+        """Get current UTC timestamp in ISO format"""
+        seconds, remainder = divmod(time.time_ns(), 1_000_000_000)
+        if seconds != self._ts_last_sec:
+            self._ts_last_sec = seconds
+            self._ts_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        return f"{self._ts_prefix}.{remainder // 1000:06d}Z"
+    
+    async def _alert_data_cb(self, msg):
+        """Resolve the pending fetch_alert_data request for an alert_data_response message"""
+        alert_id = msg.subject[len(ALERT_DATA_RESPONSE_PREFIX):]
+        future = self._pending_alerts.get(alert_id)
+        if future is None or future.done():
+            return
+        try:
+            future.set_result(_decode(msg.data, _DEC_ALERT, _JSON_DEC_ALERT))
+        except Exception as e:
+            future.set_exception(e)
     
     async def fetch_alert_data(self, alert_id):
         """Fetch alert data from the orchestrator"""
         logger.info(f"[CommunicationAgent] Requesting alert data for alert ID: {alert_id}")
         
-        # Request the alert data from the orchestrator
-        request = {"alert_id": alert_id}
-        await self.js.publish("alert_data_request", json.dumps(request).encode())
+        # Register interest before publishing so a fast response is not missed;
+        # concurrent requests for the same alert share the outstanding request
+        future = self._pending_alerts.get(alert_id)
+        owner = future is None
+        if owner:
+            future = asyncio.get_running_loop().create_future()
+            self._pending_alerts[alert_id] = future
         
-        # Create a consumer for the response
-        consumer_config = ConsumerConfig(
-            durable_name=f"communication_alert_data_{alert_id}",
-            deliver_policy=DeliverPolicy.ALL,
-            ack_policy="explicit",
-            filter_subject=f"alert_data_response.{alert_id}"
-        )
-        
-        # Subscribe to get the response
-        sub = await self.js.subscribe(
-            f"alert_data_response.{alert_id}",
-            config=consumer_config
-        )
-        
-        # Wait for the response with a timeout
         try:
-            msg = await asyncio.wait_for(sub.next_msg(), timeout=10.0)
-            alert_data = json.loads(msg.data.decode())
-            await msg.ack()
-            await sub.unsubscribe()
+            if owner:
+                # Request the alert data from the orchestrator
+                await self.js.publish("alert_data_request", _ENC.encode({"alert_id": alert_id}))
+            
+            # Wait for the response with a timeout
+            alert_data = await asyncio.wait_for(asyncio.shield(future), timeout=10.0)
             logger.info(f"[CommunicationAgent] Received alert data for alert ID: {alert_id}")
             return alert_data
         except asyncio.TimeoutError:
             logger.warning(f"[CommunicationAgent] Timeout waiting for alert data for alert ID: {alert_id}")
-            await sub.unsubscribe()
-            return {"alert_id": alert_id, "error": "Timeout waiting for data"}
-    
-    def _create_notification_tasks(self, data):
-        """Create notification tasks for immediate alert processing"""
-        # Extract alert details
-        alert_id = data.get("alert_id", "unknown")
-        alert_name = data.get("labels", {}).get("alertname", "Unknown Alert")
-        service = data.get("labels", {}).get("service", "unknown")
-        severity = data.get("labels", {}).get("severity", "warning")
-        description = data.get("annotations", {}).get("description", "No description provided")
-        
-        # Include any root cause analysis if available
-        root_cause = data.get("root_cause", "Cause unknown - investigation in progress")
-        
-        # Common incident information
-        incident_info = f"""
-        ## Alert Information
-        - Alert ID: {alert_id}
-        - Alert Name: {alert_name}
-        - Service: {service}
-        - Severity: {severity}
-        - Description: {description}
-        - Root Cause: {root_cause}
-        """
+            return AlertEnvelope(alert_id=alert_id, error="Timeout waiting for data")
+        finally:
+            if owner:
+                self._pending_alerts.pop(alert_id, None)
+    
+    def _notification_inputs(self, data):
+        """Build the template inputs for the notification crew"""
+        # Identifiers recur in every task prompt and status update, so keep one copy
+        return {
+            "alert_id": sys.intern(data.alert_id),
+            "alert_name": data.labels.alertname,
+            "service": sys.intern(data.labels.service),
+            "severity": sys.intern(data.labels.severity or "warning"),
+            "description": data.annotations.description,
+            # Include any root cause analysis if available
+            "root_cause": data.root_cause or "Cause unknown - investigation in progress"
+        }
+    
+    def _create_notification_tasks(self):
+        """Create templated notification tasks for immediate alert processing"""
+        from crewai import Task
         
         # Task for alert prioritization
         prioritization_task = Task(
-            description=incident_info + """
-            Analyze this alert and determine the appropriate notification strategy:
-            1. Which communication channels should be used (Slack, PagerDuty, WebEx)
-            2. What is the appropriate urgency level
-            3. Who should be notified (engineering, management, customers)
-            4. What is the escalation timeline
-            
-            Base your decisions on the severity level and service impact.
-            Return a JSON object with your recommendations.
-            """,
-            agent=self.alert_prioritizer,
+            description=f"{self._ALERT_INFO}{self._PRIORITIZATION_PROMPT}",
+            agent=self.notification_manager,
             expected_output="A JSON object with notification strategy recommendations"
         )
         
         # Task for sending notifications
         notification_task = Task(
-            description=incident_info + """
-            Based on the prioritization analysis, send appropriate notifications:
-            1. Format messages appropriately for each channel
-            2. For Slack: Use formatting to highlight severity and include key details
-            3. For PagerDuty: Ensure title is clear and actionable for on-call engineers
-            4. For WebEx: Keep concise but informative for management updates
-            
-            Send notifications to the channels recommended by the Alert Prioritizer.
-            Return a JSON object with the notification results and status.
-            """,
+            description=f"{self._ALERT_INFO}{self._NOTIFICATION_PROMPT}",
             agent=self.notification_manager,
             expected_output="A JSON object with notification results and delivery status"
         )
         
         return [prioritization_task, notification_task]
     
-    def _create_postmortem_tasks(self, root_cause_data, alert_data):
-        """Create specialized postmortem generation tasks"""
-        alert_id = root_cause_data.get("alert_id", "unknown")
-        root_cause = root_cause_data.get("root_cause", "Unknown root cause")
-        
-        # Extract details from alert data
-        service = alert_data.get("labels", {}).get("service", "unknown")
-        severity = alert_data.get("labels", {}).get("severity", "unknown")
-        description = alert_data.get("annotations", {}).get("description", "No description provided")
-        
-        # Common incident information that all agents will use
-        incident_info = f"""
-        ## Incident Information
-        - Incident ID: {alert_id}
-        - Service: {service}
-        - Severity: {severity}
-        - Description: {description}
-        
-        ## Root Cause Analysis
-        {root_cause}
-        """
+    def _postmortem_inputs(self, root_cause_data, alert_data):
+        """Build the template inputs for the postmortem crew"""
+        return {
+            "alert_id": sys.intern(root_cause_data.alert_id),
+            "root_cause": root_cause_data.root_cause or "Unknown root cause",
+            # Extract details from alert data
+            "service": sys.intern(alert_data.labels.service),
+            "severity": sys.intern(alert_data.labels.severity or "unknown"),
+            "description": alert_data.annotations.description
+        }
+    
+    def _create_postmortem_tasks(self):
+        """Create templated postmortem section tasks and the editor task that combines them"""
+        from crewai import Task
         
         # Task for technical analysis
         technical_task = Task(
-            description=incident_info + """
-            Analyze the technical aspects of this incident:
-            1. Identify the exact technical root cause and failure mechanisms
-            2. Determine which systems and components were involved
-            3. Explain how the systems failed and interacted during the incident
-            4. Identify any technical debt or system limitations that contributed
-            
-            Format your analysis in markdown format, focusing on technical precision.
-            """,
-            agent=self.technical_analyst,
+            description=f"{self._INCIDENT_INFO}{self._TECHNICAL_PROMPT}",
+            agent=self._postmortem_section_analysts["technical"],
             expected_output="A technical analysis section for the postmortem"
         )
         
         # Task for impact analysis
         impact_task = Task(
-            description=incident_info + """
-            Analyze the business and user impact of this incident:
-            1. Determine which users or customers were affected and how
-            2. Quantify the impact (e.g., downtime, errors, latency)
-            3. Assess any financial, reputation, or compliance implications
-            4. Identify any customer or stakeholder communications needed
-            
-            Format your analysis in markdown format, focusing on clear impact statements.
-            """,
-            agent=self.impact_analyst,
+            description=f"{self._INCIDENT_INFO}{self._IMPACT_PROMPT}",
+            agent=self._postmortem_section_analysts["impact"],
             expected_output="An impact analysis section for the postmortem"
         )
         
         # Task for timeline construction
         timeline_task = Task(
-            description=incident_info + """
-            Construct a detailed timeline of this incident:
-            1. When the incident began (based on available evidence)
-            2. When it was detected and by what means
-            3. Key actions taken during response
-            4. Resolution timing and verification
-            
-            Present this as a chronological timeline in markdown format.
-            """,
-            agent=self.timeline_constructor,
+            description=f"{self._INCIDENT_INFO}{self._TIMELINE_PROMPT}",
+            agent=self._postmortem_section_analysts["timeline"],
             expected_output="A detailed incident timeline section for the postmortem"
         )
         
         # Task for remediation planning
         remediation_task = Task(
-            description=incident_info + """
-            Develop a comprehensive remediation and prevention plan:
-            1. Immediate actions needed to prevent recurrence
-            2. Medium-term improvements to increase resilience
-            3. Long-term architectural or process changes
-            4. Specific, actionable follow-up items with suggested owners
-            
-            Format your plan in markdown with clear, actionable items.
-            """,
-            agent=self.remediation_planner,
+            description=f"{self._INCIDENT_INFO}{self._REMEDIATION_PROMPT}",
+            agent=self._postmortem_section_analysts["remediation"],
             expected_output="A remediation and prevention plan section for the postmortem"
         )
         
         # Task for final document compilation
         editor_task = Task(
-            description="""
-            As the Postmortem Editor, you will receive analyses from four specialists:
-            1. Technical analysis of the root cause
-            2. Business and user impact assessment
-            3. Detailed incident timeline
-            4. Remediation and prevention plan
-            
-            Your job is to compile these into a cohesive, well-structured postmortem document following this outline:
-            1. Executive Summary - A brief overview synthesizing key points from all analyses
-            2. Incident Timeline - From the timeline constructor
-            3. Technical Root Cause - From the technical analyst
-            4. Impact Assessment - From the impact analyst
-            5. Mitigation Steps - Based on the timeline and technical analysis
-            6. Prevention Measures - From the remediation planner
-            7. Lessons Learned - Synthesize insights from all sections
-            8. Action Items - From the remediation planner, organized by priority
-            
-            Format the document in professional Markdown format.
-            """,
-            agent=self.postmortem_editor,
+            description=f"{self._INCIDENT_INFO}{self._EDITOR_PROMPT}",
+            agent=self.postmortem_analyst,
             expected_output="A complete, well-structured postmortem document"
         )
         
-        return [technical_task, impact_task, timeline_task, remediation_task, editor_task]
+        section_tasks = {
+            "technical": technical_task,
+            "impact": impact_task,
+            "timeline": timeline_task,
+            "remediation": remediation_task
+        }
+        
+        return section_tasks, editor_task
     
-    async def process_notification(self, data):
-        """Process a notification request using multi-agent analysis"""
-        alert_id = data.get("alert_id", "unknown")
-        logger.info(f"[CommunicationAgent] Processing notification for alert: {alert_id}")
+    async def _kickoff(self, crew, inputs):
+        """Run a private copy of a cached crew on a worker thread
+        
+        Crews keep per-run state on their agents and tasks, so concurrent alerts
+        each kick off their own copy rather than sharing the cached instance.
+        
+        Cancelling the caller (e.g. a section timeout) can't stop the worker thread,
+        so the slot is held until the run itself finishes, not until the caller
+        stops waiting.
+        """
+        await self._kickoff_slots.acquire()
+        try:
+            run = asyncio.ensure_future(crew.copy().kickoff_async(inputs=inputs))
+        except BaseException:
+            self._kickoff_slots.release()
+            raise
+        run.add_done_callback(self._release_kickoff_slot)
+        return await asyncio.shield(run)
+    
+    def _release_kickoff_slot(self, run):
+        """Free a kickoff slot once its crew run has finished"""
+        self._kickoff_slots.release()
+        # Retrieve the outcome so runs abandoned by a timeout don't log "never retrieved"
+        if not run.cancelled():
+            run.exception()
+    
+    async def _with_status(self, action, alert_id, coro):
+        """Run coro, publishing one "completed" status with its duration on success
+        
+        A "processing" status is only published as a heartbeat when the work
+        takes longer than STATUS_HEARTBEAT_AFTER, so short paths cost a single
+        status publish.
+        """
+        started = time.monotonic()
+        task = asyncio.ensure_future(coro)
+        try:
+            result = await asyncio.wait_for(asyncio.shield(task), timeout=STATUS_HEARTBEAT_AFTER)
+        except asyncio.TimeoutError:
+            await self._publish_status("processing", {
+                "alert_id": alert_id,
+                "action": action
+            })
+            result = await task
+        except BaseException:
+            task.cancel()
+            raise
         
-        await self.status_publisher.publish_status("communication", "processing", {
+        await self._publish_status("completed", {
             "alert_id": alert_id,
-            "action": "notification"
+            "action": action,
+            "result": "success",
+            "duration_ms": int((time.monotonic() - started) * 1000)
         })
         
-        # Create notification tasks
-        notification_tasks = self._create_notification_tasks(data)
+        return result
+    
+    async def process_notification(self, data):
+        """Process a notification request using multi-agent analysis"""
+        return await self._with_status("notification", data.alert_id, self._process_notification(data))
+    
+    async def _process_notification(self, data):
+        """Send the notification and publish the result to the orchestrator"""
+        alert_id = data.alert_id
+        logger.info(f"[CommunicationAgent] Processing notification for alert: {alert_id}")
         
-        # Create crew with notification agents
-        crew = Crew(
-            agents=[self.alert_prioritizer, self.notification_manager],
-            tasks=notification_tasks,
-            verbose=True,
-            process=process.Sequential()
-        )
+        inputs = self._notification_inputs(data)
+        
+        # Routine alerts covered by the notification policy skip the LLM crew
+        channels = None if data.force_llm else self._match_notification_policy(inputs["severity"], inputs["service"])
         
-        # Execute crew analysis
-        result = crew.kickoff()
+        if channels:
+            logger.info(f"[CommunicationAgent] Routing alert {alert_id} via notification policy to {channels}")
+            result = await asyncio.to_thread(self._send_policy_notification, channels, inputs)
+        else:
+            logger.info(f"[CommunicationAgent] No notification policy for alert {alert_id}; running notification crew")
+            # Execute crew analysis with this alert's details
+            result = await self._kickoff(self._notification_crew, inputs)
         
         # Prepare notification result
-        notification_result = {
-            "agent": "communication",
-            "sub_function": "notification",
-            "alert_id": alert_id,
-            "timestamp": self._get_current_timestamp(),
-            "result": str(result)
-        }
+        notification_result = OrchestratorResponse(
+            agent="communication",
+            sub_function="notification",
+            alert_id=alert_id,
+            timestamp=self._get_current_timestamp(),
+            result=str(result)
+        )
         
-        # Publish result to orchestrator
-        await self.js.publish("orchestrator_response", json.dumps(notification_result).encode())
+        # Publish result to orchestrator and wait for its own PubAck, so the
+        # handler only acks once the result is stored; a missing PubAck raises
+        # and the message is nak'd
+        result_ack = await self._publish_async("orchestrator_response", _ENC.encode(notification_result))
+        await asyncio.wait_for(result_ack, timeout=PUBACK_TIMEOUT)
         logger.info(f"[CommunicationAgent] Published notification result for alert: {alert_id}")
         
-        await self.status_publisher.publish_status("communication", "completed", {
-            "alert_id": alert_id,
-            "action": "notification",
-            "result": "success"
-        })
-        
         return result
     
     async def generate_postmortem(self, root_cause_data, alert_data):
         """Generate a postmortem document using multi-agent analysis"""
-        alert_id = root_cause_data.get("alert_id", "unknown")
+        return await self._with_status(
+            "postmortem", root_cause_data.alert_id, self._generate_postmortem(root_cause_data, alert_data)
+        )
+    
+    async def _generate_postmortem(self, root_cause_data, alert_data):
+        """Run the section analyses concurrently, then compile them into the postmortem"""
+        alert_id = root_cause_data.alert_id
         logger.info(f"[CommunicationAgent] Generating postmortem for alert ID: {alert_id}")
         
-        await self.status_publisher.publish_status("communication", "processing", {
-            "alert_id": alert_id,
-            "action": "postmortem"
-        })
+        inputs = self._postmortem_inputs(root_cause_data, alert_data)
         
-        # Create specialized postmortem tasks
-        postmortem_tasks = self._create_postmortem_tasks(root_cause_data, alert_data)
-        
-        # Create crew with postmortem agents and sequential process
-        crew = Crew(
-            agents=[
-                self.technical_analyst,
-                self.impact_analyst,
-                self.timeline_constructor,
-                self.remediation_planner,
-                self.postmortem_editor
-            ],
-            tasks=postmortem_tasks,
-            verbose=True,
-            process=process.Sequential()
-        )
+        # Run the independent section analyses concurrently; a section that
+        # stalls past the timeout is skipped so the editor can still proceed
+        section_outputs = await asyncio.gather(*(
+            asyncio.wait_for(
+                self._kickoff(self._postmortem_section_crews[section], inputs),
+                timeout=self.postmortem_section_timeout
+            )
+            for section in POSTMORTEM_SECTIONS
+        ), return_exceptions=True)
         
-        # Execute crew analysis
-        result = crew.kickoff()
+        for section, output in zip(POSTMORTEM_SECTIONS, section_outputs):
+            if isinstance(output, Exception):
+                logger.warning(f"[CommunicationAgent] {section} analysis failed for alert ID {alert_id}: {output!r}")
+                inputs[section] = f"The {section} analysis is unavailable for this incident."
+            else:
+                inputs[section] = str(output)
         
-        await self.status_publisher.publish_status("communication", "completed", {
-            "alert_id": alert_id,
-            "action": "postmortem",
-            "result": "success"
-        })
+        # Compile the final document from the section analyses
+        return await self._kickoff(self._postmortem_editor_crew, inputs)
+    
+    async def handle_postmortem(self, root_cause_data):
+        """Fetch the alert, generate its postmortem and publish it to the orchestrator"""
+        alert_id = root_cause_data.alert_id
         
-        return result
+        # Fetch the original alert data
+        alert_data = await self.fetch_alert_data(alert_id)
+        
+        if alert_data.error is not None:
+            logger.error(f"[CommunicationAgent] Failed to get alert data: {alert_data.error}")
+            # Try to proceed with limited data
+            alert_data = AlertEnvelope(alert_id=alert_id)
+        
+        # Generate postmortem based on root cause and alert data
+        postmortem_result = await self.generate_postmortem(root_cause_data, alert_data)
+        
+        # Prepare result for the orchestrator
+        result = OrchestratorResponse(
+            agent="communication",
+            sub_function="postmortem",
+            postmortem=str(postmortem_result),
+            alert_id=alert_id,
+            timestamp=self._get_current_timestamp()
+        )
+        
+        # Publish result to orchestrator and wait for its own PubAck, so the
+        # handler only acks once the result is stored; a missing PubAck raises
+        # and the message is nak'd
+        result_ack = await self._publish_async("orchestrator_response", _ENC.encode(result))
+        await asyncio.wait_for(result_ack, timeout=PUBACK_TIMEOUT)
+        logger.info(f"[CommunicationAgent] Published postmortem for alert ID: {alert_id}")
+        
+        return postmortem_result
     
     async def notification_message_handler(self, msg):
         """Handle incoming NATS messages for notifications"""
         try:
             # Decode the message data
-            data = json.loads(msg.data.decode())
-            alert_id = data.get("alert_id", "unknown")
+            data = _decode(msg.data, _DEC_ALERT, _JSON_DEC_ALERT)
+            alert_id = data.alert_id
             logger.info(f"[CommunicationAgent] Received notification request: {alert_id}")
             
-            # Process the notification
-            await self.process_notification(data)
+            # Process the notification, sharing the run with any duplicate delivery
+            await self._single_flight((alert_id, "notification"), lambda: self.process_notification(data))
             
-            # Acknowledge the message
+            # The result's PubAck was awaited with the work, so the message can be acked
             await msg.ack()
             
         except Exception as e:
             logger.error(f"[CommunicationAgent] Error processing notification message: {str(e)}", exc_info=True)
-            await self.status_publisher.publish_status("communication", "error", {
+            await self._publish_status("error", {
                 "action": "notification",
                 "error": str(e)
             })
@@ -448,40 +840,18 @@ class CommunicationAgent:
         """Handle incoming NATS messages for postmortem generation"""
         try:
             # Parse the incoming message
-            root_cause_data = json.loads(msg.data.decode())
-            alert_id = root_cause_data.get("alert_id", "unknown")
+            root_cause_data = _decode(msg.data, _DEC_ROOT_CAUSE, _JSON_DEC_ROOT_CAUSE)
+            alert_id = root_cause_data.alert_id
             logger.info(f"[CommunicationAgent] Processing postmortem for alert ID: {alert_id}")
             
-            # Fetch the original alert data
-            alert_data = await self.fetch_alert_data(alert_id)
-            
-            if "error" in alert_data:
-                logger.error(f"[CommunicationAgent] Failed to get alert data: {alert_data['error']}")
-                # Try to proceed with limited data
-                alert_data = {"alert_id": alert_id}
-            
-            # Generate postmortem based on root cause and alert data
-            postmortem_result = await self.generate_postmortem(root_cause_data, alert_data)
-            
-            # Prepare result for the orchestrator
-            result = {
-                "agent": "communication",
-                "sub_function": "postmortem",
-                "postmortem": str(postmortem_result),
-                "alert_id": alert_id,
-                "timestamp": self._get_current_timestamp()
-            }
-            
-            # Publish result to orchestrator
-            await self.js.publish("orchestrator_response", json.dumps(result).encode())
-            logger.info(f"[CommunicationAgent] Published postmortem for alert ID: {alert_id}")
+            await self._single_flight((alert_id, "postmortem"), lambda: self.handle_postmortem(root_cause_data))
             
-            # Acknowledge the message
+            # The result's PubAck was awaited with the work, so the message can be acked
             await msg.ack()
             
         except Exception as e:
             logger.error(f"[CommunicationAgent] Error processing postmortem message: {str(e)}", exc_info=True)
-            await self.status_publisher.publish_status("communication", "error", {
+            await self._publish_status("error", {
                 "action": "postmortem",
                 "error": str(e)
             })
@@ -490,125 +860,194 @@ class CommunicationAgent:
     
     async def communication_message_handler(self, msg):
         """Handle incoming NATS messages for the communication agent"""
+        data = None
         try:
             # Parse the incoming message
-            data = json.loads(msg.data.decode())
-            alert_id = data.get("alert_id", "unknown")
-            task_type = data.get("task_type", "notification")  # Default to notification
+            data = _decode(msg.data, _DEC_ALERT, _JSON_DEC_ALERT)
+            alert_id = data.alert_id
+            task_type = data.task_type  # Defaults to notification
             
             logger.info(f"[CommunicationAgent] Processing {task_type} for alert ID: {alert_id}")
             
             if task_type == "notification":
-                await self.process_notification(data)
+                await self._single_flight((alert_id, task_type), lambda: self.process_notification(data))
             elif task_type == "postmortem":
                 # For postmortem, we need root cause data
-                if "root_cause" in data:
-                    root_cause_data = data
-                    alert_data = await self.fetch_alert_data(alert_id)
-                    if "error" in alert_data:
-                        alert_data = {"alert_id": alert_id}
-                    
-                    postmortem_result = await self.generate_postmortem(root_cause_data, alert_data)
-                    
-                    result = {
-                        "agent": "communication",
-                        "sub_function": "postmortem",
-                        "postmortem": str(postmortem_result),
-                        "alert_id": alert_id,
-                        "timestamp": self._get_current_timestamp()
-                    }
-                    
-                    await self.js.publish("orchestrator_response", json.dumps(result).encode())
-                    logger.info(f"[CommunicationAgent] Published postmortem for alert ID: {alert_id}")
+                if data.root_cause is not None:
+                    await self._single_flight((alert_id, task_type), lambda: self.handle_postmortem(data))
                 else:
                     logger.warning(f"[CommunicationAgent] Postmortem task missing root_cause data for alert: {alert_id}")
             else:
                 logger.warning(f"[CommunicationAgent] Unknown task type: {task_type}")
             
-            # Acknowledge the message
+            # The result's PubAck was awaited with the work, so the message can be acked
             await msg.ack()
             
         except Exception as e:
             logger.error(f"[CommunicationAgent] Error processing communication message: {str(e)}", exc_info=True)
-            await self.status_publisher.publish_status("communication", "error", {
-                "alert_id": data.get("alert_id", "unknown"),
+            await self._publish_status("error", {
+                "alert_id": data.alert_id if data is not None else "unknown",
                 "error": str(e)
             })
             # Negative acknowledge the message so it can be redelivered
             await msg.nak()
     
+    def _dispatch(self, handler, msg):
+        """Run a handler in its own task so a long crew run doesn't hold up other messages"""
+        task = asyncio.create_task(self._run_handler(handler, msg))
+        # Keep a reference so the task is not garbage collected while running
+        self._handler_tasks.add(task)
+        task.add_done_callback(self._handler_tasks.discard)
+    
+    async def _run_handler(self, handler, msg):
+        """Run a message handler, then free the concurrency slot taken by _consume"""
+        try:
+            await handler(msg)
+        finally:
+            self._handler_slots.release()
+    
+    async def _consume(self, psub, handler, name):
+        """Fetch batches from a pull consumer and handle each message in its own task"""
+        from nats.errors import TimeoutError as FetchTimeoutError
+        
+        while True:
+            try:
+                msgs = await psub.fetch(batch=self.max_concurrency, timeout=5)
+            except FetchTimeoutError:
+                continue
+            except Exception as e:
+                # Ends this loop; _listen_once notices and listen() reconnects
+                logger.error(f"[CommunicationAgent] Fetching from {name} failed: {str(e)}")
+                raise
+            
+            for msg in msgs:
+                # Slots are shared by all consumers; wait for one rather than
+                # starting more handlers than max_concurrency
+                await self._handler_slots.acquire()
+                self._dispatch(handler, msg)
+    
+    async def _stop_consumers(self):
+        """Cancel the pull consumer loops started by _listen_once()"""
+        for task in self._consumer_tasks:
+            task.cancel()
+        await asyncio.gather(*self._consumer_tasks, return_exceptions=True)
+        self._consumer_tasks = []
+    
     async def listen(self):
-        """Listen for communication requests using NATS JetStream"""
+        """Listen for communication requests using NATS JetStream, reconnecting on failure"""
+        logger.info("[CommunicationAgent] Starting to listen for communication requests")
+        
+        backoff = 1
+        while not self._shutdown.is_set():
+            started = time.monotonic()
+            try:
+                await self._listen_once()
+            except Exception as e:
+                logger.error(f"[CommunicationAgent] Error in listen(): {str(e)}", exc_info=True)
+                await self._close_connection()
+                
+                # Start backing off from scratch if the previous session ran for a while
+                if time.monotonic() - started > 60:
+                    backoff = 1
+                delay = min(backoff, 60)
+                backoff *= 2
+                
+                logger.info(f"[CommunicationAgent] Will retry in {delay} seconds...")
+                try:
+                    # Wake early if shutdown is requested while backing off
+                    await asyncio.wait_for(self._shutdown.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+    
+    async def _listen_once(self):
+        """Connect, consume until shutdown is requested, then shut down cleanly
+        
+        Raises if setup fails or a consumer loop dies, so listen() can reconnect.
+        """
+        from nats.js.api import ConsumerConfig, DeliverPolicy
+        from common.consumers import ensure_durable_consumer
+        
         # Connect to NATS if not already connected
         if not self.nats_client or not self.nats_client.is_connected:
             await self.connect()
         
-        logger.info("[CommunicationAgent] Starting to listen for communication requests")
-        
-        await self.status_publisher.publish_status("communication", "active", {
+        await self._publish_status("active", {
             "message": "Communication Agent listening for requests"
         })
         
-        # Create consumer for consolidated communication agent
-        communication_consumer = ConsumerConfig(
-            durable_name="communication_agent",
-            deliver_policy=DeliverPolicy.ALL,
-            ack_policy="explicit",
-            max_deliver=3
-        )
+        # Pull consumers let the agent fetch a batch of messages per round trip;
+        # each (subject, durable, stream, handler) is served by its own fetch loop.
+        # The durables replace the push consumers of the same name without the
+        # "_pull" suffix, which a pull subscription cannot bind to
+        consumers = [
+            ("communication_agent", "communication_agent_pull", "AGENT_TASKS", self.communication_message_handler),
+            # Notification requests (backward compatibility)
+            ("notification_requests", "communication_notification_pull", None, self.notification_message_handler),
+            # Root cause results for postmortem generation
+            ("root_cause_result", "communication_postmortem_pull", "ROOT_CAUSE", self.postmortem_message_handler),
+        ]
         
-        # Subscribe to the consolidated communication agent stream
-        await self.js.subscribe(
-            "communication_agent",
-            cb=self.communication_message_handler,
-            queue="communication_processors",
-            config=communication_consumer,
-            stream="AGENT_TASKS"
-        )
+        for subject, durable, stream, handler in consumers:
+            config = ConsumerConfig(
+                durable_name=durable,
+                deliver_policy=DeliverPolicy.ALL,
+                ack_policy="explicit",
+                max_deliver=3,
+                max_ack_pending=64
+            )
+            # Applies config changes to an existing durable and migrates from the push consumer
+            stream = await ensure_durable_consumer(
+                self.js, subject, config, stream=stream, legacy_durable=durable.removesuffix("_pull")
+            )
+            psub = await self.js.pull_subscribe(subject, durable=durable, stream=stream)
+            self._consumer_tasks.append(asyncio.create_task(self._consume(psub, handler, subject)))
         
-        # Create consumer for notification requests (backward compatibility)
-        notification_consumer = ConsumerConfig(
-            durable_name="communication_notification",
-            deliver_policy=DeliverPolicy.ALL,
-            ack_policy="explicit",
-            max_deliver=3
-        )
+        logger.info("[CommunicationAgent] Subscribed to communication_agent, notification_requests, and root_cause_result streams")
         
-        # Subscribe to notification requests
-        await self.js.subscribe(
-            "notification_requests",
-            cb=self.notification_message_handler,
-            queue="communication_processors",
-            config=notification_consumer
-        )
+        # Run until a shutdown signal arrives or a consumer loop fails
+        shutdown = asyncio.create_task(self._shutdown.wait())
+        done, _ = await asyncio.wait([shutdown, *self._consumer_tasks], return_when=asyncio.FIRST_COMPLETED)
+        if shutdown not in done:
+            shutdown.cancel()
+            for task in done:
+                task.result()  # Re-raise the consumer failure
+            raise RuntimeError("Communication consumer loop stopped unexpectedly")
         
-        # Create consumer for postmortem requests (from root cause results)
-        postmortem_consumer = ConsumerConfig(
-            durable_name="communication_postmortem",
-            deliver_policy=DeliverPolicy.ALL,
-            ack_policy="explicit",
-            max_deliver=3
-        )
+        # Stop fetching, then let in-flight handlers publish their results and ack
+        logger.info("[CommunicationAgent] Shutting down, waiting for in-flight messages")
+        await self._stop_consumers()
+        await asyncio.gather(*self._handler_tasks, return_exceptions=True)
         
-        # Subscribe to root cause results for postmortem generation
-        await self.js.subscribe(
-            "root_cause_result",
-            cb=self.postmortem_message_handler,
-            queue="communication_processors",
-            config=postmortem_consumer,
-            stream="ROOT_CAUSE"
-        )
+        logger.info("[CommunicationAgent] Draining NATS connection")
+        await self._close_connection()
+    
+    async def _close_connection(self):
+        """Stop consumers and status publishing and drain the NATS connection"""
+        await self._stop_consumers()
         
-        logger.info("[CommunicationAgent] Subscribed to communication_agent, notification_requests, and root_cause_result streams")
+        if self.status_publisher:
+            try:
+                await self.status_publisher.stop_publishing()
+            except Exception as e:
+                logger.warning(f"[CommunicationAgent] Error stopping status publisher: {e}")
+            self.status_publisher = None
         
-        # Keep the connection alive
-        while True:
-            await asyncio.sleep(3600)  # Sleep for an hour, or until interrupted
+        if self.nats_client and not self.nats_client.is_closed:
+            try:
+                await self.nats_client.drain()
+            except Exception as e:
+                logger.warning(f"[CommunicationAgent] Error draining NATS connection: {e}")
+        self.nats_client = None
+        self.js = None
 
 async def main():
     """Main function to run the Communication Agent"""
     agent = CommunicationAgent()
     
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, agent._shutdown.set)
+    loop.add_signal_handler(signal.SIGINT, agent._shutdown.set)
+    
     try:
         await agent.listen()
     except KeyboardInterrupt:
@@ -616,7 +1055,7 @@ async def main():
     except Exception as e:
         logger.error(f"Communication Agent error: {e}")
     finally:
-        if agent.nats_client:
+        if agent.nats_client and not agent.nats_client.is_closed:
             await agent.nats_client.close()
 
 if __name__ == "__main__":
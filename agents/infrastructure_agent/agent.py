@@ -6,10 +6,16 @@ It provides comprehensive infrastructure management including deployment analysi
 automated runbook execution while reducing operational complexity.
 """
 import os
-import json
+import re
+import time
+import hashlib
+import orjson
 import logging
 import asyncio
+import functools
+import concurrent.futures
 import nats
+from collections import OrderedDict
 from nats.js.api import ConsumerConfig, DeliverPolicy
 from datetime import datetime, timezone
 from typing import Any, Dict
@@ -23,6 +29,7 @@ from dotenv import load_dotenv
 from common.simplified_tools import SimplifiedToolManager
 from common.stream_config import get_publish_subject
 from common.agent_status import start_agent_status_publishing
+from common.consumers import ensure_durable_consumer
 
 # Legacy tools for fallback (if needed)
 from common.tools.git_tools import GitTools
@@ -38,6 +45,18 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# Publish subjects, resolved once from the central stream configuration
+ORCHESTRATOR_RESPONSE_SUBJECT = get_publish_subject("orchestrator_response")
+DEPLOYMENTS_SUBJECT_PREFIX = get_publish_subject("deployments") + "."
+RUNBOOK_EXECUTION_SUBJECT = get_publish_subject("runbook_execution") + ".infrastructure"
+
+# Analyses kept for redelivered or duplicate alerts, and how long they stay valid (seconds)
+ANALYSIS_CACHE_SIZE = 512
+ANALYSIS_CACHE_TTL = 300
+
+# Seconds to wait for a result's PubAck before the alert is nak'd for redelivery
+PUBACK_TIMEOUT = 5.0
+
 class InfrastructureAgent:
     """
     Consolidated agent that combines deployment and runbook management.
@@ -47,6 +66,108 @@ class InfrastructureAgent:
     management from deployment analysis to automated remediation.
     """
     
+    # Keywords the issue rules look for, collected in a single pass over the analysis.
+    # The lookahead reports overlapping matches, e.g. "health" inside "unhealthy".
+    _ISSUE_KEYWORDS = re.compile(
+        r"(?=(deployment|failed|error|configuration|mismatch|invalid|rollback|version"
+        r"|conflict|resource|limit|quota|unhealthy|health|failing|sync))"
+    )
+    
+    # (issue, required keyword, keywords of which at least one must also appear), by priority
+    _ISSUE_RULES = (
+        ("Deployment failure detected", "deployment", frozenset({"failed", "error"})),
+        ("Configuration issue identified", "configuration", frozenset({"mismatch", "invalid"})),
+        ("Rollback required", "rollback", frozenset()),
+        ("Version compatibility issue", "version", frozenset({"conflict", "mismatch"})),
+        ("Resource constraint detected", "resource", frozenset({"limit", "quota"})),
+        ("Service health issue", "health", frozenset({"unhealthy", "failing"})),
+        ("ArgoCD sync failure", "sync", frozenset({"failed", "error"})),
+    )
+    
+    # (alert name substring, category), by priority; used when no issue rule matches
+    _ALERT_NAME_RULES = (
+        ("deployment", "Deployment-related alert"),
+        ("config", "Configuration alert"),
+        ("resource", "Resource alert"),
+    )
+    
+    # Task prompts appended to the templated alert context in _create_infrastructure_tasks
+    _DEPLOYMENT_ANALYSIS_PROMPT = """
+            Perform comprehensive deployment analysis:
+            
+            1. Check recent Git changes for the service repository
+            2. Analyze ArgoCD application status and sync history
+            3. Examine Kubernetes deployment configuration and status
+            4. Review deployment events and pod status
+            5. Compare current deployment with previous stable versions
+            6. Identify configuration changes that might have caused issues
+            
+            Focus on:
+            - Recent configuration changes and their impact
+            - Deployment status and health indicators
+            - Resource constraints or misconfigurations
+            - Version compatibility issues
+            - Rollback feasibility and requirements
+            
+            Provide detailed findings about deployment-related causes of the alert.
+            """
+    
+    _CONFIGURATION_ANALYSIS_PROMPT = """
+            Analyze configuration changes and their infrastructure impact:
+            
+            1. Review configuration file changes in recent commits
+            2. Compare current vs previous configuration states
+            3. Identify misconfigurations or invalid settings
+            4. Analyze resource allocation and limits
+            5. Check environment variable and secret configurations
+            
+            Focus on:
+            - Configuration drift from known good states
+            - Resource allocation issues
+            - Environment-specific configuration problems
+            - Dependencies and service configuration mismatches
+            
+            Provide specific configuration issues that could cause the alert.
+            """
+    
+    _RUNBOOK_SEARCH_PROMPT = """
+            After deployment and configuration analysis is complete, search for relevant runbooks:
+            
+            1. Search existing runbooks based on the identified infrastructure issues
+            2. Find runbooks that match the alert type and service
+            3. Prioritize runbooks by relevance to the specific problems found
+            4. Consider runbooks for similar infrastructure issues
+            5. Identify gaps where new runbooks might be needed
+            
+            Based on the deployment and configuration analysis findings, recommend the most appropriate runbooks for remediation.
+            """
+    
+    _RUNBOOK_ADAPTATION_PROMPT = """
+            Based on the deployment analysis and found runbooks, create or adapt runbooks:
+            
+            1. Review the specific infrastructure issues identified
+            2. Adapt existing runbooks for the current context
+            3. Generate custom runbook steps if no suitable runbook exists
+            4. Include specific service, namespace, and configuration details
+            5. Add verification steps to confirm resolution
+            6. Include rollback procedures if needed
+            
+            Create actionable runbook steps tailored to the specific infrastructure problems.
+            """
+    
+    _ORCHESTRATION_PROMPT = """
+            Orchestrate the complete infrastructure response:
+            
+            1. Synthesize findings from deployment and configuration analysis
+            2. Evaluate the severity and urgency of infrastructure issues
+            3. Determine the most appropriate remediation approach
+            4. Coordinate runbook execution if automatic remediation is safe
+            5. Provide comprehensive recommendations for manual intervention if needed
+            6. Establish monitoring criteria for validating resolution
+            
+            Provide a coordinated infrastructure response plan with clear next steps.
+            """
+    
     def __init__(self, 
                  argocd_server="https://argocd-server.argocd:443",
                  git_repo_path="/app/repo",
@@ -58,6 +179,26 @@ class InfrastructureAgent:
         self.nats_client = None
         self.js = None  # JetStream context
         
+        # Caps publishes awaiting a PubAck across all handlers, so a burst of alerts
+        # waits on the server instead of piling up in the client's buffers
+        self._ack_window = int(os.environ.get("INFRA_AGENT_MAX_PENDING_PUBLISHES", "256"))
+        self._publish_slots = asyncio.Semaphore(self._ack_window)
+        
+        # Messages are handled in their own tasks, at most this many at a time
+        self._concurrency_limit = int(os.environ.get("INFRA_AGENT_CONCURRENCY", "8"))
+        self._concurrency = asyncio.Semaphore(self._concurrency_limit)
+        self._handler_tasks = set()
+        self._consumer_tasks = []
+        # Alert fingerprint -> (cached_at, observed issue, analysis, infrastructure data), oldest first
+        self._analysis_cache = OrderedDict()
+        # Set on SIGTERM/SIGINT to stop listen()
+        self._shutdown = asyncio.Event()
+        # Crew kickoffs block on LLM calls, so they run here instead of on the event loop
+        self._crew_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._concurrency_limit,
+            thread_name_prefix="crew"
+        )
+        
         # Infrastructure configuration
         self.argocd_server = argocd_server
         self.git_repo_path = git_repo_path
@@ -68,6 +209,9 @@ class InfrastructureAgent:
         if not self.openai_api_key:
             logger.warning("OPENAI_API_KEY environment variable not set")
         
+        # CrewAI step-by-step logging blocks on stdout for long LLM outputs; enable with CREWAI_VERBOSE=1
+        self._verbose = os.environ.get("CREWAI_VERBOSE", "0") == "1"
+        
         # Initialize OpenAI model
         self.llm = LLM(model=os.environ.get("OPENAI_MODEL", "gpt-4"))
         
@@ -77,33 +221,53 @@ class InfrastructureAgent:
             runbook_tools=RunbookExecutionTool()
         )
         
-        # Initialize legacy tools for fallback if needed
-        self._initialize_legacy_tools()
-        
         # Agent status publisher (will be initialized after NATS connection)
         self.status_publisher = None
         
         # Create specialized analysis agents
         self._create_infrastructure_agents()
+        self._create_crews()
+    
+    # Legacy tools for fallback if simplified tools are unavailable. Each is created on
+    # first use so startup does not pay for clients that may never be needed.
+    
+    # Deployment tools (from deployment_agent)
+    @functools.cached_property
+    def git_tool(self):
+        return GitTools()
     
-    def _initialize_legacy_tools(self):
-        """Initialize legacy tools for fallback if simplified tools are unavailable"""
-        # Deployment tools (from deployment_agent)
-        self.git_tool = GitTools()
-        self.argocd_tool = ArgoCDTools(argocd_api_url=self.argocd_server)
-        self.kube_tool = KubernetesTools()
-        self.deployment_tools = DeploymentTools()
-        
-        # Runbook tools (from runbook_agent)
-        self.jetstream_runbook_source = JetstreamRunbookSource()
-        self.runbook_search_tool = RunbookSearchTool(
+    @functools.cached_property
+    def argocd_tool(self):
+        return ArgoCDTools(argocd_api_url=self.argocd_server)
+    
+    @functools.cached_property
+    def kube_tool(self):
+        return KubernetesTools()
+    
+    @functools.cached_property
+    def deployment_tools(self):
+        return DeploymentTools()
+    
+    # Runbook tools (from runbook_agent)
+    @functools.cached_property
+    def jetstream_runbook_source(self):
+        return JetstreamRunbookSource()
+    
+    @functools.cached_property
+    def runbook_search_tool(self):
+        return RunbookSearchTool(
             runbook_dir=self.runbook_dir,
             additional_sources=[self.jetstream_runbook_source]
         )
-        self.runbook_execution_tool = RunbookExecutionTool()
+    
+    @functools.cached_property
+    def runbook_execution_tool(self):
+        return RunbookExecutionTool()
     
     def _create_infrastructure_agents(self):
         """Create specialized agents for different infrastructure management domains"""
+        # Both agents share the same infrastructure tool bundle
+        infra_tools = self.simplified_tools.get_tools_for_agent("infrastructure")
         
         # === COMPREHENSIVE DEPLOYMENT & CONFIGURATION ANALYST ===
         self.deployment_configuration_analyst = Agent(
@@ -120,11 +284,15 @@ class InfrastructureAgent:
             **Configuration Analysis**: Identifying misconfigurations in deployments, services, ingress, config maps, secrets, and how configuration drift affects system stability.
             
             **Infrastructure Correlation**: Understanding how infrastructure changes, deployment events, and configuration modifications can cascade to cause application-level alerts and incidents.""",
-            verbose=True,  # Keep detailed for quality analysis
+            verbose=self._verbose,
             llm=self.llm,
-            tools=self.simplified_tools.get_tools_for_agent("infrastructure")
+            tools=infra_tools
         )
         
+        # Deployment and configuration analysis run concurrently, so each needs its own agent instance
+        self.configuration_analyst = self.deployment_configuration_analyst.copy()
+        self.configuration_analyst.role = "Infrastructure Configuration Analyst"
+        
         # === COMPREHENSIVE RUNBOOK MANAGER ===
         self.runbook_manager = Agent(
             role="Infrastructure Runbook Manager",
@@ -140,9 +308,9 @@ class InfrastructureAgent:
             **Infrastructure Remediation**: Understanding deployment rollbacks, service restarts, configuration fixes, resource scaling, and other infrastructure remediation techniques.
             
             **Integration with Analysis**: Using deployment and configuration analysis findings to select and customize the most effective remediation approach.""",
-            verbose=True,  # Keep detailed for quality analysis
+            verbose=self._verbose,
             llm=self.llm,
-            tools=self.simplified_tools.get_tools_for_agent("infrastructure")
+            tools=infra_tools
         )
     
     async def connect(self):
@@ -177,156 +345,138 @@ class InfrastructureAgent:
             logger.error(f"[InfrastructureAgent] Failed to connect to NATS: {str(e)}", exc_info=True)
             raise
     
+    async def _publish_async(self, subject, payload):
+        """Publish to JetStream and return the PubAck future without waiting on it
+        
+        Waits for a free slot when _ack_window publishes are already awaiting acks.
+        """
+        slots = self._publish_slots
+        await slots.acquire()
+        try:
+            future = await self.js.publish_async(subject, payload)
+        except BaseException:
+            slots.release()
+            raise
+        # Bound to this semaphore so late acks from a closed connection can't
+        # release slots of the one that replaced it
+        future.add_done_callback(lambda _: slots.release())
+        return future
+    
+    def _log_data_publish_failure(self, ack):
+        """Log a UI data publish that JetStream did not acknowledge"""
+        if not ack.cancelled() and ack.exception() is not None:
+            logger.error(f"[InfrastructureAgent] Error publishing infrastructure data: {str(ack.exception())}")
+    
+    def _alert_fingerprint(self, alert):
+        """Stable fingerprint of an alert, identical across redeliveries of the same alert"""
+        return hashlib.sha1(orjson.dumps({
+            "labels": alert.get("labels", {}),
+            "startsAt": alert.get("startsAt")
+        }, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    
+    def _get_cached_analysis(self, fingerprint):
+        """Return the cached analysis for an alert fingerprint if it has not expired"""
+        entry = self._analysis_cache.get(fingerprint)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > ANALYSIS_CACHE_TTL:
+            del self._analysis_cache[fingerprint]
+            return None
+        return entry[1:]
+    
+    def _cache_analysis(self, fingerprint, observed_issue, analysis, infrastructure_data):
+        """Cache an analysis, evicting the oldest entries beyond ANALYSIS_CACHE_SIZE"""
+        self._analysis_cache[fingerprint] = (time.monotonic(), observed_issue, analysis, infrastructure_data)
+        self._analysis_cache.move_to_end(fingerprint)
+        while len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+            self._analysis_cache.popitem(last=False)
+    
+    def _split_analysis(self, analysis_results):
+        """Split the crew output into per-section analyses for the orchestrator"""
+        # Task outputs follow the task order from _create_infrastructure_tasks
+        outputs = [str(output) for output in getattr(analysis_results, "tasks_output", None) or []]
+        if len(outputs) != 5:
+            return {"combined": str(analysis_results)}
+        
+        deployment, configuration, runbook_search, runbook_adaptation, orchestration = outputs
+        return {
+            "deployment": deployment,
+            "configuration": configuration,
+            "runbooks": f"{runbook_search}\n\n{runbook_adaptation}",
+            "summary": orchestration
+        }
+    
     def _determine_infrastructure_issue(self, alert, analysis_results):
         """Determine the primary infrastructure issue based on analysis results"""
         alert_name = alert.get("labels", {}).get("alertname", "").lower()
         
-        # Combine all analysis results
+        # Combine all analysis results (a single crew output or a dict of outputs)
+        if isinstance(analysis_results, dict):
+            analysis_results = analysis_results.values()
+        else:
+            analysis_results = [analysis_results]
         combined_analysis = "\n".join([
-            str(result) for result in analysis_results.values() if result
+            str(result) for result in analysis_results if result
         ]).lower()
         
         # Priority-based issue classification for infrastructure
-        if "deployment" in combined_analysis and ("failed" in combined_analysis or "error" in combined_analysis):
-            return "Deployment failure detected"
-        elif "configuration" in combined_analysis and ("mismatch" in combined_analysis or "invalid" in combined_analysis):
-            return "Configuration issue identified"
-        elif "rollback" in combined_analysis:
-            return "Rollback required"
-        elif "version" in combined_analysis and ("conflict" in combined_analysis or "mismatch" in combined_analysis):
-            return "Version compatibility issue"
-        elif "resource" in combined_analysis and ("limit" in combined_analysis or "quota" in combined_analysis):
-            return "Resource constraint detected"
-        elif "health" in combined_analysis and ("unhealthy" in combined_analysis or "failing" in combined_analysis):
-            return "Service health issue"
-        elif "sync" in combined_analysis and ("failed" in combined_analysis or "error" in combined_analysis):
-            return "ArgoCD sync failure"
-        else:
-            # Fall back to alert-based categorization
-            if "deployment" in alert_name:
-                return "Deployment-related alert"
-            elif "config" in alert_name:
-                return "Configuration alert"
-            elif "resource" in alert_name:
-                return "Resource alert"
-            else:
-                return "Infrastructure anomaly detected"
-    
-    def _create_infrastructure_tasks(self, alert, context_data=None):
-        """Create comprehensive infrastructure analysis and remediation tasks"""
-        alert_id = alert.get("alert_id", "unknown")
-        alert_name = alert.get("labels", {}).get("alertname", "Unknown Alert")
-        service = alert.get("labels", {}).get("service", "")
-        namespace = alert.get("labels", {}).get("namespace", "default")
+        found = set(self._ISSUE_KEYWORDS.findall(combined_analysis))
+        for issue, required, alternatives in self._ISSUE_RULES:
+            if required in found and (not alternatives or not alternatives.isdisjoint(found)):
+                return issue
         
-        # Base context information
-        base_context = f"""
+        # Fall back to alert-based categorization
+        return next(
+            (category for token, category in self._ALERT_NAME_RULES if token in alert_name),
+            "Infrastructure anomaly detected"
+        )
+    
+    def _create_infrastructure_tasks(self):
+        """Create the templated infrastructure analysis and remediation tasks"""
+        # Base context information, filled from _analysis_inputs at kickoff
+        base_context = """
         Alert: {alert_name} (ID: {alert_id})
         Service: {service}
         Namespace: {namespace}
+        {additional_context}
         """
         
-        if context_data:
-            base_context += f"\nAdditional Context: {json.dumps(context_data, indent=2)}"
-        
         # === DEPLOYMENT ANALYSIS TASK ===
         deployment_analysis_task = Task(
-            description=base_context + """
-            Perform comprehensive deployment analysis:
-            
-            1. Check recent Git changes for the service repository
-            2. Analyze ArgoCD application status and sync history
-            3. Examine Kubernetes deployment configuration and status
-            4. Review deployment events and pod status
-            5. Compare current deployment with previous stable versions
-            6. Identify configuration changes that might have caused issues
-            
-            Focus on:
-            - Recent configuration changes and their impact
-            - Deployment status and health indicators
-            - Resource constraints or misconfigurations
-            - Version compatibility issues
-            - Rollback feasibility and requirements
-            
-            Provide detailed findings about deployment-related causes of the alert.
-            """,
-            agent=self.deployment_analyzer,
-            expected_output="Comprehensive deployment analysis with specific configuration and deployment issues identified"
+            description=base_context + self._DEPLOYMENT_ANALYSIS_PROMPT,
+            agent=self.deployment_configuration_analyst,
+            expected_output="Comprehensive deployment analysis with specific configuration and deployment issues identified",
+            async_execution=True
         )
         
         # === CONFIGURATION ANALYSIS TASK ===
         config_analysis_task = Task(
-            description=base_context + """
-            Analyze configuration changes and their infrastructure impact:
-            
-            1. Review configuration file changes in recent commits
-            2. Compare current vs previous configuration states
-            3. Identify misconfigurations or invalid settings
-            4. Analyze resource allocation and limits
-            5. Check environment variable and secret configurations
-            
-            Focus on:
-            - Configuration drift from known good states
-            - Resource allocation issues
-            - Environment-specific configuration problems
-            - Dependencies and service configuration mismatches
-            
-            Provide specific configuration issues that could cause the alert.
-            """,
+            description=base_context + self._CONFIGURATION_ANALYSIS_PROMPT,
             agent=self.configuration_analyst,
-            expected_output="Detailed configuration analysis with specific misconfigurations identified"
+            expected_output="Detailed configuration analysis with specific misconfigurations identified",
+            async_execution=True
         )
         
         # === RUNBOOK SEARCH TASK ===
         runbook_search_task = Task(
-            description=base_context + """
-            After deployment and configuration analysis is complete, search for relevant runbooks:
-            
-            1. Search existing runbooks based on the identified infrastructure issues
-            2. Find runbooks that match the alert type and service
-            3. Prioritize runbooks by relevance to the specific problems found
-            4. Consider runbooks for similar infrastructure issues
-            5. Identify gaps where new runbooks might be needed
-            
-            Based on the deployment and configuration analysis findings, recommend the most appropriate runbooks for remediation.
-            """,
-            agent=self.runbook_finder,
-            expected_output="List of relevant runbooks with prioritization for the infrastructure issues identified"
+            description=base_context + self._RUNBOOK_SEARCH_PROMPT,
+            agent=self.runbook_manager,
+            expected_output="List of relevant runbooks with prioritization for the infrastructure issues identified",
+            # Waits for both concurrent analysis tasks
+            context=[deployment_analysis_task, config_analysis_task]
         )
         
         # === RUNBOOK ADAPTATION TASK ===
         runbook_adaptation_task = Task(
-            description=base_context + """
-            Based on the deployment analysis and found runbooks, create or adapt runbooks:
-            
-            1. Review the specific infrastructure issues identified
-            2. Adapt existing runbooks for the current context
-            3. Generate custom runbook steps if no suitable runbook exists
-            4. Include specific service, namespace, and configuration details
-            5. Add verification steps to confirm resolution
-            6. Include rollback procedures if needed
-            
-            Create actionable runbook steps tailored to the specific infrastructure problems.
-            """,
-            agent=self.runbook_adapter,
+            description=base_context + self._RUNBOOK_ADAPTATION_PROMPT,
+            agent=self.runbook_manager,
             expected_output="Customized runbook with specific steps for the identified infrastructure issues"
         )
         
         # === ORCHESTRATION TASK ===
         orchestration_task = Task(
-            description=base_context + """
-            Orchestrate the complete infrastructure response:
-            
-            1. Synthesize findings from deployment and configuration analysis
-            2. Evaluate the severity and urgency of infrastructure issues
-            3. Determine the most appropriate remediation approach
-            4. Coordinate runbook execution if automatic remediation is safe
-            5. Provide comprehensive recommendations for manual intervention if needed
-            6. Establish monitoring criteria for validating resolution
-            
-            Provide a coordinated infrastructure response plan with clear next steps.
-            """,
-            agent=self.infrastructure_orchestrator,
+            description=base_context + self._ORCHESTRATION_PROMPT,
+            agent=self.runbook_manager,
             expected_output="Comprehensive infrastructure response plan with prioritized remediation steps"
         )
         
@@ -338,29 +488,81 @@ class InfrastructureAgent:
             orchestration_task
         ]
     
-    async def analyze_infrastructure(self, alert, context_data=None):
-        """Perform comprehensive infrastructure analysis and remediation planning"""
-        logger.info(f"[InfrastructureAgent] Starting infrastructure analysis for alert ID: {alert.get('alert_id', 'unknown')}")
-        
-        # Create comprehensive infrastructure tasks
-        tasks = self._create_infrastructure_tasks(alert, context_data)
-        
-        # Create crew with all infrastructure agents
-        crew = Crew(
+    def _create_runbook_execution_task(self):
+        """Create the templated runbook execution task"""
+        return Task(
+            description="""
+            Execute the following runbook in the infrastructure context:
+            
+            Runbook: {runbook_title}
+            Context: {execution_context}
+            
+            Steps to execute:
+            {runbook_steps}
+            
+            For each step:
+            1. Validate prerequisites and safety conditions
+            2. Execute the step using appropriate infrastructure tools
+            3. Verify the step completed successfully
+            4. Monitor for any adverse effects
+            5. Proceed to next step or abort if issues detected
+            
+            Provide detailed execution results and any issues encountered.
+            """,
+            agent=self.runbook_manager,
+            expected_output="Detailed execution results with success/failure status for each step"
+        )
+    
+    def _create_crews(self):
+        """Build the analysis and runbook execution crews once; per-alert details
+        are supplied through kickoff(inputs=...)"""
+        self._analysis_crew = Crew(
             agents=[
-                self.deployment_analyzer,
+                self.deployment_configuration_analyst,
                 self.configuration_analyst,
-                self.runbook_finder,
-                self.runbook_adapter,
-                self.infrastructure_orchestrator
+                self.runbook_manager
             ],
-            tasks=tasks,
-            verbose=True,
-            process=Process.sequential()  # Run in sequence for coordinated analysis
+            tasks=self._create_infrastructure_tasks(),
+            verbose=self._verbose,
+            # Deployment and configuration analysis run in parallel; the runbook tasks follow in sequence
+            process=Process.sequential
         )
         
+        self._runbook_execution_crew = Crew(
+            agents=[self.runbook_manager],
+            tasks=[self._create_runbook_execution_task()],
+            verbose=self._verbose,
+            process=Process.sequential
+        )
+    
+    def _analysis_inputs(self, alert, context_data=None):
+        """Build the template inputs for the analysis crew"""
+        labels = alert.get("labels", {})
+        return {
+            "alert_id": alert.get("alert_id", "unknown"),
+            "alert_name": labels.get("alertname", "Unknown Alert"),
+            "service": labels.get("service", ""),
+            "namespace": labels.get("namespace", "default"),
+            # Serialized once and shared by every task description
+            "additional_context": f"Additional Context: {orjson.dumps(context_data).decode()}" if context_data else ""
+        }
+    
+    async def _kickoff(self, crew, inputs):
+        """Run a private copy of a cached crew on the crew executor
+        
+        Crews keep per-run state on their agents and tasks, so concurrent alerts
+        each kick off their own copy rather than sharing the cached instance.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self._crew_executor, functools.partial(crew.copy().kickoff, inputs=inputs)
+        )
+    
+    async def analyze_infrastructure(self, alert, context_data=None):
+        """Perform comprehensive infrastructure analysis and remediation planning"""
+        logger.info(f"[InfrastructureAgent] Starting infrastructure analysis for alert ID: {alert.get('alert_id', 'unknown')}")
+        
         # Execute comprehensive analysis
-        results = crew.kickoff()
+        results = await self._kickoff(self._analysis_crew, self._analysis_inputs(alert, context_data))
         
         # Store data in appropriate streams for UI consumption
         await self._publish_infrastructure_data(alert, results)
@@ -380,39 +582,12 @@ class InfrastructureAgent:
         logger.info(f"[InfrastructureAgent] Executing runbook: {runbook_data.get('id', 'unknown')}")
         
         try:
-            # Create runbook execution task
-            execution_task = Task(
-                description=f"""
-                Execute the following runbook in the infrastructure context:
-                
-                Runbook: {runbook_data.get('title', 'Unknown')}
-                Context: {json.dumps(execution_context, indent=2)}
-                
-                Steps to execute:
-                {json.dumps(runbook_data.get('steps', []), indent=2)}
-                
-                For each step:
-                1. Validate prerequisites and safety conditions
-                2. Execute the step using appropriate infrastructure tools
-                3. Verify the step completed successfully
-                4. Monitor for any adverse effects
-                5. Proceed to next step or abort if issues detected
-                
-                Provide detailed execution results and any issues encountered.
-                """,
-                agent=self.runbook_executor,
-                expected_output="Detailed execution results with success/failure status for each step"
-            )
-            
-            # Create execution crew
-            execution_crew = Crew(
-                agents=[self.runbook_executor],
-                tasks=[execution_task],
-                verbose=True
-            )
-            
             # Execute runbook
-            execution_results = execution_crew.kickoff()
+            execution_results = await self._kickoff(self._runbook_execution_crew, {
+                "runbook_title": runbook_data.get("title", "Unknown"),
+                "execution_context": orjson.dumps(execution_context).decode(),
+                "runbook_steps": orjson.dumps(runbook_data.get("steps", [])).decode()
+            })
             
             # Publish execution results
             await self._publish_runbook_execution(runbook_data, execution_context, execution_results)
@@ -428,7 +603,7 @@ class InfrastructureAgent:
         try:
             service = alert.get("labels", {}).get("service", "unknown")
             alert_id = alert.get("alert_id", "unknown")
-            timestamp = datetime.now().isoformat()
+            timestamp = datetime.fromtimestamp(time.time(), tz=timezone.utc).isoformat()
             
             # Publish to DEPLOYMENTS stream
             deployment_data = {
@@ -439,7 +614,9 @@ class InfrastructureAgent:
                 "agent": "infrastructure",
                 "namespace": alert.get("labels", {}).get("namespace", "default")
             }
-            await self.js.publish(f"deployments.{service}", json.dumps(deployment_data).encode())
+            # The UI record is not waited on; a missing PubAck is only logged
+            ack = await self._publish_async(DEPLOYMENTS_SUBJECT_PREFIX + service, orjson.dumps(deployment_data))
+            ack.add_done_callback(self._log_data_publish_failure)
             
             logger.info(f"[InfrastructureAgent] Published infrastructure data for service {service}")
             
@@ -449,27 +626,42 @@ class InfrastructureAgent:
     async def _publish_runbook_execution(self, runbook_data, context, results):
         """Publish runbook execution results to appropriate streams"""
         try:
+            # One clock read for both the record ID and its timestamp
+            now = time.time()
             execution_record = {
-                "id": f"exec-{runbook_data.get('id', 'unknown')}-{int(datetime.now().timestamp())}",
+                "id": f"exec-{runbook_data.get('id', 'unknown')}-{int(now)}",
                 "runbook_id": runbook_data.get("id", "unknown"),
                 "runbook_title": runbook_data.get("title", "Unknown"),
                 "context": context,
                 "results": str(results),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.fromtimestamp(now, tz=timezone.utc).isoformat(),
                 "agent": "infrastructure"
             }
             
-            await self.js.publish("runbook.execution.infrastructure", json.dumps(execution_record).encode())
+            ack = await self._publish_async(RUNBOOK_EXECUTION_SUBJECT, orjson.dumps(execution_record))
+            ack.add_done_callback(self._log_data_publish_failure)
             logger.info(f"[InfrastructureAgent] Published runbook execution results")
             
         except Exception as e:
             logger.error(f"[InfrastructureAgent] Error publishing runbook execution: {str(e)}", exc_info=True)
     
     async def message_handler(self, msg):
+        """Dispatch an incoming NATS message to its own task so delivery is not blocked"""
+        task = asyncio.create_task(self._bounded_handle(msg))
+        # Keep a reference so the task is not garbage collected while running
+        self._handler_tasks.add(task)
+        task.add_done_callback(self._handler_tasks.discard)
+    
+    async def _bounded_handle(self, msg):
+        """Handle a message once a concurrency slot is free"""
+        async with self._concurrency:
+            await self._handle_message(msg)
+    
+    async def _handle_message(self, msg):
         """Handle incoming NATS messages for infrastructure analysis"""
         try:
             # Parse the message data
-            data = json.loads(msg.data.decode())
+            data = orjson.loads(msg.data)
             
             # Handle different message types
             if "alert_id" in data:
@@ -495,30 +687,40 @@ class InfrastructureAgent:
             
             logger.info(f"[InfrastructureAgent] Processing alert: {alert.get('alert_id', 'unknown')}")
             
-            # Perform comprehensive infrastructure analysis
-            analysis_results, infrastructure_data = await self.analyze_infrastructure(alert)
+            # Redelivered or duplicate alerts reuse a recent analysis instead of rerunning the crew
+            fingerprint = self._alert_fingerprint(alert)
+            cached = self._get_cached_analysis(fingerprint)
             
-            # Determine the primary infrastructure issue
-            observed_issue = self._determine_infrastructure_issue(alert, analysis_results)
+            if cached:
+                logger.info(f"[InfrastructureAgent] Reusing cached analysis for alert: {alert.get('alert_id', 'unknown')}")
+                observed_issue, analysis, infrastructure_data = cached
+            else:
+                # Perform comprehensive infrastructure analysis
+                analysis_results, infrastructure_data = await self.analyze_infrastructure(alert)
+                
+                # Determine the primary infrastructure issue
+                observed_issue = self._determine_infrastructure_issue(alert, analysis_results)
+                
+                analysis = self._split_analysis(analysis_results)
+                self._cache_analysis(fingerprint, observed_issue, analysis, infrastructure_data)
             
             # Prepare result for the orchestrator
             result = {
                 "agent": "infrastructure",
                 "observed": observed_issue,
-                "analysis": {
-                    "deployment": str(analysis_results),
-                    "configuration": str(analysis_results),
-                    "runbooks": str(analysis_results)
-                },
+                "analysis": analysis,
                 "alert_id": alert.get("alert_id", "unknown"),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.fromtimestamp(time.time(), tz=timezone.utc).isoformat(),
                 "infrastructure_data": infrastructure_data
             }
             
             logger.info(f"[InfrastructureAgent] Sending analysis for alert ID: {result['alert_id']}")
             
-            # Publish result to orchestrator
-            await self.js.publish(get_publish_subject("orchestrator_response"), json.dumps(result).encode())
+            # Publish result to orchestrator and wait for this publish's own PubAck,
+            # so the message is only acked once the result is stored; a missing PubAck
+            # raises and the message is nak'd
+            result_ack = await self._publish_async(ORCHESTRATOR_RESPONSE_SUBJECT, orjson.dumps(result))
+            await asyncio.wait_for(result_ack, timeout=PUBACK_TIMEOUT)
             logger.info(f"[InfrastructureAgent] Published analysis result for alert ID: {result['alert_id']}")
             
             # Acknowledge the message
@@ -546,78 +748,154 @@ class InfrastructureAgent:
             logger.error(f"[InfrastructureAgent] Error executing runbook: {str(e)}", exc_info=True)
             await msg.nak()
     
+    async def _consume(self, psub):
+        """Fetch message batches from a pull consumer and dispatch each to message_handler"""
+        while True:
+            try:
+                # max_ack_pending caps how many unacked messages the server hands out
+                msgs = await psub.fetch(batch=self._concurrency_limit, timeout=5)
+            except nats.errors.TimeoutError:
+                continue
+            
+            for msg in msgs:
+                await self.message_handler(msg)
+    
+    async def _stop_consumers(self):
+        """Cancel the pull consumer loops started by listen()"""
+        for task in self._consumer_tasks:
+            task.cancel()
+        await asyncio.gather(*self._consumer_tasks, return_exceptions=True)
+        self._consumer_tasks = []
+    
     async def listen(self):
-        """Listen for infrastructure analysis requests and runbook executions"""
+        """Listen for infrastructure analysis requests and runbook executions, reconnecting on failure"""
         logger.info("[InfrastructureAgent] Starting to listen for infrastructure requests")
         
-        try:
-            # Connect to NATS if not already connected
-            if not self.nats_client or not self.nats_client.is_connected:
-                await self.connect()
-            
-            # Create consumer for infrastructure analysis
-            analysis_consumer_config = ConsumerConfig(
-                durable_name="infrastructure_agent",
-                deliver_policy=DeliverPolicy.ALL,
-                ack_policy="explicit",
-                max_deliver=5,  # Retry up to 5 times
-                ack_wait=180,   # Wait 3 minutes for acknowledgment (infrastructure operations can take time)
-            )
-            
-            # Subscribe to infrastructure analysis requests
-            await self.js.subscribe(
-                "infrastructure_agent",  # New consolidated subject
-                cb=self.message_handler,
-                queue="infrastructure_processors",
-                stream="AGENT_TASKS",
-                config=analysis_consumer_config
-            )
-            
-            logger.info("[InfrastructureAgent] Subscribed to infrastructure_agent subject")
-            
-            # Create consumer for runbook execution requests
-            execution_consumer_config = ConsumerConfig(
-                durable_name="infrastructure_runbook_executor",
-                deliver_policy=DeliverPolicy.ALL,
-                ack_policy="explicit",
-                max_deliver=3,  # Retry up to 3 times
-                ack_wait=120,   # Wait 2 minutes for acknowledgment
-            )
-            
-            # Subscribe to runbook execution requests
-            await self.js.subscribe(
-                "runbook.execute.infrastructure",
-                cb=self.message_handler,
-                queue="infrastructure_executors",
-                stream="RUNBOOK_EXECUTIONS",
-                config=execution_consumer_config
-            )
-            
-            logger.info("[InfrastructureAgent] Subscribed to runbook execution requests")
-            
-            # Keep the connection alive
-            while True:
-                await asyncio.sleep(3600)  # Sleep for an hour, or until interrupted
-                logger.info("[InfrastructureAgent] Still listening for infrastructure requests")
+        backoff = 1
+        while not self._shutdown.is_set():
+            started = time.monotonic()
+            try:
+                await self._listen_once()
+            except Exception as e:
+                logger.error(f"[InfrastructureAgent] Error in listen(): {str(e)}", exc_info=True)
+                await self._close_connection()
                 
-        except Exception as e:
-            logger.error(f"[InfrastructureAgent] Error in listen(): {str(e)}", exc_info=True)
-            # Stop status publishing if there's an error
-            if self.status_publisher:
+                # Start backing off from scratch if the previous session ran for a while
+                if time.monotonic() - started > 60:
+                    backoff = 1
+                delay = min(backoff, 60)
+                backoff *= 2
+                
+                logger.info(f"[InfrastructureAgent] Will retry in {delay} seconds...")
                 try:
-                    await self.status_publisher.stop_publishing()
-                    logger.info("[InfrastructureAgent] Agent status publishing stopped")
-                except Exception as pub_e:
-                    logger.warning(f"[InfrastructureAgent] Error stopping status publisher: {pub_e}")
-            # Wait and retry
-            logger.info("[InfrastructureAgent] Will retry in 30 seconds...")
-            await asyncio.sleep(30)
-            # Try calling listen again after delay
-            return await self.listen()
-
-if __name__ == "__main__":
-    async def main():
-        agent = InfrastructureAgent()
-        await agent.listen()
+                    # Wake early if shutdown is requested while backing off
+                    await asyncio.wait_for(self._shutdown.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
     
-    asyncio.run(main())
\ No newline at end of file
+    async def _listen_once(self):
+        """Connect, consume until shutdown is requested, then shut down cleanly
+        
+        Raises if setup fails or a consumer loop dies, so listen() can reconnect.
+        """
+        # Connect to NATS if not already connected
+        if not self.nats_client or not self.nats_client.is_connected:
+            await self.connect()
+        
+        # Create consumer for infrastructure analysis. The "_pull" durables replace the
+        # push consumers of the same name without the suffix, which a pull
+        # subscription cannot bind to
+        analysis_consumer_config = ConsumerConfig(
+            durable_name="infrastructure_agent_pull",
+            deliver_policy=DeliverPolicy.ALL,
+            ack_policy="explicit",
+            max_deliver=5,  # Retry up to 5 times
+            ack_wait=180,   # Wait 3 minutes for acknowledgment (infrastructure operations can take time)
+            max_ack_pending=self._concurrency_limit,  # Only deliver what can be handled concurrently
+        )
+        
+        # Apply config changes to the durable, migrating from the push consumer
+        await ensure_durable_consumer(
+            self.js, "infrastructure_agent", analysis_consumer_config,
+            stream="AGENT_TASKS", legacy_durable="infrastructure_agent"
+        )
+        
+        # Pull infrastructure analysis requests in batches
+        analysis_sub = await self.js.pull_subscribe(
+            "infrastructure_agent",  # New consolidated subject
+            durable="infrastructure_agent_pull",
+            stream="AGENT_TASKS"
+        )
+        self._consumer_tasks.append(asyncio.create_task(self._consume(analysis_sub)))
+        
+        logger.info("[InfrastructureAgent] Subscribed to infrastructure_agent subject")
+        
+        # Create consumer for runbook execution requests
+        execution_consumer_config = ConsumerConfig(
+            durable_name="infrastructure_runbook_executor_pull",
+            deliver_policy=DeliverPolicy.ALL,
+            ack_policy="explicit",
+            max_deliver=3,  # Retry up to 3 times
+            ack_wait=120,   # Wait 2 minutes for acknowledgment
+            max_ack_pending=self._concurrency_limit,  # Only deliver what can be handled concurrently
+        )
+        
+        await ensure_durable_consumer(
+            self.js, "runbook.execute.infrastructure", execution_consumer_config,
+            stream="RUNBOOK_EXECUTIONS", legacy_durable="infrastructure_runbook_executor"
+        )
+        
+        # Pull runbook execution requests in batches
+        execution_sub = await self.js.pull_subscribe(
+            "runbook.execute.infrastructure",
+            durable="infrastructure_runbook_executor_pull",
+            stream="RUNBOOK_EXECUTIONS"
+        )
+        self._consumer_tasks.append(asyncio.create_task(self._consume(execution_sub)))
+        
+        logger.info("[InfrastructureAgent] Subscribed to runbook execution requests")
+        
+        # Run until a shutdown signal arrives or a consumer loop fails
+        shutdown = asyncio.create_task(self._shutdown.wait())
+        done, _ = await asyncio.wait([shutdown, *self._consumer_tasks], return_when=asyncio.FIRST_COMPLETED)
+        if shutdown not in done:
+            shutdown.cancel()
+            for task in done:
+                task.result()  # Re-raise the consumer failure
+            raise RuntimeError("Infrastructure consumer loop stopped unexpectedly")
+        
+        # Stop fetching, then let in-flight handlers publish their results and ack
+        logger.info("[InfrastructureAgent] Shutting down, waiting for in-flight messages")
+        await self._stop_consumers()
+        await asyncio.gather(*self._handler_tasks, return_exceptions=True)
+        
+        logger.info("[InfrastructureAgent] Draining NATS connection")
+        await self._close_connection()
+    
+    async def _close_connection(self):
+        """Stop consumers and status publishing and drain the NATS connection"""
+        await self._stop_consumers()
+        
+        # Stop status publishing
+        if self.status_publisher:
+            try:
+                await self.status_publisher.stop_publishing()
+                logger.info("[InfrastructureAgent] Agent status publishing stopped")
+            except Exception as pub_e:
+                logger.warning(f"[InfrastructureAgent] Error stopping status publisher: {pub_e}")
+            self.status_publisher = None
+        
+        if self.nats_client and not self.nats_client.is_closed:
+            try:
+                await self.nats_client.drain()
+            except Exception as e:
+                logger.warning(f"[InfrastructureAgent] Error draining NATS connection: {e}")
+        self.nats_client = None
+        self.js = None
+        # PubAcks from the closed connection will never arrive
+        self._publish_slots = asyncio.Semaphore(self._ack_window)
+        
+        # The crew executor outlives reconnects and is only shut down with the agent;
+        # queued kickoffs are dropped and running ones finish in the background
+        if self._shutdown.is_set():
+            self._crew_executor.shutdown(wait=False, cancel_futures=True)
@@ -8,14 +8,25 @@ management from deployment analysis to automated runbook execution.
 """
 import asyncio
 import logging
+import logging.handlers
+import queue
 import signal
 import sys
 from agent import InfrastructureAgent
 
-# Configure logging
+# Configure logging. Records are queued and written by a listener thread so that
+# formatting and stderr writes never block the event loop. force=True replaces the
+# handlers installed by basicConfig calls in the modules imported above.
+log_queue = queue.SimpleQueue()
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+log_listener = logging.handlers.QueueListener(log_queue, stream_handler)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    # QueueHandler only merges the args into the message; stream_handler applies the full format
+    format='%(message)s',
+    handlers=[logging.handlers.QueueHandler(log_queue)],
+    force=True
 )
 logger = logging.getLogger(__name__)
 
@@ -25,28 +36,23 @@ class GracefulShutdown:
         self.shutdown = False
         self.agent = None
         
-    def exit_gracefully(self, signum, frame):
+    def exit_gracefully(self, signum):
         logger.info(f"Received signal {signum}, initiating graceful shutdown...")
         self.shutdown = True
         
-        if self.agent and self.agent.status_publisher:
-            try:
-                # Stop status publishing
-                asyncio.create_task(self.agent.status_publisher.stop_publishing())
-                logger.info("Status publishing stopped")
-            except Exception as e:
-                logger.warning(f"Error stopping status publisher: {e}")
-        
-        logger.info("Infrastructure agent shutdown complete")
-        sys.exit(0)
+        # The agent is created before main() first yields to the loop, so it is
+        # always set here. listen() returns once the event is set, after stopping
+        # status publishing and draining the NATS connection
+        self.agent._shutdown.set()
 
 async def main():
     """Main function to run the Infrastructure Agent"""
     
     # Set up graceful shutdown
     shutdown_handler = GracefulShutdown()
-    signal.signal(signal.SIGINT, shutdown_handler.exit_gracefully)
-    signal.signal(signal.SIGTERM, shutdown_handler.exit_gracefully)
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGINT, shutdown_handler.exit_gracefully, signal.SIGINT)
+    loop.add_signal_handler(signal.SIGTERM, shutdown_handler.exit_gracefully, signal.SIGTERM)
     
     logger.info("=== Starting Consolidated Infrastructure Agent ===")
     logger.info("This agent provides unified deployment analysis and runbook execution")
@@ -71,4 +77,16 @@ async def main():
         logger.info("Infrastructure agent stopped")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # uvloop's libuv-based event loop speeds up the NATS I/O paths; fall back to asyncio's if missing
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        logger.info("uvloop not installed, using the default asyncio event loop")
+
+    log_listener.start()
+    try:
+        asyncio.run(main())
+    finally:
+        # Flushes any queued records before the process exits
+        log_listener.stop()
\ No newline at end of file
@@ -5,12 +5,17 @@ This agent combines metric, log, and tracing analysis into a single efficient co
 It provides comprehensive observability data analysis while reducing operational complexity.
 """
 import os
+import re
 import json
+import orjson
 import logging
+import time
 import asyncio
+import functools
+import concurrent.futures
 import nats
-from nats.js.api import ConsumerConfig, DeliverPolicy
-from datetime import datetime, timedelta
+from nats.js.api import AckPolicy, ConsumerConfig, DeliverPolicy
+from datetime import datetime, timedelta, timezone
 from crewai import Agent, Task, Crew
 from crewai.llm import LLM
 from crewai.tools import tool
@@ -21,6 +26,7 @@ from dotenv import load_dotenv
 from common.simplified_tools import SimplifiedToolManager
 from common.stream_config import get_publish_subject
 from common.agent_status import start_agent_status_publishing
+from common.consumers import ensure_durable_consumer
 from common.observability_manager import ObservabilityManager
 
 # Legacy tools for fallback (if needed)
@@ -34,6 +40,19 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# Publish subject, resolved once from the central stream configuration
+ORCHESTRATOR_RESPONSE_SUBJECT = get_publish_subject("orchestrator_response")
+
+# Seconds to wait for a result's PubAck before the alert is nak'd for redelivery
+PUBACK_TIMEOUT = 5.0
+
+# Seconds in-flight analyses get to finish on shutdown; unfinished ones are redelivered
+SHUTDOWN_GRACE_PERIOD = 30
+
+# Analyses longer than this many characters are classified on a worker thread;
+# shorter ones are cheaper to scan inline than to hand off
+CLASSIFY_INLINE_MAX_CHARS = 65536
+
 class ObservabilityAgent:
     """
     Consolidated agent that combines metric, log, and tracing analysis.
@@ -42,6 +61,73 @@ class ObservabilityAgent:
     with a single efficient implementation that can analyze all observability data.
     """
     
+    # Keywords the issue rules look for, collected in a single pass over the analysis.
+    # The lookahead reports overlapping matches, e.g. "oom" inside "room".
+    _ISSUE_KEYWORDS = re.compile(
+        r"(?=(out of memory|oom|cpu|high|saturated|error rate|exception|latency|slow"
+        r"|timeout|bottleneck|dependency))"
+    )
+    
+    # (issue, keywords of which one must appear, keywords of which one must also appear), by priority
+    _ISSUE_RULES = (
+        ("Memory exhaustion detected", frozenset({"out of memory", "oom"}), frozenset()),
+        ("CPU saturation detected", frozenset({"cpu"}), frozenset({"high", "saturated"})),
+        ("Application error increase", frozenset({"error rate", "exception"}), frozenset()),
+        ("Performance degradation", frozenset({"latency", "slow"}), frozenset()),
+        ("Request timeout issues", frozenset({"timeout"}), frozenset()),
+        ("Performance bottleneck identified", frozenset({"bottleneck"}), frozenset()),
+        ("Service dependency failure", frozenset({"dependency"}), frozenset()),
+    )
+    
+    # (alert name substring, category), by priority; used when no issue rule matches
+    _ALERT_NAME_RULES = (
+        ("error", "Error rate alert"),
+        ("latency", "Latency alert"),
+        ("memory", "Memory alert"),
+        ("cpu", "CPU alert"),
+    )
+    
+    # Task prompt appended to the templated alert context in _create_observability_tasks
+    _UNIFIED_ANALYSIS_PROMPT = """
+            Perform comprehensive observability analysis for this incident using all available data sources:
+            
+            **Adaptive Analysis Strategy:**
+            Based on available observability tools, prioritize your analysis:
+            1. If Prometheus is available: Analyze metrics (CPU, memory, request rates, error rates)
+            2. If Loki is available: Analyze logs (errors, performance, operational events)  
+            3. If Tempo is available: Analyze traces (service dependencies, latency patterns)
+            4. If tools are unavailable: Use Kubernetes data and alert information
+            
+            **Multi-Domain Correlation:**
+            1. **Metrics Analysis**: Resource utilization, performance trends, error rates
+            2. **Log Analysis**: Error patterns, exceptions, operational events
+            3. **Trace Analysis**: Service interactions, dependency issues (if available)
+            4. **Cross-Correlation**: Connect findings across all domains
+            
+            **Runbook-Focused Insights:**
+            Provide analysis specifically designed for runbook selection:
+            1. **Issue Classification**: Is this a resource, application, network, or dependency issue?
+            2. **Severity Assessment**: How critical is the impact and how quickly must it be resolved?
+            3. **Remediation Context**: What specific conditions exist that would affect runbook execution?
+            4. **Validation Criteria**: What metrics/logs should be monitored to verify fix success?
+            
+            **Key Questions for Runbook Selection:**
+            - What type of incident is this (performance, error, resource, dependency)?
+            - What specific services/components are affected?
+            - What observable symptoms can guide runbook selection?
+            - What conditions should be met to consider the incident resolved?
+            - Are there any contraindications for automated remediation?
+            
+            **Fallback Analysis:**
+            If observability tools are limited, focus on:
+            - Alert details and severity
+            - Basic Kubernetes pod/service status
+            - Recent deployment or configuration changes
+            - Historical incident patterns
+            
+            Provide actionable analysis that directly supports intelligent runbook selection and execution validation.
+            """
+    
     def __init__(self, 
                  prometheus_url="http://prometheus:9090",
                  loki_url="http://loki:3100", 
@@ -54,6 +140,23 @@ class ObservabilityAgent:
         self.nats_client = None
         self.js = None  # JetStream context
         
+        # Set on SIGTERM/SIGINT to stop listen()
+        self._shutdown = asyncio.Event()
+        
+        # Alerts are handled in their own tasks, at most this many at a time, which
+        # also caps concurrent crew runs and so the load on the LLM API
+        self._concurrency_limit = int(os.environ.get("OBSERVABILITY_AGENT_CONCURRENCY", "8"))
+        self._concurrency = asyncio.Semaphore(self._concurrency_limit)
+        self._handler_tasks = set()
+        # Crew kickoffs block on LLM calls, so they run here instead of on the event loop
+        self._crew_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._concurrency_limit,
+            thread_name_prefix="crew"
+        )
+        # The warm-up is a real, billed completion, so it is opt-in with OBSERVABILITY_LLM_WARMUP=1
+        self._warm_up_llm_enabled = os.environ.get("OBSERVABILITY_LLM_WARMUP", "0") == "1"
+        self._warmup_task = None
+        
         # Observability data source configurations
         self.prometheus_url = prometheus_url
         self.loki_url = loki_url
@@ -80,32 +183,56 @@ class ObservabilityAgent:
             observability_manager=self.observability_manager
         )
         
-        # Initialize legacy tools for fallback if needed
-        self._initialize_legacy_tools()
-        
         # Agent status publisher (will be initialized after NATS connection)
         self.status_publisher = None
         
         # Create specialized analysis agents
         self._create_analysis_agents()
+        self._create_crews()
     
-    def _initialize_legacy_tools(self):
-        """Initialize legacy tools for fallback if simplified tools are unavailable"""
-        # Metric tools (from metric_agent)
-        self.prometheus_tool = PrometheusQueryTool(prometheus_url=self.prometheus_url)
-        self.metric_analysis_tool = MetricAnalysisTool()
-        
-        # Log tools (from log_agent)
-        self.loki_tool = LokiQueryTool(loki_url=self.loki_url)
-        self.pod_log_tool = PodLogTool()
-        self.file_log_tool = FileLogTool()
-        
-        # Tracing tools (from tracing_agent)
-        self.tempo_tools = TempoTools(tempo_url=self.tempo_url)
+    # Legacy tools for fallback if simplified tools are unavailable. Each is created on
+    # first use so startup does not pay for clients that may never be needed.
+    
+    # Metric tools (from metric_agent)
+    @functools.cached_property
+    def prometheus_tool(self):
+        return PrometheusQueryTool(prometheus_url=self.prometheus_url)
+    
+    @functools.cached_property
+    def metric_analysis_tool(self):
+        return MetricAnalysisTool()
+    
+    # Log tools (from log_agent)
+    @functools.cached_property
+    def loki_tool(self):
+        return LokiQueryTool(loki_url=self.loki_url)
+    
+    @functools.cached_property
+    def pod_log_tool(self):
+        return PodLogTool()
+    
+    @functools.cached_property
+    def file_log_tool(self):
+        return FileLogTool()
+    
+    # Tracing tools (from tracing_agent)
+    @functools.cached_property
+    def tempo_tools(self):
+        return TempoTools(tempo_url=self.tempo_url)
     
     def _create_analysis_agents(self):
         """Create single unified observability analyst"""
         
+        # Built per instance so the tool can reach this agent's observability manager;
+        # @tool on the method itself is created without access to self
+        @tool("Analyze an incident using all available observability data")
+        def analyze_comprehensive_incident(incident_data: dict) -> str:
+            """
+            Perform comprehensive incident analysis using all available observability data.
+            This replaces the multiple specialized analysis tools with one intelligent function.
+            """
+            return self._analyze_comprehensive_incident(incident_data)
+        
         # === UNIFIED OBSERVABILITY ANALYST ===
         self.unified_observability_analyst = Agent(
             role="Unified Observability Analyst",
@@ -125,16 +252,12 @@ class ObservabilityAgent:
             llm=self.llm,
             tools=self.simplified_tools.get_tools_for_agent("observability") + [
                 # Add specialized analysis function
-                self._analyze_comprehensive_incident
+                analyze_comprehensive_incident
             ]
         )
     
-    @tool
     def _analyze_comprehensive_incident(self, incident_data: dict) -> str:
-        """
-        Perform comprehensive incident analysis using all available observability data.
-        This replaces the multiple specialized analysis tools with one intelligent function.
-        """
+        """Build the comprehensive incident analysis behind the analyst's incident tool"""
         try:
             # Use the observability manager to get comprehensive context
             context = self.observability_manager.get_comprehensive_incident_context(incident_data)
@@ -170,6 +293,11 @@ class ObservabilityAgent:
             # Create JetStream context
             self.js = self.nats_client.jetstream()
             
+            # Open the LLM connection in the background so the first alert doesn't pay the
+            # TLS handshake; only once, not on every reconnect, and only when enabled
+            if self._warm_up_llm_enabled and self.openai_api_key and self._warmup_task is None:
+                self._warmup_task = asyncio.create_task(self._warm_up_llm())
+            
             # Initialize agent status publisher
             try:
                 self.status_publisher = await start_agent_status_publishing(
@@ -188,56 +316,52 @@ class ObservabilityAgent:
             logger.error(f"[ObservabilityAgent] Failed to connect to NATS: {str(e)}", exc_info=True)
             raise
     
+    async def _warm_up_llm(self):
+        """Send a minimal completion so the LLM client's connection pool is open before the first alert"""
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                self._crew_executor, self.llm.call, [{"role": "user", "content": "Reply with OK."}]
+            )
+            logger.info("[ObservabilityAgent] LLM connection warmed up")
+        except Exception as e:
+            logger.warning(f"[ObservabilityAgent] LLM warm-up failed: {e}")
+    
+    @staticmethod
+    def _analysis_length(analysis_results):
+        """Length of the analysis text the issue classifier scans"""
+        if isinstance(analysis_results, dict):
+            return sum(len(str(result)) for result in analysis_results.values() if result)
+        return len(str(analysis_results)) if analysis_results else 0
+    
     def _determine_observability_issue(self, alert, analysis_results):
         """Determine the primary observability issue based on all analysis results"""
         alert_name = alert.get("labels", {}).get("alertname", "").lower()
         
-        # Combine all analysis results
+        # Combine all analysis results (a single crew output or a dict of outputs)
+        if isinstance(analysis_results, dict):
+            analysis_results = analysis_results.values()
+        else:
+            analysis_results = [analysis_results]
         combined_analysis = "\n".join([
-            str(result) for result in analysis_results.values() if result
+            str(result) for result in analysis_results if result
         ]).lower()
         
         # Priority-based issue classification
-        if "out of memory" in combined_analysis or "oom" in combined_analysis:
-            return "Memory exhaustion detected"
-        elif "cpu" in combined_analysis and ("high" in combined_analysis or "saturated" in combined_analysis):
-            return "CPU saturation detected"
-        elif "error rate" in combined_analysis or "exception" in combined_analysis:
-            return "Application error increase"
-        elif "latency" in combined_analysis or "slow" in combined_analysis:
-            return "Performance degradation"
-        elif "timeout" in combined_analysis:
-            return "Request timeout issues"
-        elif "bottleneck" in combined_analysis:
-            return "Performance bottleneck identified"
-        elif "dependency" in combined_analysis:
-            return "Service dependency failure"
-        else:
-            # Fall back to alert-based categorization
-            if "error" in alert_name:
-                return "Error rate alert"
-            elif "latency" in alert_name:
-                return "Latency alert"
-            elif "memory" in alert_name:
-                return "Memory alert"
-            elif "cpu" in alert_name:
-                return "CPU alert"
-            else:
-                return "Observability anomaly detected"
-    
-    def _create_observability_tasks(self, alert):
-        """Create comprehensive observability analysis tasks"""
-        alert_id = alert.get("alert_id", "unknown")
-        alert_name = alert.get("labels", {}).get("alertname", "Unknown Alert")
-        service = alert.get("labels", {}).get("service", "")
-        namespace = alert.get("labels", {}).get("namespace", "default")
-        pod = alert.get("labels", {}).get("pod", "")
+        found = set(self._ISSUE_KEYWORDS.findall(combined_analysis))
+        for issue, keywords, qualifiers in self._ISSUE_RULES:
+            if not keywords.isdisjoint(found) and (not qualifiers or not qualifiers.isdisjoint(found)):
+                return issue
         
-        # Determine time range - default to 15 min before alert
-        time_range = "-15m"
-        
-        # Base context information that all analyzers will use
-        base_context = f"""
+        # Fall back to alert-based categorization
+        return next(
+            (category for token, category in self._ALERT_NAME_RULES if token in alert_name),
+            "Observability anomaly detected"
+        )
+    
+    def _create_observability_tasks(self):
+        """Create the templated observability analysis tasks"""
+        # Base context information, filled from _analysis_inputs at kickoff
+        base_context = """
         Alert: {alert_name} (ID: {alert_id})
         Service: {service}
         Namespace: {namespace}
@@ -247,129 +371,102 @@ class ObservabilityAgent:
         
         # === UNIFIED OBSERVABILITY ANALYSIS ===
         unified_analysis_task = Task(
-            description=base_context + """
-            Perform comprehensive observability analysis for this incident using all available data sources:
-            
-            **Adaptive Analysis Strategy:**
-            Based on available observability tools, prioritize your analysis:
-            1. If Prometheus is available: Analyze metrics (CPU, memory, request rates, error rates)
-            2. If Loki is available: Analyze logs (errors, performance, operational events)  
-            3. If Tempo is available: Analyze traces (service dependencies, latency patterns)
-            4. If tools are unavailable: Use Kubernetes data and alert information
-            
-            **Multi-Domain Correlation:**
-            1. **Metrics Analysis**: Resource utilization, performance trends, error rates
-            2. **Log Analysis**: Error patterns, exceptions, operational events
-            3. **Trace Analysis**: Service interactions, dependency issues (if available)
-            4. **Cross-Correlation**: Connect findings across all domains
-            
-            **Runbook-Focused Insights:**
-            Provide analysis specifically designed for runbook selection:
-            1. **Issue Classification**: Is this a resource, application, network, or dependency issue?
-            2. **Severity Assessment**: How critical is the impact and how quickly must it be resolved?
-            3. **Remediation Context**: What specific conditions exist that would affect runbook execution?
-            4. **Validation Criteria**: What metrics/logs should be monitored to verify fix success?
-            
-            **Key Questions for Runbook Selection:**
-            - What type of incident is this (performance, error, resource, dependency)?
-            - What specific services/components are affected?
-            - What observable symptoms can guide runbook selection?
-            - What conditions should be met to consider the incident resolved?
-            - Are there any contraindications for automated remediation?
-            
-            **Fallback Analysis:**
-            If observability tools are limited, focus on:
-            - Alert details and severity
-            - Basic Kubernetes pod/service status
-            - Recent deployment or configuration changes
-            - Historical incident patterns
-            
-            Provide actionable analysis that directly supports intelligent runbook selection and execution validation.
-            """,
+            description=base_context + self._UNIFIED_ANALYSIS_PROMPT,
             agent=self.unified_observability_analyst,
             expected_output="Comprehensive observability analysis with issue classification, severity assessment, runbook selection guidance, and validation criteria for incident remediation"
         )
         
         return [unified_analysis_task]
     
+    def _create_crews(self):
+        """Build the analysis crew once; per-alert details are supplied through kickoff(inputs=...)"""
+        self._analysis_crew = Crew(
+            agents=[self.unified_observability_analyst],
+            tasks=self._create_observability_tasks(),
+            verbose=True,
+            process=Process.sequential
+        )
+    
+    def _analysis_inputs(self, alert, labels, time_range):
+        """Build the template inputs for the analysis crew"""
+        return {
+            "alert_id": alert.get("alert_id", "unknown"),
+            "alert_name": labels.get("alertname", "Unknown Alert"),
+            "service": labels.get("service", ""),
+            "namespace": labels.get("namespace", "default"),
+            "pod": labels.get("pod", ""),
+            "time_range": time_range
+        }
+    
+    async def _kickoff(self, crew, inputs):
+        """Run a private copy of a cached crew on the crew executor
+        
+        Crews keep per-run state on their agents and tasks, so concurrent alerts
+        each kick off their own copy rather than sharing the cached instance.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self._crew_executor, functools.partial(crew.copy().kickoff, inputs=inputs)
+        )
+    
     async def analyze_observability_data(self, alert):
         """Perform comprehensive observability analysis using all data sources"""
         logger.info(f"[ObservabilityAgent] Starting comprehensive analysis for alert ID: {alert.get('alert_id', 'unknown')}")
         
-        # Create comprehensive analysis tasks
-        tasks, time_range = self._create_observability_tasks(alert)
-        
-        # Create crew with all analyzers
-        crew = Crew(
-            agents=[
-                self.system_metrics_analyst,
-                self.application_metrics_analyst,
-                self.error_log_analyzer,
-                self.performance_log_analyzer,
-                self.trace_analyzer,
-                self.correlation_analyst
-            ],
-            tasks=tasks,
-            verbose=True,
-            process=Process.sequential()  # Run in sequence to allow correlation
-        )
+        # Looked up once and shared by the crew inputs, the published data and the metadata
+        labels = alert.get("labels") or {}
+        
+        # Determine time range - default to 15 min before alert
+        time_range = "-15m"
         
         # Execute comprehensive analysis
-        results = crew.kickoff()
+        results = await self._kickoff(self._analysis_crew, self._analysis_inputs(alert, labels, time_range))
+        
+        # One UTC timestamp shared by the stream data and the orchestrator result
+        timestamp = datetime.now(timezone.utc).isoformat()
         
         # Store data in appropriate streams for UI consumption
-        await self._publish_observability_data(alert, results, time_range)
+        await self._publish_observability_data(alert, labels, results, time_range, timestamp)
         
         # Collect metadata about what was analyzed
         observability_data = {
             "time_range": time_range,
-            "service": alert.get("labels", {}).get("service", ""),
-            "namespace": alert.get("labels", {}).get("namespace", "default"),
-            "pod": alert.get("labels", {}).get("pod", ""),
-            "data_sources": ["prometheus", "loki", "tempo"]
+            "service": labels.get("service", ""),
+            "namespace": labels.get("namespace", "default"),
+            "pod": labels.get("pod", ""),
+            "data_sources": ["prometheus", "loki", "tempo"],
+            "analyzed_at": timestamp
         }
         
         return results, observability_data
     
-    async def _publish_observability_data(self, alert, analysis_results, time_range):
+    async def _publish_async(self, subject, payload):
+        """Publish to JetStream and return the PubAck future without waiting on it"""
+        return await self.js.publish_async(subject, payload)
+    
+    def _log_data_publish_failure(self, ack):
+        """Log a UI data publish that JetStream did not acknowledge"""
+        if not ack.cancelled() and ack.exception() is not None:
+            logger.error(f"[ObservabilityAgent] Error publishing observability data: {str(ack.exception())}")
+    
+    async def _publish_observability_data(self, alert, labels, analysis_results, time_range, timestamp):
         """Publish observability data to appropriate streams for UI consumption"""
         try:
-            service = alert.get("labels", {}).get("service", "unknown")
+            service = labels.get("service", "unknown")
             alert_id = alert.get("alert_id", "unknown")
-            timestamp = datetime.now().isoformat()
             
-            # Publish to METRICS stream
-            metrics_data = {
+            # The three streams carry the same analysis and differ only in data_source
+            base = {
                 "alert_id": alert_id,
                 "service": service,
                 "timestamp": timestamp,
                 "time_range": time_range,
-                "analysis": str(analysis_results),
-                "data_source": "prometheus"
+                "analysis": str(analysis_results)
             }
-            await self.js.publish(f"metrics.{service}", json.dumps(metrics_data).encode())
             
-            # Publish to LOGS stream  
-            logs_data = {
-                "alert_id": alert_id,
-                "service": service,
-                "timestamp": timestamp,
-                "time_range": time_range,
-                "analysis": str(analysis_results),
-                "data_source": "loki"
-            }
-            await self.js.publish(f"logs.{service}", json.dumps(logs_data).encode())
-            
-            # Publish to TRACES stream
-            traces_data = {
-                "alert_id": alert_id,
-                "service": service,
-                "timestamp": timestamp,
-                "time_range": time_range,
-                "analysis": str(analysis_results),
-                "data_source": "tempo"
-            }
-            await self.js.publish(f"traces.{service}", json.dumps(traces_data).encode())
+            # The UI records are not waited on; a missing PubAck is only logged
+            for subject, data_source in (("metrics", "prometheus"), ("logs", "loki"), ("traces", "tempo")):
+                ack = await self._publish_async(f"{subject}.{service}", orjson.dumps({**base, "data_source": data_source}))
+                ack.add_done_callback(self._log_data_publish_failure)
             
             logger.info(f"[ObservabilityAgent] Published observability data for service {service}")
             
@@ -377,10 +474,22 @@ class ObservabilityAgent:
             logger.error(f"[ObservabilityAgent] Error publishing observability data: {str(e)}", exc_info=True)
     
     async def message_handler(self, msg):
+        """Dispatch an incoming NATS message to its own task so delivery is not blocked"""
+        task = asyncio.create_task(self._bounded_handle(msg))
+        # Keep a reference so the task is not garbage collected while running
+        self._handler_tasks.add(task)
+        task.add_done_callback(self._handler_tasks.discard)
+    
+    async def _bounded_handle(self, msg):
+        """Handle a message once a concurrency slot is free"""
+        async with self._concurrency:
+            await self._handle_message(msg)
+    
+    async def _handle_message(self, msg):
         """Handle incoming NATS messages for observability analysis"""
         try:
             # Parse the alert data
-            alert = json.loads(msg.data.decode())
+            alert = orjson.loads(msg.data)
             
             # Ensure alert_id is set
             if 'alert_id' not in alert and 'id' in alert:
@@ -391,28 +500,33 @@ class ObservabilityAgent:
             # Perform comprehensive observability analysis
             analysis_results, observability_data = await self.analyze_observability_data(alert)
             
-            # Determine the primary observability issue
-            observed_issue = self._determine_observability_issue(alert, analysis_results)
+            # Determine the primary observability issue; only a large crew output is scanned
+            # on a worker thread so it does not hold up the event loop
+            if self._analysis_length(analysis_results) > CLASSIFY_INLINE_MAX_CHARS:
+                observed_issue = await asyncio.to_thread(self._determine_observability_issue, alert, analysis_results)
+            else:
+                observed_issue = self._determine_observability_issue(alert, analysis_results)
             
-            # Prepare consolidated result for the orchestrator
+            # Prepare consolidated result for the orchestrator. The unified analyst covers
+            # every domain in one output, so it is sent once rather than per domain
             result = {
                 "agent": "observability",
                 "observed": observed_issue,
                 "analysis": {
-                    "metrics": str(analysis_results),
-                    "logs": str(analysis_results),
-                    "traces": str(analysis_results),
-                    "correlation": str(analysis_results)
+                    "combined": str(analysis_results)
                 },
                 "alert_id": alert.get("alert_id", "unknown"),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": observability_data["analyzed_at"],
                 "data_sources": observability_data["data_sources"]
             }
             
             logger.info(f"[ObservabilityAgent] Sending analysis for alert ID: {result['alert_id']}")
             
-            # Publish result to orchestrator
-            await self.js.publish(get_publish_subject("orchestrator_response"), json.dumps(result).encode())
+            # Publish result to orchestrator and wait for this publish's own PubAck,
+            # so the message is only acked once the result is stored; a missing PubAck
+            # raises and the message is nak'd
+            result_ack = await self._publish_async(ORCHESTRATOR_RESPONSE_SUBJECT, orjson.dumps(result))
+            await asyncio.wait_for(result_ack, timeout=PUBACK_TIMEOUT)
             logger.info(f"[ObservabilityAgent] Published analysis result for alert ID: {result['alert_id']}")
             
             # Acknowledge the message
@@ -424,57 +538,114 @@ class ObservabilityAgent:
             await msg.nak()
     
     async def listen(self):
-        """Listen for alerts from the orchestrator"""
+        """Listen for alerts from the orchestrator, reconnecting on failure"""
         logger.info("[ObservabilityAgent] Starting to listen for alerts")
         
-        try:
-            # Connect to NATS if not already connected
-            if not self.nats_client or not self.nats_client.is_connected:
-                await self.connect()
-            
-            # Create a durable consumer for observability analysis
-            consumer_config = ConsumerConfig(
-                durable_name="observability_agent",
-                deliver_policy=DeliverPolicy.ALL,
-                ack_policy="explicit",
-                max_deliver=5,  # Retry up to 5 times
-                ack_wait=120,   # Wait 2 minutes for acknowledgment (analysis can take time)
-            )
-            
-            # Subscribe to observability analysis requests
-            await self.js.subscribe(
-                "observability_agent",  # New consolidated subject
-                cb=self.message_handler,
-                queue="observability_processors",
-                stream="AGENT_TASKS",
-                config=consumer_config
-            )
-            
-            logger.info("[ObservabilityAgent] Subscribed to observability_agent subject")
-            
-            # Keep the connection alive
-            while True:
-                await asyncio.sleep(3600)  # Sleep for an hour, or until interrupted
-                logger.info("[ObservabilityAgent] Still listening for observability analysis requests")
+        backoff = 1
+        while not self._shutdown.is_set():
+            started = time.monotonic()
+            try:
+                await self._listen_once()
+            except Exception as e:
+                logger.error(f"[ObservabilityAgent] Error in listen(): {str(e)}", exc_info=True)
+                await self._close_connection()
                 
-        except Exception as e:
-            logger.error(f"[ObservabilityAgent] Error in listen(): {str(e)}", exc_info=True)
-            # Stop status publishing if there's an error
-            if self.status_publisher:
+                # Start backing off from scratch if the previous session ran for a while
+                if time.monotonic() - started > 60:
+                    backoff = 1
+                delay = min(backoff, 60)
+                backoff *= 2
+                
+                logger.info(f"[ObservabilityAgent] Will retry in {delay} seconds...")
                 try:
-                    await self.status_publisher.stop_publishing()
-                    logger.info("[ObservabilityAgent] Agent status publishing stopped")
-                except Exception as pub_e:
-                    logger.warning(f"[ObservabilityAgent] Error stopping status publisher: {pub_e}")
-            # Wait and retry
-            logger.info("[ObservabilityAgent] Will retry in 30 seconds...")
-            await asyncio.sleep(30)
-            # Try calling listen again after delay
-            return await self.listen()
+                    # Wake early if shutdown is requested while backing off
+                    await asyncio.wait_for(self._shutdown.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+    
+    async def _listen_once(self):
+        """Connect, subscribe and wait until shutdown is requested, then shut down cleanly
+        
+        Raises if setup fails, so listen() can reconnect.
+        """
+        # Connect to NATS if not already connected
+        if not self.nats_client or not self.nats_client.is_connected:
+            await self.connect()
+        
+        # Create a durable consumer for observability analysis. A queue subscription
+        # binds to the durable named after its queue, so the consumer carries the
+        # queue name and replaces the former "observability_agent" durable
+        consumer_config = ConsumerConfig(
+            durable_name="observability_processors",
+            deliver_subject=self.nats_client.new_inbox(),
+            deliver_group="observability_processors",
+            deliver_policy=DeliverPolicy.ALL,
+            ack_policy=AckPolicy.EXPLICIT,
+            max_deliver=5,  # Retry up to 5 times
+            ack_wait=120,   # Wait 2 minutes for acknowledgment (analysis can take time)
+            max_ack_pending=self._concurrency_limit,  # Only deliver what can be handled concurrently
+        )
+        
+        # nats-py binds to an existing durable as is, so config changes are applied here
+        await ensure_durable_consumer(
+            self.js, "observability_agent", consumer_config,
+            stream="AGENT_TASKS", legacy_durable="observability_agent"
+        )
+        
+        # Subscribe to observability analysis requests
+        await self.js.subscribe(
+            "observability_agent",  # New consolidated subject
+            cb=self.message_handler,
+            queue="observability_processors",
+            stream="AGENT_TASKS"
+        )
+        
+        logger.info("[ObservabilityAgent] Subscribed to observability_agent subject")
+        
+        # Keep the subscription alive until a shutdown signal arrives
+        await self._shutdown.wait()
+        
+        # Let in-flight handlers publish their results and ack before draining
+        logger.info("[ObservabilityAgent] Shutting down, waiting for in-flight messages")
+        if self._handler_tasks:
+            _, pending = await asyncio.wait(self._handler_tasks, timeout=SHUTDOWN_GRACE_PERIOD)
+            if pending:
+                logger.warning(f"[ObservabilityAgent] {len(pending)} messages still in flight, leaving them for redelivery")
+        
+        logger.info("[ObservabilityAgent] Draining NATS connection")
+        await self._close_connection()
+    
+    async def _close_connection(self):
+        """Stop status publishing and drain the NATS connection"""
+        if self.status_publisher:
+            try:
+                await self.status_publisher.stop_publishing()
+                logger.info("[ObservabilityAgent] Agent status publishing stopped")
+            except Exception as pub_e:
+                logger.warning(f"[ObservabilityAgent] Error stopping status publisher: {pub_e}")
+            self.status_publisher = None
+        
+        if self.nats_client and not self.nats_client.is_closed:
+            try:
+                await self.nats_client.drain()
+            except Exception as e:
+                logger.warning(f"[ObservabilityAgent] Error draining NATS connection: {e}")
+        self.nats_client = None
+        self.js = None
+        
+        # The crew executor outlives reconnects and is only shut down with the agent;
+        # queued kickoffs are dropped and running ones finish in the background
+        if self._shutdown.is_set():
+            self._crew_executor.shutdown(wait=False, cancel_futures=True)
 
 if __name__ == "__main__":
+    import signal
+    
     async def main():
         agent = ObservabilityAgent()
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGTERM, agent._shutdown.set)
+        loop.add_signal_handler(signal.SIGINT, agent._shutdown.set)
         await agent.listen()
     
     asyncio.run(main())
\ No newline at end of file
@@ -24,28 +24,23 @@ class GracefulShutdown:
         self.shutdown = False
         self.agent = None
         
-    def exit_gracefully(self, signum, frame):
+    def exit_gracefully(self, signum):
         logger.info(f"Received signal {signum}, initiating graceful shutdown...")
         self.shutdown = True
         
-        if self.agent and self.agent.status_publisher:
-            try:
-                # Stop status publishing
-                asyncio.create_task(self.agent.status_publisher.stop_publishing())
-                logger.info("Status publishing stopped")
-            except Exception as e:
-                logger.warning(f"Error stopping status publisher: {e}")
-        
-        logger.info("Observability agent shutdown complete")
-        sys.exit(0)
+        # The agent is created before main() first yields to the loop, so it is
+        # always set here. listen() returns once the event is set, after stopping
+        # status publishing and draining the NATS connection
+        self.agent._shutdown.set()
 
 async def main():
     """Main function to run the Observability Agent"""
     
     # Set up graceful shutdown
     shutdown_handler = GracefulShutdown()
-    signal.signal(signal.SIGINT, shutdown_handler.exit_gracefully)
-    signal.signal(signal.SIGTERM, shutdown_handler.exit_gracefully)
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGINT, shutdown_handler.exit_gracefully, signal.SIGINT)
+    loop.add_signal_handler(signal.SIGTERM, shutdown_handler.exit_gracefully, signal.SIGTERM)
     
     logger.info("=== Starting Consolidated Observability Agent ===")
     logger.info("This agent provides unified analysis of metrics, logs, and traces")
@@ -1,5 +1,6 @@
 import asyncio
 import os
+import signal
 import sys
 from dotenv import load_dotenv
 
@@ -8,27 +9,28 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from agents.root_cause_agent.root_cause import RootCauseAgent
 
+async def run(agent):
+    # listen() returns once the shutdown event is set, after in-flight analyses
+    # finish and the NATS connection is drained
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, agent._shutdown.set)
+    loop.add_signal_handler(signal.SIGINT, agent._shutdown.set)
+    await agent.listen()
+
 def main():
     # Load environment variables
     load_dotenv()
-    
+
     # Initialize the root cause agent with env vars or use defaults
     nats_server = os.environ.get("NATS_URL", "nats://localhost:4222")  # Use localhost for local testing
-    
+
     agent = RootCauseAgent(nats_server=nats_server)
-    
+
     print("[RootCauseAgent] Starting root cause agent...")
-    
+
     # Run the async listen method in the event loop
-    loop = asyncio.get_event_loop()
-    try:
-        loop.run_until_complete(agent.listen())
-    except KeyboardInterrupt:
-        print("[RootCauseAgent] Shutting down...")
-    finally:
-        if agent.nats_client and agent.nats_client.is_connected:
-            loop.run_until_complete(agent.nats_client.close())
-        loop.close()
+    asyncio.run(run(agent))
+    print("[RootCauseAgent] Shut down")
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,19 @@
 import os
-import json
+import re
+import orjson
+import msgspec
+import time
+import hashlib
 import logging
 import asyncio
+import functools
+import concurrent.futures
+import httpx
+import litellm
 import nats
+import openai
+from collections import OrderedDict, deque
 from nats.js.api import ConsumerConfig, DeliverPolicy
-from datetime import datetime
 from crewai import Agent, Task, Crew
 from crewai.llm import LLM
 from crewai.tools import tool
@@ -12,6 +21,7 @@ from crewai import Process
 from dotenv import load_dotenv
 from common.tools.root_cause_tools import correlation_analysis, dependency_analysis
 from common.agent_status import start_agent_status_publishing
+from common.consumers import ensure_durable_consumer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,7 +29,150 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# Root cause analyses reused for repeated incidents with identical inputs, and how long they stay valid (seconds)
+ANALYSIS_CACHE_SIZE = 256
+ANALYSIS_CACHE_TTL = 3600
+
+# Recent synthesized root causes shown to the synthesizer per (service, alertname, severity),
+# and how many of those alert classes are remembered
+SYNTHESIS_HISTORY_LENGTH = 3
+SYNTHESIS_HISTORY_CLASSES = 256
+
+# Seconds to wait for a result's PubAck before the message is nak'd for redelivery
+PUBACK_TIMEOUT = 5.0
+
+# root_cause_result frames are msgpack unless ROOT_CAUSE_WIRE_FORMAT=json is set for consumers
+# that still expect JSON. Readers tell JSON frames apart by their leading "{" byte. The
+# rootcause.{service} records stay JSON because the UI reads them directly
+WIRE_FORMAT = os.environ.get("ROOT_CAUSE_WIRE_FORMAT", "msgpack").lower()
+_encode_result = orjson.dumps if WIRE_FORMAT == "json" else msgspec.msgpack.encode
+
 class RootCauseAgent:
+    # Prompt templates shared by every kickoff; {placeholders} are filled from _analysis_inputs.
+    # The alert data goes after each task's static instructions so the prompt prefix (system
+    # prompt, backstory, tools and instructions) is identical across alerts and served from
+    # the provider's prompt cache
+    _DATA_DESCRIPTION = """
+        ## Alert Information
+        - Alert ID: {alert_id}
+        - Alert Name: {alert_name}
+        - Service: {service}
+        - Severity: {severity}
+        - Timestamp: {started_at}
+
+        ## Metric Agent Analysis
+        {metric_analysis}
+
+        ## Log Agent Analysis
+        {log_analysis}
+
+        ## Tracing Agent Analysis
+        {tracing_analysis}
+
+        ## Deployment Agent Analysis
+        {deployment_analysis}
+        """
+
+    # Agent analyses in the incident data: (data key, template input, agent name in
+    # missing_agents, text used when that agent did not respond)
+    _AGENT_ANALYSES = (
+        ("metrics", "metric_analysis", "metric", "No metric data available"),
+        ("logs", "log_analysis", "log", "No log data available"),
+        ("tracing", "tracing_analysis", "tracing", "No tracing data available"),
+        ("deployments", "deployment_analysis", "deployment", "No deployment data available"),
+    )
+
+    _TECHNICAL_SYSTEMS_ANALYSIS_PROMPT = """
+            Based on the data below, analyze for infrastructure, application, and database root causes.
+
+            Infrastructure - focus on:
+            - Hardware or system-level failures
+            - Resource exhaustion (CPU, memory, disk)
+            - Cloud infrastructure issues
+            - Load balancer or proxy problems
+            - Operating system issues
+
+            Application - focus on:
+            - Code bugs or exceptions
+            - Memory leaks or garbage collection issues
+            - Application performance bottlenecks
+            - Runtime configuration problems
+            - Threading or concurrency issues
+
+            Database - focus on:
+            - Slow queries or inefficient database operations
+            - Database locking or blocking issues
+            - Schema or data model problems
+            - Database resource constraints
+            - Connection pool issues
+
+            Return your analysis with:
+            1. Potential causes, grouped by infrastructure, application, and database
+            2. Confidence level for each cause
+            3. Supporting evidence from the data
+            4. Remediation recommendations
+            """
+
+    _NETWORK_ANALYSIS_PROMPT = """
+            Based on the data below, analyze for network-related root causes. Focus on:
+            - Network connectivity failures
+            - DNS resolution issues
+            - Latency or throughput problems
+            - Service mesh or network routing issues
+            - Network security or firewall problems
+
+            Return your analysis with:
+            1. Potential network causes
+            2. Confidence level for each cause
+            3. Supporting evidence from the data
+            4. Remediation recommendations
+            """
+
+    _SYNTHESIS_PROMPT = """
+            Synthesize the analyses from the specialized root cause agents to determine the most likely root cause.
+            Review all evidence and evaluate the confidence levels provided by each specialist.
+
+            Return your final analysis in the following format:
+            1. Identified Root Cause - A clear statement of what caused the incident
+            2. Confidence Level - How confident you are in this assessment (low, medium, high)
+            3. Supporting Evidence - Key data points that support your conclusion
+            4. Recommended Actions - Suggested steps to resolve the issue
+            5. Prevention - How to prevent similar incidents in the future
+
+            ## Recent root causes for this service and alert
+            Use these as a reference for the structure and likely categories of your analysis, not as evidence:
+            {historical_patterns}
+            """
+
+    _ROOT_CAUSE_PROMPT = """
+        Based on the information provided by the specialized agents below, determine the most likely root cause of this incident.
+
+        Return your analysis in the following format:
+        1. Identified Root Cause - A clear statement of what caused the incident
+        2. Confidence Level - How confident you are in this assessment (low, medium, high)
+        3. Supporting Evidence - Key data points that support your conclusion
+        4. Recommended Actions - Suggested steps to resolve the issue
+        5. Prevention - How to prevent similar incidents in the future
+        """
+
+    _PARTIAL_DATA_NOTE = "\n        NOTE: This is partial data. Some agent responses are missing.\n"
+
+    # Confidence mentions, tried in priority order by _parse_confidence. The lookaheads leave
+    # "confidence" unconsumed so a later "confidence: <number>" can still match
+    _CONFIDENCE_RE = re.compile(
+        r'confidence[:\s]+(?P<after>[0-9]+(?:\.[0-9]+)?)'
+        r'|(?P<before>[0-9]+(?:\.[0-9]+)?)(?=\s*%?\s*confidence)'
+        r'|(?P<level>high|medium|low)(?= confidence)',
+        re.IGNORECASE
+    )
+    _CONFIDENCE_RANKS = {"after": 0, "before": 1, "high": 2, "medium": 3, "low": 4}
+    _CONFIDENCE_LEVELS = {"high": 0.9, "medium": 0.7, "low": 0.4}
+
+    # Line markers for the cause, supporting evidence and recommendation
+    _CAUSE_RE = re.compile(r'cause:|identified root cause|primary cause', re.IGNORECASE)
+    _EVIDENCE_RE = re.compile(r'evidence:|supporting evidence|data shows|indicates', re.IGNORECASE)
+    _RECOMMENDATION_RE = re.compile(r'recommendation:|recommended action|suggest|should', re.IGNORECASE)
+
     def __init__(self, nats_server="nats://nats:4222"):
         # NATS connection parameters
         self.nats_server = nats_server
@@ -31,13 +184,67 @@ class RootCauseAgent:
         if not self.openai_api_key:
             logger.warning("OPENAI_API_KEY environment variable not set")
 
-        # Initialize OpenAI model
-        self.llm = LLM(model=os.environ.get("OPENAI_MODEL", "gpt-4"))
+        # CrewAI step-by-step output is written synchronously to stdout; enable with CREWAI_VERBOSE=1
+        self._verbose = os.environ.get("CREWAI_VERBOSE", "0") == "1"
+
+        # Initialize the LLM. A missing key is reported above; requests then fail with
+        # the API's auth error
+        model = os.environ.get("OPENAI_MODEL", "gpt-4")
+        llm_kwargs = {}
+        self._http = None
+        if self._llm_provider(model) == "openai":
+            # All of this agent's OpenAI calls share one keep-alive connection pool.
+            # Otherwise litellm gives each cached OpenAI client its own pool and rebuilds
+            # it, with fresh TCP and TLS handshakes, whenever that client cache expires.
+            # The OpenAI SDK passes its own timeout with every request; this default
+            # matches it for any other caller. httpx still honours the proxy variables
+            self._http = httpx.Client(
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+                timeout=httpx.Timeout(600.0, connect=5.0)
+            )
+            # The client is handed to litellm with each call rather than set process-wide,
+            # so other LLM users in the process keep their own clients. It replaces
+            # litellm's own, so it takes over litellm's OPENAI_API_BASE setting
+            llm_kwargs["client"] = openai.OpenAI(
+                api_key=self.openai_api_key or "",
+                base_url=os.environ.get("OPENAI_API_BASE") or None,
+                http_client=self._http
+            )
+        self.llm = LLM(model=model, **llm_kwargs)
         
         # Agent status publisher (will be initialized after NATS connection)
         self.status_publisher = None
 
-        # Create comprehensive consolidated agents for root cause analysis
+        # Second-resolution prefix reused by _get_current_timestamp within the same second
+        self._ts_last_sec = None
+        self._ts_prefix = ""
+
+        # Caps publishes awaiting a PubAck across all handlers, so a burst of results
+        # waits on the server instead of piling up in the client's buffers
+        self._ack_window = int(os.environ.get("ROOT_CAUSE_AGENT_MAX_PENDING_PUBLISHES", "16"))
+        self._publish_slots = asyncio.Semaphore(self._ack_window)
+
+        # Analysis fingerprint -> (cached_at, analysis text), oldest first
+        self._analysis_cache = OrderedDict()
+        # (service, alertname, severity) -> recent {cause, confidence, evidence}, least recently used first
+        self._synthesis_history = OrderedDict()
+
+        # Crew kickoffs block on LLM calls, so they run here instead of on the event loop
+        self._concurrency_limit = int(os.environ.get("ROOT_CAUSE_AGENT_CONCURRENCY", "4"))
+        self._crew_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._concurrency_limit,
+            thread_name_prefix="crew"
+        )
+        # Caps crew kickoffs in flight (and so the LLM request rate) at the executor size
+        self._kickoff_slots = asyncio.Semaphore(self._concurrency_limit)
+        self._consumer_tasks = []
+        self._handler_tasks = set()
+        # Set on SIGTERM/SIGINT to stop listen()
+        self._shutdown = asyncio.Event()
+
+        # Create comprehensive consolidated agents for root cause analysis. The alert and agent
+        # analyses are already in each task description, so these agents reason over them
+        # directly instead of spending LLM round trips on the correlation/dependency tools
         self.technical_systems_analyzer = Agent(
             role="Technical Systems Analyst",
             goal="Analyze infrastructure, application, database, and system-level issues to identify technical root causes by examining resource constraints, configuration problems, and software failures",
@@ -50,9 +257,8 @@ class RootCauseAgent:
             **Database Analysis**: Analyzing database performance issues, query optimization problems, connection pool exhaustion, locking issues, storage constraints, and data corruption that affect application functionality.
             
             **System Integration**: Understanding how infrastructure, application, and database layers interact and how issues in one layer can cascade to cause failures in others.""",
-            verbose=True,  # Keep detailed for quality analysis
-            llm=self.llm,
-            tools=[correlation_analysis, dependency_analysis]
+            verbose=self._verbose,
+            llm=self.llm
         )
 
         self.network_communication_analyzer = Agent(
@@ -67,9 +273,8 @@ class RootCauseAgent:
             **DNS and Service Discovery**: Identifying DNS resolution failures, service discovery issues, endpoint availability problems, and service registration/deregistration issues.
             
             **Distributed System Patterns**: Understanding how network partitions, latency spikes, and connectivity issues affect distributed system behavior and can cause cascading failures.""",
-            verbose=True,  # Keep detailed for quality analysis
-            llm=self.llm,
-            tools=[correlation_analysis, dependency_analysis]
+            verbose=self._verbose,
+            llm=self.llm
         )
 
         self.root_cause_synthesizer = Agent(
@@ -84,9 +289,8 @@ class RootCauseAgent:
             **Root Cause Determination**: Distinguishing between root causes, contributing factors, and symptoms to identify the primary issue that triggered the incident cascade.
             
             **Confidence Assessment**: Evaluating the strength of evidence and providing confidence levels in root cause determinations based on available data quality and correlation strength.""",
-            verbose=True,  # Keep detailed for quality analysis
-            llm=self.llm,
-            tools=[correlation_analysis, dependency_analysis]
+            verbose=self._verbose,
+            llm=self.llm
         )
 
         # Keep the original root cause analyzer for backward compatibility
@@ -94,11 +298,14 @@ class RootCauseAgent:
             role="Root Cause Analyzer",
             goal="Identify the root cause of system issues by analyzing correlations and dependencies",
             backstory="You are an expert at analyzing system issues and identifying their root causes by examining correlations between events and service dependencies.",
-            verbose=True,
+            verbose=self._verbose,
             llm=self.llm,
             tools=[correlation_analysis, dependency_analysis]
         )
 
+        # Build the analysis crew once; alerts only supply template inputs
+        self._create_crews()
+
     async def connect(self):
         """Connect to NATS server and set up JetStream"""
         try:
@@ -156,195 +363,179 @@ class RootCauseAgent:
             logger.error(f"Failed to connect to NATS: {str(e)}")
             raise
 
-    def _get_current_timestamp(self):
-        """Get current timestamp in ISO format"""
-        return datetime.now(datetime.timezone.utc).isoformat()
-
-    def _create_specialized_root_cause_tasks(self, data):
-        """Create specialized root cause analysis tasks for each analyst"""
-        alert_id = data.get("alert_id", "unknown")
-        alert_data = data.get("alert", {})
-        metric_data = data.get("metrics", {})
-        log_data = data.get("logs", {})
-        tracing_data = data.get("tracing", {})
-        deployment_data = data.get("deployments", {})
-
-        # Check if we're working with partial data
-        partial_data = data.get("partial_data", False)
-        missing_agents = data.get("missing_agents", [])
-
-        # Prepare base data description that all agents will use
-        base_data_description = f"""
-        ## Alert Information
-        - Alert ID: {alert_id}
-        - Alert Name: {alert_data.get('labels', {}).get('alertname', 'Unknown')}
-        - Service: {alert_data.get('labels', {}).get('service', 'Unknown')}
-        - Severity: {alert_data.get('labels', {}).get('severity', 'Unknown')}
-        - Timestamp: {alert_data.get('startsAt', 'Unknown')}
-
-        ## Metric Agent Analysis
-        {metric_data.get('analysis', 'No metric data available' if 'metric' in missing_agents else 'No analysis provided')}
-
-        ## Log Agent Analysis
-        {log_data.get('analysis', 'No log data available' if 'log' in missing_agents else 'No analysis provided')}
-
-        ## Tracing Agent Analysis
-        {tracing_data.get('analysis', 'No tracing data available' if 'tracing' in missing_agents else 'No analysis provided')}
-
-        ## Deployment Agent Analysis
-        {deployment_data.get('analysis', 'No deployment data available' if 'deployment' in missing_agents else 'No analysis provided')}
-        """
-
-        # Infrastructure task
-        infrastructure_task = Task(
-            description=base_data_description + """
-            Based on this data, analyze for infrastructure-related root causes. Focus on:
-            - Hardware or system-level failures
-            - Resource exhaustion (CPU, memory, disk)
-            - Cloud infrastructure issues
-            - Load balancer or proxy problems
-            - Operating system issues
+    @staticmethod
+    def _llm_provider(model):
+        """litellm provider serving model, or None if litellm does not recognise it"""
+        try:
+            return litellm.get_llm_provider(model)[1]
+        except Exception:
+            return None
 
-            Return your analysis with:
-            1. Potential infrastructure causes
-            2. Confidence level for each cause
-            3. Supporting evidence from the data
-            4. Remediation recommendations
-            """,
-            agent=self.infrastructure_analyzer,
-            expected_output="An analysis of potential infrastructure-related root causes"
+    def _get_current_timestamp(self):
+        """Get current UTC timestamp in ISO format"""
+        seconds, remainder = divmod(time.time_ns(), 1_000_000_000)
+        if seconds != self._ts_last_sec:
+            self._ts_last_sec = seconds
+            self._ts_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        return f"{self._ts_prefix}.{remainder // 1000:06d}+00:00"
+
+    def _analysis_fingerprint(self, data):
+        """Fingerprint of everything the crew sees, identical for repeated incidents"""
+        labels = data.get("alert", {}).get("labels", {})
+        return hashlib.sha1(orjson.dumps({
+            "alertname": labels.get("alertname"),
+            "service": labels.get("service"),
+            "severity": labels.get("severity"),
+            "analyses": [data.get(key, {}).get("analysis") for key in ("metrics", "logs", "tracing", "deployments")],
+            "missing_agents": sorted(data.get("missing_agents", []))
+        }, option=orjson.OPT_SORT_KEYS, default=str)).hexdigest()
+
+    def _get_cached_analysis(self, fingerprint):
+        """Return the cached analysis for a fingerprint if it has not expired"""
+        entry = self._analysis_cache.get(fingerprint)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > ANALYSIS_CACHE_TTL:
+            del self._analysis_cache[fingerprint]
+            return None
+        return entry[1]
+
+    def _cache_analysis(self, fingerprint, analysis_text):
+        """Cache an analysis, evicting the oldest entries beyond ANALYSIS_CACHE_SIZE"""
+        self._analysis_cache[fingerprint] = (time.monotonic(), analysis_text)
+        self._analysis_cache.move_to_end(fingerprint)
+        while len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+            self._analysis_cache.popitem(last=False)
+
+    def _create_specialized_root_cause_tasks(self):
+        """Create the templated root cause analysis tasks for the consolidated analysts"""
+        # Technical systems task (infrastructure, application and database)
+        technical_systems_task = Task(
+            description=self._TECHNICAL_SYSTEMS_ANALYSIS_PROMPT + self._DATA_DESCRIPTION,
+            agent=self.technical_systems_analyzer,
+            expected_output="An analysis of potential infrastructure, application, and database root causes",
+            async_execution=True
         )
 
-        # Application task
-        application_task = Task(
-            description=base_data_description + """
-            Based on this data, analyze for application-related root causes. Focus on:
-            - Code bugs or exceptions
-            - Memory leaks or garbage collection issues
-            - Application performance bottlenecks
-            - Runtime configuration problems
-            - Threading or concurrency issues
-
-            Return your analysis with:
-            1. Potential application causes
-            2. Confidence level for each cause
-            3. Supporting evidence from the data
-            4. Remediation recommendations
-            """,
-            agent=self.application_analyzer,
-            expected_output="An analysis of potential application-related root causes"
+        # Network task
+        network_task = Task(
+            description=self._NETWORK_ANALYSIS_PROMPT + self._DATA_DESCRIPTION,
+            agent=self.network_communication_analyzer,
+            expected_output="An analysis of potential network-related root causes",
+            async_execution=True
         )
 
-        # Database task
-        database_task = Task(
-            description=base_data_description + """
-            Based on this data, analyze for database-related root causes. Focus on:
-            - Slow queries or inefficient database operations
-            - Database locking or blocking issues
-            - Schema or data model problems
-            - Database resource constraints
-            - Connection pool issues
-
-            Return your analysis with:
-            1. Potential database causes
-            2. Confidence level for each cause
-            3. Supporting evidence from the data
-            4. Remediation recommendations
-            """,
-            agent=self.database_analyzer,
-            expected_output="An analysis of potential database-related root causes"
+        # Synthesis task
+        synthesis_task = Task(
+            description=self._SYNTHESIS_PROMPT,
+            agent=self.root_cause_synthesizer,
+            expected_output="A comprehensive root cause analysis with recommended actions",
+            # Waits for both concurrent specialist analyses
+            context=[technical_systems_task, network_task]
         )
 
-        # Network task
-        network_task = Task(
-            description=base_data_description + """
-            Based on this data, analyze for network-related root causes. Focus on:
-            - Network connectivity failures
-            - DNS resolution issues
-            - Latency or throughput problems
-            - Service mesh or network routing issues
-            - Network security or firewall problems
+        # Return all specialized tasks
+        return [technical_systems_task, network_task, synthesis_task]
 
-            Return your analysis with:
-            1. Potential network causes
-            2. Confidence level for each cause
-            3. Supporting evidence from the data
-            4. Remediation recommendations
-            """,
-            agent=self.network_analyzer,
-            expected_output="An analysis of potential network-related root causes"
+    def _create_crews(self):
+        """Build the analysis crew once; per-alert details are supplied through kickoff(inputs=...)"""
+        # The specialist tasks are independent and run concurrently; the synthesis
+        # task runs once both of them have finished
+        self._analysis_crew = Crew(
+            agents=[
+                self.technical_systems_analyzer,
+                self.network_communication_analyzer,
+                self.root_cause_synthesizer
+            ],
+            tasks=self._create_specialized_root_cause_tasks(),
+            verbose=self._verbose,
+            process=Process.sequential
         )
 
-        # Manager task (synthesize results)
-        manager_task = Task(
-            description="""
-            Synthesize the analyses from the specialized root cause agents to determine the most likely root cause.
-            Review all evidence and evaluate the confidence levels provided by each specialist.
-
-            Return your final analysis in the following format:
-            1. Identified Root Cause - A clear statement of what caused the incident
-            2. Confidence Level - How confident you are in this assessment (low, medium, high)
-            3. Supporting Evidence - Key data points that support your conclusion
-            4. Recommended Actions - Suggested steps to resolve the issue
-            5. Prevention - How to prevent similar incidents in the future
-            """,
-            agent=self.root_cause_manager,
-            expected_output="A comprehensive root cause analysis with recommended actions"
+    def _alert_class(self, data):
+        """(service, alertname, severity) of an incident, the key for its synthesis history"""
+        labels = data.get("alert", {}).get("labels", {})
+        return (
+            labels.get("service", "Unknown"),
+            labels.get("alertname", "Unknown"),
+            labels.get("severity", "Unknown")
         )
 
-        # Return all specialized tasks
-        return [infrastructure_task, application_task, database_task, network_task, manager_task]
+    def _historical_patterns(self, alert_class):
+        """Recent synthesized root causes for an alert class, as compact JSON"""
+        history = self._synthesis_history.get(alert_class)
+        if not history:
+            return "None recorded yet"
+        return orjson.dumps(list(history)).decode()
+
+    def _record_synthesis(self, alert_class, analysis_text):
+        """Remember a synthesized root cause, evicting the least recently used alert classes"""
+        cause, confidence, evidence, _ = self._parse_analysis(analysis_text)
+        history = self._synthesis_history.get(alert_class)
+        if history is None:
+            history = self._synthesis_history[alert_class] = deque(maxlen=SYNTHESIS_HISTORY_LENGTH)
+        history.append({"cause": cause, "confidence": confidence, "evidence": evidence})
+        self._synthesis_history.move_to_end(alert_class)
+        while len(self._synthesis_history) > SYNTHESIS_HISTORY_CLASSES:
+            self._synthesis_history.popitem(last=False)
+
+    def _agent_analyses(self, data):
+        """Each agent's analysis text keyed by template input, with fallbacks for missing ones"""
+        missing_agents = frozenset(data.get("missing_agents", ()))
+        analyses = {}
+        for key, input_name, agent, missing_text in self._AGENT_ANALYSES:
+            analysis = data.get(key, {}).get("analysis")
+            if analysis is not None:
+                analyses[input_name] = str(analysis)
+            else:
+                analyses[input_name] = missing_text if agent in missing_agents else "No analysis provided"
+        return analyses
+
+    def _data_inputs(self, data):
+        """Build the template inputs for the shared alert data block"""
+        alert_data = data.get("alert", {})
+        service, alert_name, severity = self._alert_class(data)
+
+        return {
+            "alert_id": data.get("alert_id", "unknown"),
+            "alert_name": alert_name,
+            "service": service,
+            "severity": severity,
+            "started_at": alert_data.get("startsAt", "Unknown"),
+            **self._agent_analyses(data)
+        }
+
+    def _build_data_description(self, data):
+        """Render the shared alert data block for tasks built per incident"""
+        return self._DATA_DESCRIPTION.format(**self._data_inputs(data))
+
+    def _analysis_inputs(self, data):
+        """Build the template inputs for the analysis crew"""
+        inputs = self._data_inputs(data)
+        inputs["historical_patterns"] = self._historical_patterns(self._alert_class(data))
+        return inputs
+
+    async def _kickoff(self, crew, inputs):
+        """Run a private copy of a cached crew on the crew executor
+
+        Crews keep per-run state on their agents and tasks, so concurrent alerts
+        each kick off their own copy rather than sharing the cached instance.
+        """
+        async with self._kickoff_slots:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._crew_executor, functools.partial(crew.copy().kickoff, inputs=inputs)
+            )
 
     def _create_root_cause_task(self, data):
         """Create a root cause analysis task for the crew (backward compatibility)"""
-        alert_id = data.get("alert_id", "unknown")
-        alert_data = data.get("alert", {})
-        metric_data = data.get("metrics", {})
-        log_data = data.get("logs", {})
-        tracing_data = data.get("tracing", {})
-        deployment_data = data.get("deployments", {})
+        data_description = self._build_data_description(data)
 
         # Check if we're working with partial data
-        partial_data = data.get("partial_data", False)
-        missing_agents = data.get("missing_agents", [])
-
-        # Prepare data description
-        data_description = f"""
-        ## Alert Information
-        - Alert ID: {alert_id}
-        - Alert Name: {alert_data.get('labels', {}).get('alertname', 'Unknown')}
-        - Service: {alert_data.get('labels', {}).get('service', 'Unknown')}
-        - Severity: {alert_data.get('labels', {}).get('severity', 'Unknown')}
-        - Timestamp: {alert_data.get('startsAt', 'Unknown')}
-
-        ## Metric Agent Analysis
-        {metric_data.get('analysis', 'No metric data available' if 'metric' in missing_agents else 'No analysis provided')}
-
-        ## Log Agent Analysis
-        {log_data.get('analysis', 'No log data available' if 'log' in missing_agents else 'No analysis provided')}
-
-        ## Tracing Agent Analysis
-        {tracing_data.get('analysis', 'No tracing data available' if 'tracing' in missing_agents else 'No analysis provided')}
-
-        ## Deployment Agent Analysis
-        {deployment_data.get('analysis', 'No deployment data available' if 'deployment' in missing_agents else 'No analysis provided')}
-        """
-
-        task_instruction = f"""
-        Based on the information provided by the specialized agents, determine the most likely root cause of this incident.
-
-        {'NOTE: This is partial data. Some agent responses are missing.' if partial_data else ''}
-
-        Return your analysis in the following format:
-        1. Identified Root Cause - A clear statement of what caused the incident
-        2. Confidence Level - How confident you are in this assessment (low, medium, high)
-        3. Supporting Evidence - Key data points that support your conclusion
-        4. Recommended Actions - Suggested steps to resolve the issue
-        5. Prevention - How to prevent similar incidents in the future
-        """
+        if data.get("partial_data", False):
+            data_description += self._PARTIAL_DATA_NOTE
 
         task = Task(
-            description=data_description + task_instruction,
+            description=self._ROOT_CAUSE_PROMPT + data_description,
             agent=self.root_cause_analyzer,
             expected_output="A comprehensive root cause analysis with recommended actions"
         )
@@ -355,28 +546,23 @@ class RootCauseAgent:
         """Analyze root cause using multi-agent crewAI"""
         logger.info(f"Analyzing root cause for alert ID: {data.get('alert_id', 'unknown')}")
 
-        # Create specialized root cause tasks
-        specialized_tasks = self._create_specialized_root_cause_tasks(data)
+        # Execute crew analysis on the crew executor so the event loop keeps serving NATS
+        return await self._kickoff(self._analysis_crew, self._analysis_inputs(data))
 
-        # Create crew with specialized analyzers
-        crew = Crew(
-            agents=[
-                self.infrastructure_analyzer,
-                self.application_analyzer,
-                self.database_analyzer,
-                self.network_analyzer,
-                self.root_cause_manager
-            ],
-            tasks=specialized_tasks,
-            verbose=True,
-            process=Process.hierarchical,
-            manager_agent=self.root_cause_manager
-        )
-
-        # Execute crew analysis
-        result = crew.kickoff()
+    async def _publish_async(self, subject, payload):
+        """Publish to JetStream and return the PubAck future without waiting on it
 
-        return result
+        Waits for a free slot when _ack_window publishes are already awaiting acks.
+        """
+        slots = self._publish_slots
+        await slots.acquire()
+        try:
+            future = await self.js.publish_async(subject, payload)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future
 
     async def _store_root_cause_data(self, data, analysis_result):
         """Store root cause analysis data for UI consumption"""
@@ -385,123 +571,111 @@ class RootCauseAgent:
             alert_id = data.get("alert_id", "unknown")
             service = alert_data.get("labels", {}).get("service", "unknown-service")
 
-            # Extract confidence and cause from analysis result
+            # Extract confidence, cause, evidence and recommendation from analysis result
             analysis_text = str(analysis_result)
-            confidence = self._extract_confidence(analysis_text)
-            cause = self._extract_cause(analysis_text)
+            cause, confidence, evidence, recommendation = self._parse_analysis(analysis_text)
 
             # Create root cause record for UI
             root_cause_record = {
-                "id": f"rc-{alert_id}-{int(datetime.now(datetime.timezone.utc).timestamp())}",
+                "id": f"rc-{alert_id}-{int(time.time())}",
                 "alertId": alert_id,
                 "service": service,
                 "cause": cause,
                 "confidence": confidence,
-                "timestamp": datetime.now(datetime.timezone.utc).isoformat(),
+                "timestamp": self._get_current_timestamp(),
                 "details": analysis_text,
                 "analysis": {
                     "cause": cause,
                     "confidence": confidence,
-                    "evidence": self._extract_evidence(analysis_text),
-                    "recommendation": self._extract_recommendation(analysis_text)
+                    "evidence": evidence,
+                    "recommendation": recommendation
                 }
             }
 
-            # Publish to ROOT_CAUSE stream for UI consumption
+            # Publish to ROOT_CAUSE stream for UI consumption. The UI record is best effort,
+            # so its PubAck is not waited on and a failed publish is only logged
             subject = f"rootcause.{service}"
-            await self.js.publish(subject, json.dumps(root_cause_record).encode())
-            logger.info(f"[RootCauseAgent] Stored root cause data for service {service}")
+            ack = await self._publish_async(subject, orjson.dumps(root_cause_record))
+            ack.add_done_callback(self._log_store_failure)
+            logger.info(f"[RootCauseAgent] Published root cause data for service {service}")
 
         except Exception as e:
             logger.error(f"[RootCauseAgent] Error storing root cause data: {str(e)}")
 
-    def _extract_confidence(self, analysis_text):
-        """Extract confidence level from analysis text"""
-        import re
-
-        # Look for confidence patterns
-        confidence_patterns = [
-            r'confidence[:\s]+([0-9]+(?:\.[0-9]+)?)',
-            r'([0-9]+(?:\.[0-9]+)?)\s*%?\s*confidence',
-            r'high confidence',
-            r'medium confidence',
-            r'low confidence'
-        ]
-
-        analysis_lower = analysis_text.lower()
-
-        for pattern in confidence_patterns:
-            match = re.search(pattern, analysis_lower)
-            if match:
-                if 'high' in match.group(0):
-                    return 0.9
-                elif 'medium' in match.group(0):
-                    return 0.7
-                elif 'low' in match.group(0):
-                    return 0.4
-                else:
-                    try:
-                        value = float(match.group(1))
-                        return value if value <= 1.0 else value / 100.0
-                    except (ValueError, IndexError):
-                        continue
-
-        return 0.6  # Default confidence
-
-    def _extract_cause(self, analysis_text):
-        """Extract the main cause from analysis text"""
-        # Simple extraction - look for key phrases
-        lines = analysis_text.split('\n')
-
-        for line in lines:
-            line_lower = line.lower().strip()
-            if any(keyword in line_lower for keyword in ['root cause:', 'identified root cause', 'cause:', 'primary cause']):
-                # Extract the cause after the keyword
-                cause = line.split(':', 1)[-1].strip()
-                if cause and len(cause) > 10:  # Ensure it's substantial
-                    return cause[:200]  # Limit length
-
-        # Fallback: use first substantial line
-        for line in lines:
-            if len(line.strip()) > 20:
-                return line.strip()[:200]
+    def _log_store_failure(self, ack):
+        """Log a UI record publish that JetStream did not acknowledge"""
+        if not ack.cancelled() and ack.exception() is not None:
+            logger.error(f"[RootCauseAgent] Error storing root cause data: {str(ack.exception())}")
 
-        return "Root cause analysis completed"
+    def _parse_confidence(self, analysis_text):
+        """Extract confidence level from analysis text
 
-    def _extract_evidence(self, analysis_text):
-        """Extract evidence from analysis text"""
+        Explicit numbers after "confidence" win over numbers before it, which win over
+        high/medium/low wording; within a kind the first occurrence counts.
+        """
+        best = None
+        for match in self._CONFIDENCE_RE.finditer(analysis_text):
+            kind = match.lastgroup
+            if kind == "level":
+                level = match.group("level").lower()
+                rank, value = self._CONFIDENCE_RANKS[level], self._CONFIDENCE_LEVELS[level]
+            else:
+                rank, value = self._CONFIDENCE_RANKS[kind], float(match.group(kind))
+                value = value if value <= 1.0 else value / 100.0
+
+            if best is None or rank < best[0]:
+                best = (rank, value)
+                if rank == 0:
+                    break
+
+        return best[1] if best else 0.6  # Default confidence
+
+    def _parse_analysis(self, analysis_text):
+        """Extract cause, confidence, evidence and recommendation from analysis text
+
+        Cause, evidence and recommendation are collected in a single pass over the lines.
+        """
+        cause = None
+        fallback_cause = None
         evidence = []
-        lines = analysis_text.split('\n')
-
-        for line in lines:
-            line_lower = line.lower().strip()
-            if any(keyword in line_lower for keyword in ['evidence:', 'supporting evidence', 'data shows', 'indicates']):
-                evidence.append(line.strip())
-
-        return evidence[:3]  # Limit to top 3 pieces of evidence
+        recommendation = None
 
-    def _extract_recommendation(self, analysis_text):
-        """Extract recommendation from analysis text"""
-        lines = analysis_text.split('\n')
+        for line in analysis_text.split('\n'):
+            stripped = line.strip()
+            if not stripped:
+                continue
 
-        for line in lines:
-            line_lower = line.lower().strip()
-            if any(keyword in line_lower for keyword in ['recommendation:', 'recommended action', 'suggest', 'should']):
-                recommendation = line.split(':', 1)[-1].strip()
-                if recommendation and len(recommendation) > 10:
-                    return recommendation[:300]
-
-        return "Review the analysis and take appropriate action"
-
-    def _get_current_timestamp(self):
-        """Get current timestamp in ISO format"""
-        return datetime.now(datetime.timezone.utc).isoformat()
+            if cause is None and self._CAUSE_RE.search(stripped):
+                # Extract the cause after the keyword
+                candidate = line.split(':', 1)[-1].strip()
+                if len(candidate) > 10:  # Ensure it's substantial
+                    cause = candidate[:200]  # Limit length
+
+            # Fallback: first substantial line
+            if fallback_cause is None and len(stripped) > 20:
+                fallback_cause = stripped[:200]
+
+            # Limit to top 3 pieces of evidence
+            if len(evidence) < 3 and self._EVIDENCE_RE.search(stripped):
+                evidence.append(stripped)
+
+            if recommendation is None and self._RECOMMENDATION_RE.search(stripped):
+                candidate = line.split(':', 1)[-1].strip()
+                if len(candidate) > 10:
+                    recommendation = candidate[:300]
+
+        return (
+            cause or fallback_cause or "Root cause analysis completed",
+            self._parse_confidence(analysis_text),
+            evidence,
+            recommendation or "Review the analysis and take appropriate action"
+        )
 
     async def alert_handler(self, msg):
         """Handle individual alert messages from orchestrator"""
         try:
             # Decode the alert data
-            alert = json.loads(msg.data.decode())
+            alert = orjson.loads(msg.data)
             alert_id = alert.get("alert_id", "unknown")
             logger.info(f"[RootCauseAgent] Received individual alert: {alert_id}")
 
@@ -520,12 +694,22 @@ class RootCauseAgent:
         """Handle comprehensive data from orchestrator (renamed from message_handler)"""
         try:
             # Decode the message data
-            data = json.loads(msg.data.decode())
+            data = orjson.loads(msg.data)
             alert_id = data.get("alert_id", "unknown")
             logger.info(f"[RootCauseAgent] Processing comprehensive data for alert ID: {alert_id}")
 
-            # Use crewAI to analyze root cause using the analyses from other agents
-            analysis_result = await self.analyze_root_cause(data)
+            # Incidents whose alert and agent analyses match a recent one reuse its result
+            # instead of running the crew again
+            fingerprint = self._analysis_fingerprint(data)
+            analysis_result = self._get_cached_analysis(fingerprint)
+
+            if analysis_result is not None:
+                logger.info(f"[RootCauseAgent] Reusing cached root cause analysis for alert ID: {alert_id}")
+            else:
+                # Use crewAI to analyze root cause using the analyses from other agents
+                analysis_result = str(await self.analyze_root_cause(data))
+                self._cache_analysis(fingerprint, analysis_result)
+                self._record_synthesis(self._alert_class(data), analysis_result)
 
             # Prepare result for orchestrator
             orchestrator_result = {
@@ -538,8 +722,11 @@ class RootCauseAgent:
             # Store root cause data for UI consumption
             await self._store_root_cause_data(data, analysis_result)
 
-            # Publish the result to orchestrator using JetStream
-            await self.js.publish("root_cause_result", json.dumps(orchestrator_result).encode())
+            # Publish the result to orchestrator using JetStream, pipelined with the UI record,
+            # and wait for its PubAck so the message is only acked once the result is stored;
+            # a missing PubAck raises and the message is nak'd
+            result_ack = await self._publish_async("root_cause_result", _encode_result(orchestrator_result))
+            await asyncio.wait_for(result_ack, timeout=PUBACK_TIMEOUT)
             logger.info(f"[RootCauseAgent] Published root cause analysis result for alert ID: {alert_id}")
 
             # Acknowledge the message
@@ -552,70 +739,167 @@ class RootCauseAgent:
 
 
 
+    async def _consume(self, psub, handler, batch):
+        """Fetch message batches from a pull consumer and handle each message in its own task"""
+        while True:
+            try:
+                # max_ack_pending caps how many unacked messages the server hands out
+                msgs = await psub.fetch(batch=batch, timeout=5)
+            except nats.errors.TimeoutError:
+                continue
+
+            for msg in msgs:
+                self._dispatch(handler, msg)
+
+    def _dispatch(self, handler, msg):
+        """Run a handler in its own task so a long crew run doesn't hold up the rest of its batch"""
+        task = asyncio.create_task(handler(msg))
+        # Keep a reference so the task is not garbage collected while running
+        self._handler_tasks.add(task)
+        task.add_done_callback(self._handler_tasks.discard)
+
+    async def _stop_consumers(self):
+        """Cancel the pull consumer loops started by listen()"""
+        for task in self._consumer_tasks:
+            task.cancel()
+        await asyncio.gather(*self._consumer_tasks, return_exceptions=True)
+        self._consumer_tasks = []
+
     async def listen(self):
-        """Listen for alerts and comprehensive data from the orchestrator"""
+        """Listen for alerts and comprehensive data from the orchestrator, reconnecting on failure"""
         logger.info("[RootCauseAgent] Starting to listen for alerts and comprehensive data")
 
-        try:
-            # Connect to NATS if not already connected
-            if not self.nats_client or not self.nats_client.is_connected:
-                await self.connect()
-
-            # Create a durable consumer for individual alerts
-            alert_consumer_config = ConsumerConfig(
-                durable_name="root_cause_alerts",
-                deliver_policy=DeliverPolicy.ALL,
-                ack_policy="explicit",
-                max_deliver=5,  # Retry up to 5 times
-                ack_wait=60,    # Wait 60 seconds for acknowledgment
-            )
+        backoff = 1
+        while not self._shutdown.is_set():
+            started = time.monotonic()
+            try:
+                await self._listen_once()
+            except Exception as e:
+                logger.error(f"[RootCauseAgent] Error in listen(): {str(e)}", exc_info=True)
+                await self._close_connection()
 
-            # Subscribe to individual alerts from orchestrator
-            await self.js.subscribe(
-                "root_cause_agent",
-                cb=self.alert_handler,
-                queue="root_cause_alert_processors",
-                stream="AGENT_TASKS",
-                config=alert_consumer_config
-            )
+                # Start backing off from scratch if the previous session ran for a while
+                if time.monotonic() - started > 60:
+                    backoff = 1
+                delay = min(backoff, 60)
+                backoff *= 2
 
-            logger.info("Subscribed to root_cause_agent subject for individual alerts")
+                logger.info(f"[RootCauseAgent] Will retry in {delay} seconds...")
+                try:
+                    # Wake early if shutdown is requested while backing off
+                    await asyncio.wait_for(self._shutdown.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
 
-            # Create a durable consumer for comprehensive data
-            comprehensive_consumer_config = ConsumerConfig(
-                durable_name="root_cause_comprehensive",
-                deliver_policy=DeliverPolicy.ALL,
-                ack_policy="explicit",
-                max_deliver=5,  # Retry up to 5 times
-                ack_wait=60,    # Wait 60 seconds for acknowledgment
-            )
+    async def _listen_once(self):
+        """Connect, consume until shutdown is requested, then shut down cleanly
 
-            # Subscribe to comprehensive data from orchestrator
-            await self.js.subscribe(
-                "root_cause_analysis",
-                cb=self.comprehensive_handler,
-                queue="root_cause_comprehensive_processors",
-                stream="ROOT_CAUSE",
-                config=comprehensive_consumer_config
-            )
+        Raises if setup fails or a consumer loop dies, so listen() can reconnect.
+        """
+        # Connect to NATS if not already connected
+        if not self.nats_client or not self.nats_client.is_connected:
+            await self.connect()
+
+        # Create a durable consumer for individual alerts. The "_pull" durables replace
+        # the push consumers of the same name without the suffix, which a pull
+        # subscription cannot bind to
+        alert_consumer_config = ConsumerConfig(
+            durable_name="root_cause_alerts_pull",
+            deliver_policy=DeliverPolicy.ALL,
+            ack_policy="explicit",
+            max_deliver=5,  # Retry up to 5 times
+            ack_wait=60,    # Wait 60 seconds for acknowledgment
+            max_ack_pending=64,  # Alerts are only acknowledged, so keep a deep batch in flight
+        )
 
-            logger.info("Subscribed to root_cause_analysis subject for comprehensive data")
+        # Apply config changes to the durable, migrating from the push consumer
+        await ensure_durable_consumer(
+            self.js, "root_cause_agent", alert_consumer_config,
+            stream="AGENT_TASKS", legacy_durable="root_cause_alerts"
+        )
 
-            # Keep the connection alive
-            while True:
-                await asyncio.sleep(3600)  # Sleep for an hour, or until interrupted
-                
-        except Exception as e:
-            logger.error(f"[RootCauseAgent] Error in listen(): {str(e)}", exc_info=True)
-            # Stop status publishing if there's an error
-            if self.status_publisher:
-                try:
-                    await self.status_publisher.stop_publishing()
-                    logger.info("[RootCauseAgent] Agent status publishing stopped")
-                except Exception as pub_e:
-                    logger.warning(f"[RootCauseAgent] Error stopping status publisher: {pub_e}")
-            # Wait and retry
-            logger.info("[RootCauseAgent] Will retry in 30 seconds...")
-            await asyncio.sleep(30)
-            # Try calling listen again after delay
-            return await self.listen()
\ No newline at end of file
+        # Pull individual alerts from orchestrator in batches
+        alert_sub = await self.js.pull_subscribe(
+            "root_cause_agent",
+            durable="root_cause_alerts_pull",
+            stream="AGENT_TASKS"
+        )
+        self._consumer_tasks.append(asyncio.create_task(self._consume(alert_sub, self.alert_handler, 32)))
+
+        logger.info("Subscribed to root_cause_agent subject for individual alerts")
+
+        # Create a durable consumer for comprehensive data
+        comprehensive_consumer_config = ConsumerConfig(
+            durable_name="root_cause_comprehensive_pull",
+            deliver_policy=DeliverPolicy.ALL,
+            ack_policy="explicit",
+            max_deliver=2,  # Retry once; a crew run is too costly to repeat more often
+            ack_wait=300,   # Crew runs take minutes, so allow 300 seconds for acknowledgment
+            max_ack_pending=self._concurrency_limit,  # Only deliver what can be analysed concurrently
+        )
+
+        await ensure_durable_consumer(
+            self.js, "root_cause_analysis", comprehensive_consumer_config,
+            stream="ROOT_CAUSE", legacy_durable="root_cause_comprehensive"
+        )
+
+        # Pull comprehensive data from orchestrator in batches
+        comprehensive_sub = await self.js.pull_subscribe(
+            "root_cause_analysis",
+            durable="root_cause_comprehensive_pull",
+            stream="ROOT_CAUSE"
+        )
+        self._consumer_tasks.append(asyncio.create_task(
+            self._consume(comprehensive_sub, self.comprehensive_handler, self._concurrency_limit)
+        ))
+
+        logger.info("Subscribed to root_cause_analysis subject for comprehensive data")
+
+        # Run until a shutdown signal arrives or a consumer loop fails
+        shutdown = asyncio.create_task(self._shutdown.wait())
+        done, _ = await asyncio.wait([shutdown, *self._consumer_tasks], return_when=asyncio.FIRST_COMPLETED)
+        if shutdown not in done:
+            shutdown.cancel()
+            for task in done:
+                task.result()  # Re-raise the consumer failure
+            raise RuntimeError("Root cause consumer loop stopped unexpectedly")
+
+        # Stop fetching, then let in-flight analyses finish so the LLM work already
+        # paid for is published and acked rather than redelivered
+        logger.info("[RootCauseAgent] Shutting down, waiting for in-flight analyses")
+        await self._stop_consumers()
+        await asyncio.gather(*self._handler_tasks, return_exceptions=True)
+
+        logger.info("[RootCauseAgent] Draining NATS connection")
+        await self._close_connection()
+
+    async def _close_connection(self):
+        """Stop consumers and status publishing and drain the NATS connection"""
+        await self._stop_consumers()
+
+        # Stop status publishing
+        if self.status_publisher:
+            try:
+                await self.status_publisher.stop_publishing()
+                logger.info("[RootCauseAgent] Agent status publishing stopped")
+            except Exception as pub_e:
+                logger.warning(f"[RootCauseAgent] Error stopping status publisher: {pub_e}")
+            self.status_publisher = None
+
+        if self.nats_client and not self.nats_client.is_closed:
+            try:
+                await self.nats_client.drain()
+            except Exception as e:
+                logger.warning(f"[RootCauseAgent] Error draining NATS connection: {e}")
+        self.nats_client = None
+        self.js = None
+        # PubAcks from the closed connection will never arrive
+        self._publish_slots = asyncio.Semaphore(self._ack_window)
+
+        # The crew executor and LLM connection pool outlive reconnects and are only shut
+        # down with the agent, once in-flight analyses have finished; queued kickoffs
+        # are dropped
+        if self._shutdown.is_set():
+            self._crew_executor.shutdown(wait=False, cancel_futures=True)
+            if self._http is not None:
+                self._http.close()
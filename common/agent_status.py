@@ -6,16 +6,112 @@ to the AGENTS stream for UI dashboard consumption.
 """
 
 import asyncio
-import json
 import logging
+import orjson
+import os
 import psutil
+import random
+import sys
 import time
-from datetime import datetime
-from typing import Optional, Dict, Any
+from collections import deque
+from typing import Optional, Dict, Any, Tuple
+from nats.js.errors import NotFoundError
 from common.stream_config import get_publish_subject
 
 logger = logging.getLogger(__name__)
 
+# With async_publish, settled PubAck futures are checked on every publish and the
+# rest are awaited together once this many are pending
+PENDING_ACK_LIMIT = 16
+# Seconds a PubAck may stay pending before the publish counts as failed
+ACK_TIMEOUT = 5
+# Upper bound in seconds for the retry delay after consecutive failed publishes
+MAX_PUBLISH_BACKOFF = 300
+# Once this many consecutive publishes carry the same status and metrics, the
+# publish interval is multiplied by IDLE_INTERVAL_FACTOR until something changes
+IDLE_PUBLISHES = 5
+IDLE_INTERVAL_FACTOR = 2
+# Memory and CPU readings within the same bucket count as unchanged for the idle
+# interval; the exact readings are still published every time
+MEMORY_BUCKET_MB = 50
+CPU_BUCKET_PERCENT = 5
+# Errors older than this many seconds no longer count towards the agent status
+ERROR_WINDOW = 300
+# Publishers in the same process reuse one memory/CPU sample for this many seconds
+METRICS_SAMPLE_TTL = 1
+
+# On Linux, process memory and CPU time are read straight from procfs; psutil
+# covers the other platforms
+_PROCFS = sys.platform == "linux" and os.path.exists("/proc/self/stat")
+if _PROCFS:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+    _CLK_TCK = os.sysconf("SC_CLK_TCK")
+    
+# procfs files stay open for the life of the process and are re-read from the start
+_proc_files = {}
+
+
+def _read_proc_self(name: str) -> bytes:
+    """Read a /proc/self file through a cached unbuffered handle."""
+    f = _proc_files.get(name)
+    if f is None:
+        f = _proc_files[name] = open(f"/proc/self/{name}", "rb", buffering=0)
+    f.seek(0)
+    return f.read()
+
+
+def _proc_rss_bytes() -> int:
+    """Resident set size of this process from /proc/self/statm."""
+    return int(_read_proc_self("statm").split()[1]) * _PAGE_SIZE
+
+
+def _proc_cpu_seconds() -> float:
+    """User plus system CPU time of this process from /proc/self/stat."""
+    # The command name may contain spaces, so fields are counted from its closing paren;
+    # utime and stime are fields 14 and 15 of the file
+    fields = _read_proc_self("stat").rpartition(b")")[2].split()
+    return (int(fields[11]) + int(fields[12])) / _CLK_TCK
+
+
+# CPU usage is reported since the previous sample without blocking, so the first
+# sample, taken here, only primes it
+if _PROCFS:
+    _cpu_sample = (time.monotonic(), _proc_cpu_seconds())
+else:
+    _process = psutil.Process()
+    _process.cpu_percent(None)
+    
+# (monotonic sample time, memory MB, CPU percent) of the last process sample
+_metrics_snapshot = None
+
+
+def _process_metrics() -> Tuple[float, float]:
+    """
+    Memory in MB and CPU percentage of this process, shared by every publisher.
+    
+    A sample younger than METRICS_SAMPLE_TTL seconds is returned as is, so
+    publishers running in the same process do not each sample the process.
+    """
+    global _cpu_sample, _metrics_snapshot
+    now = time.monotonic()
+    if _metrics_snapshot is not None and now - _metrics_snapshot[0] < METRICS_SAMPLE_TTL:
+        return _metrics_snapshot[1:]
+        
+    if _PROCFS:
+        memory_mb = _proc_rss_bytes() / 1024 / 1024  # Convert to MB
+        cpu_seconds = _proc_cpu_seconds()
+        last_now, last_cpu_seconds = _cpu_sample
+        _cpu_sample = (now, cpu_seconds)
+        elapsed = now - last_now
+        # Matches psutil's cpu_percent(None)
+        cpu_percent = (cpu_seconds - last_cpu_seconds) / elapsed * 100 if elapsed > 0 else 0.0
+    else:
+        memory_mb = _process.memory_info().rss / 1024 / 1024
+        cpu_percent = _process.cpu_percent(None)
+        
+    _metrics_snapshot = (now, memory_mb, cpu_percent)
+    return memory_mb, cpu_percent
+
 
 class AgentStatusPublisher:
     """
@@ -28,69 +124,118 @@ class AgentStatusPublisher:
     - Graceful error handling
     """
     
-    def __init__(self, agent_id: str, agent_name: str, js, publish_interval: int = 30):
+    def __init__(self, agent_id: str, agent_name: str, js, publish_interval: int = 30,
+                 async_publish: bool = True):
         """
         Initialize the agent status publisher.
         
         Args:
             agent_id: Unique identifier for the agent (e.g., 'metric-agent')
             agent_name: Human-readable name (e.g., 'Metric Agent')
-            js: NATS JetStream instance
+            js: JetStream context of the agent's long-lived NATS connection. The
+                publisher never connects on its own; agents stop it before closing
+                that connection and start a new one after reconnecting
             publish_interval: How often to publish status in seconds (default: 30)
+            async_publish: Publish without waiting on each JetStream ack, checking
+                the acks on later publishes instead (default: True)
         """
         self.agent_id = agent_id
         self.agent_name = agent_name
         self.js = js
+        # Core connection behind the JetStream context, used when JetStream rejects a publish
+        self._nc = getattr(js, '_nc', None)
         self.publish_interval = publish_interval
+        self.async_publish = async_publish
+        # Publish to NATS using centralized subject pattern
+        self._subject = f"{get_publish_subject('agent_status')}.{agent_id}"
+        # JetStream until start_publishing checks that a stream captures the subject
+        self._publish_fn = self._publish_jetstream
         self.start_time = time.time()
         self.last_error = None
-        self.error_count = 0
+        # Monotonic times of recent errors; the thresholds in determine_status stay well below maxlen
+        self._error_ts = deque(maxlen=64)
         self.is_running = False
         self.status_task = None
+        # Set by stop_publishing to cut the wait between publishes short
+        self._stop_event = asyncio.Event()
+        
+        # The identity fields never change, so they are encoded once. The status,
+        # error count and metadata are re-encoded only when they change
+        self._status_prefix = orjson.dumps({
+            "id": agent_id,
+            "name": agent_name,
+            "version": "v1.0.0"  # Could be made configurable
+        })[:-1] + b","
+        self._status_key = None
+        self._suffix_key = None
+        self._status_suffix = b""
+        self._unchanged_publishes = 0
+        self._consecutive_failures = 0
+        # Publishes found unacknowledged since the last publish delay was computed
+        self._failed_acks = 0
+        
+        # (monotonic deadline, PubAck future) of publishes not yet acknowledged
+        self._pending_acks = deque()
+        
+        # Date and time part of the last timestamp, reformatted once per second
+        self._ts_last_sec = None
+        self._ts_prefix = ""
         
     async def start_publishing(self):
         """Start the periodic status publishing task."""
         if self.is_running:
             logger.warning(f"Status publishing already running for {self.agent_id}")
             return
+        if self._nc is not None and self._nc.is_closed:
+            raise RuntimeError(f"Cannot publish status for {self.agent_id} over a closed NATS connection")
             
+        # Decided once here rather than falling back on every failed publish
+        self._publish_fn = await self._select_publish_fn()
         self.is_running = True
+        self._stop_event.clear()
         self.status_task = asyncio.create_task(self._status_publishing_loop())
         logger.info(f"Started status publishing for {self.agent_id} (interval: {self.publish_interval}s)")
         
     async def stop_publishing(self):
         """Stop the periodic status publishing task."""
         self.is_running = False
+        self._stop_event.set()
         if self.status_task:
-            self.status_task.cancel()
+            # The loop wakes up and returns on its own unless a publish is stuck
+            done, _ = await asyncio.wait({self.status_task}, timeout=ACK_TIMEOUT)
+            if not done:
+                self.status_task.cancel()
             try:
                 await self.status_task
             except asyncio.CancelledError:
                 pass
+        await self._flush_acks()
         logger.info(f"Stopped status publishing for {self.agent_id}")
         
     def record_error(self, error: Exception):
         """Record an error for status determination."""
         self.last_error = str(error)
-        self.error_count += 1
-        logger.debug(f"Recorded error for {self.agent_id}: {error}")
+        self._error_ts.append(time.monotonic())
+        logger.debug("Recorded error for %s: %s", self.agent_id, error)
         
     def reset_errors(self):
         """Reset error tracking (call when agent recovers)."""
         self.last_error = None
-        self.error_count = 0
+        self._error_ts.clear()
+        
+    @property
+    def error_count(self) -> int:
+        """Number of errors recorded in the last ERROR_WINDOW seconds."""
+        cutoff = time.monotonic() - ERROR_WINDOW
+        while self._error_ts and self._error_ts[0] < cutoff:
+            self._error_ts.popleft()
+        return len(self._error_ts)
         
     def get_system_metrics(self) -> Dict[str, Any]:
         """Get current system metrics for this process."""
         try:
-            process = psutil.Process()
-            
-            # Get memory info
-            memory_info = process.memory_info()
-            memory_mb = memory_info.rss / 1024 / 1024  # Convert to MB
-            
-            # Get CPU percentage (over a short interval)
-            cpu_percent = process.cpu_percent(interval=0.1)
+            # Get memory and CPU percentage from the shared process sample
+            memory_mb, cpu_percent = _process_metrics()
             
             # Get uptime
             uptime_seconds = int(time.time() - self.start_time)
@@ -110,10 +255,13 @@ class AgentStatusPublisher:
                 "error_count": self.error_count
             }
             
-    def determine_status(self) -> str:
+    def determine_status(self, metrics: Optional[Dict[str, Any]] = None) -> str:
         """
         Determine agent status based on current conditions.
         
+        Args:
+            metrics: System metrics already collected by the caller, sampled here if omitted
+            
         Returns:
             'active': Agent is healthy and functioning normally
             'degraded': Agent has some issues but is still functional
@@ -121,13 +269,15 @@ class AgentStatusPublisher:
         """
         try:
             # Check recent error rate
-            if self.error_count > 10:  # More than 10 errors
+            error_count = self.error_count
+            if error_count > 10:  # More than 10 errors
                 return 'inactive'
-            elif self.error_count > 3:  # 3-10 errors
+            elif error_count > 3:  # 3-10 errors
                 return 'degraded'
                 
             # Check system resources
-            metrics = self.get_system_metrics()
+            if metrics is None:
+                metrics = self.get_system_metrics()
             
             # Check memory usage (consider degraded if > 1GB)
             if metrics.get("memory_usage_mb", 0) > 1024:
@@ -152,35 +302,10 @@ class AgentStatusPublisher:
             True if successful, False otherwise
         """
         try:
-            # Collect status data
-            status_data = {
-                "id": self.agent_id,
-                "name": self.agent_name,
-                "status": self.determine_status(),
-                "timestamp": datetime.now().isoformat(),
-                "version": "v1.0.0",  # Could be made configurable
-                **self.get_system_metrics(),
-                "metadata": {
-                    "last_error": self.last_error,
-                    "publish_interval": self.publish_interval
-                }
-            }
-            
-            # Publish to NATS using centralized subject pattern
-            subject = f"{get_publish_subject('agent_status')}.{self.agent_id}"
+            metrics = self.get_system_metrics()
+            status = self.determine_status(metrics)
             
-            try:
-                # Try JetStream first
-                await self.js.publish(subject, json.dumps(status_data).encode())
-                logger.debug(f"Published status for {self.agent_id} via JetStream")
-            except Exception as js_error:
-                # Fallback to regular NATS if JetStream fails
-                if hasattr(self.js, '_nc') and self.js._nc:
-                    await self.js._nc.publish(subject, json.dumps(status_data).encode())
-                    logger.debug(f"Published status for {self.agent_id} via regular NATS")
-                else:
-                    raise js_error
-                    
+            await self._publish_payload(self._get_status_json(status, metrics))
             return True
             
         except Exception as e:
@@ -188,18 +313,186 @@ class AgentStatusPublisher:
             self.record_error(e)
             return False
             
+    async def publish_event(self, status: str, details: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Publish a one-off status event, such as a task starting or completing.
+        
+        Args:
+            status: Event status (e.g., 'processing', 'completed', 'error')
+            details: Additional event details for the dashboard
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            details = details or {}
+            await self._publish({
+                "agent_id": self.agent_id,
+                "agent_name": self.agent_name,
+                "status": status,
+                "timestamp": self._get_timestamp(),
+                "message": details.get("message", ""),
+                "details": details
+            })
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to publish {status} event for {self.agent_id}: {e}")
+            return False
+            
+    def _get_timestamp(self) -> str:
+        """Get the current UTC time in ISO format."""
+        seconds, remainder = divmod(time.time_ns(), 1_000_000_000)
+        if seconds != self._ts_last_sec:
+            self._ts_last_sec = seconds
+            self._ts_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        return f"{self._ts_prefix}.{remainder // 1000:06d}+00:00"
+        
+    def _get_status_json(self, status: str, metrics: Dict[str, Any]) -> bytes:
+        """
+        Encode a status payload, reusing the cached encoding of the fields that
+        rarely change between publishes.
+        
+        Args:
+            status: Current agent status from determine_status
+            metrics: Current system metrics from get_system_metrics
+            
+        Returns:
+            The JSON-encoded status payload
+        """
+        suffix_key = (status, metrics["error_count"], self.last_error)
+        # Exact readings change on nearly every sample, so they are bucketed to
+        # decide whether anything changed
+        key = (
+            suffix_key,
+            int(metrics["memory_usage_mb"] // MEMORY_BUCKET_MB),
+            int(metrics["cpu_usage_percent"] // CPU_BUCKET_PERCENT)
+        )
+        if key == self._status_key:
+            self._unchanged_publishes += 1
+        else:
+            self._unchanged_publishes = 0
+            self._status_key = key
+            
+        if suffix_key != self._suffix_key:
+            self._suffix_key = suffix_key
+            # Drops the opening brace so the fields splice onto the prefix
+            self._status_suffix = orjson.dumps({
+                "status": status,
+                "error_count": metrics["error_count"],
+                "metadata": {
+                    "last_error": self.last_error,
+                    "publish_interval": self.publish_interval
+                }
+            })[1:]
+            
+        return b'%s"timestamp":"%s","uptime_seconds":%d,"memory_usage_mb":%s,"cpu_usage_percent":%s,%s' % (
+            self._status_prefix,
+            self._get_timestamp().encode(),
+            metrics["uptime_seconds"],
+            orjson.dumps(metrics["memory_usage_mb"]),
+            orjson.dumps(metrics["cpu_usage_percent"]),
+            self._status_suffix
+        )
+        
+    async def _publish(self, data: Dict[str, Any]):
+        """Publish a status payload on this agent's status subject."""
+        await self._publish_payload(orjson.dumps(data))
+        
+    async def _publish_payload(self, payload: bytes):
+        """Publish an encoded payload on this agent's status subject."""
+        await self._publish_fn(self._subject, payload)
+        
+    async def _publish_jetstream(self, subject: str, payload: bytes):
+        """Publish a payload through JetStream."""
+        if self.async_publish:
+            self._collect_acks()
+            ack = await self.js.publish_async(subject, payload)
+            self._pending_acks.append((time.monotonic() + ACK_TIMEOUT, ack))
+            if len(self._pending_acks) >= PENDING_ACK_LIMIT:
+                await self._flush_acks()
+        else:
+            await self.js.publish(subject, payload)
+        logger.debug("Published status for %s via JetStream", self.agent_id)
+        
+    async def _publish_core(self, subject: str, payload: bytes):
+        """Publish a payload over regular NATS when no stream captures the subject."""
+        await self._nc.publish(subject, payload)
+        logger.debug("Published status for %s via regular NATS", self.agent_id)
+        
+    async def _select_publish_fn(self):
+        """Pick JetStream or regular NATS for this publisher's subject."""
+        if self._nc is None:
+            return self._publish_jetstream
+        try:
+            await self.js.find_stream_name_by_subject(self._subject)
+            return self._publish_jetstream
+        except NotFoundError:
+            logger.warning(
+                f"No JetStream stream found for {self._subject}, "
+                f"publishing status for {self.agent_id} via regular NATS"
+            )
+            return self._publish_core
+        except Exception as e:
+            # A failed lookup says nothing about the stream, so JetStream is kept;
+            # failed publishes back off and the lookup is repeated on the next start
+            logger.warning(f"Could not look up the JetStream stream for {self._subject}: {e!r}")
+            return self._publish_jetstream
+            
+    def _collect_acks(self, expire_all: bool = False) -> int:
+        """
+        Drop the settled JetStream acks and record any publish that failed.
+        
+        Acks still pending past their deadline, or all pending acks when
+        expire_all is set, are cancelled and count as failed.
+        
+        Returns:
+            The number of failed publishes found
+        """
+        now = time.monotonic()
+        checked = len(self._pending_acks)
+        errors = []
+        pending = deque()
+        for deadline, ack in self._pending_acks:
+            if not ack.done():
+                if not expire_all and now < deadline:
+                    pending.append((deadline, ack))
+                    continue
+                # Cancelling an unanswered ack frees its slot in the JetStream context
+                ack.cancel()
+                errors.append(asyncio.TimeoutError("JetStream ack timed out"))
+            elif ack.cancelled():
+                errors.append(asyncio.CancelledError("JetStream ack was cancelled"))
+            elif ack.exception():
+                errors.append(ack.exception())
+        self._pending_acks = pending
+        
+        if errors:
+            logger.warning(
+                f"{len(errors)} of {checked} status publishes for "
+                f"{self.agent_id} were not acknowledged"
+            )
+            self.record_error(errors[0])
+            self._failed_acks += len(errors)
+        return len(errors)
+        
+    async def _flush_acks(self):
+        """Wait up to ACK_TIMEOUT for the pending JetStream acks and record any publish that failed."""
+        if not self._pending_acks:
+            return
+        await asyncio.wait([ack for _, ack in self._pending_acks], timeout=ACK_TIMEOUT)
+        self._collect_acks(expire_all=True)
+            
     async def _status_publishing_loop(self):
         """Internal loop for periodic status publishing."""
         while self.is_running:
             try:
                 success = await self.publish_status()
-                if success:
-                    # Reset error count on successful publish
-                    if self.error_count > 0:
-                        logger.info(f"Status publishing recovered for {self.agent_id}")
-                        self.error_count = max(0, self.error_count - 1)  # Gradually reduce errors
-                        
-                await asyncio.sleep(self.publish_interval)
+                # Errors age out of the window on their own, so recovery needs no reset
+                if success and self._consecutive_failures > 0:
+                    logger.info(f"Status publishing recovered for {self.agent_id}")
+                    
+                await self._wait_next_publish(self._next_delay(success))
                 
             except asyncio.CancelledError:
                 logger.info(f"Status publishing cancelled for {self.agent_id}")
@@ -207,24 +500,52 @@ class AgentStatusPublisher:
             except Exception as e:
                 logger.error(f"Error in status publishing loop for {self.agent_id}: {e}")
                 self.record_error(e)
-                # Wait a bit before retrying
-                await asyncio.sleep(min(self.publish_interval, 10))
+                await self._wait_next_publish(self._next_delay(False))
+                
+    async def _wait_next_publish(self, delay: float):
+        """Sleep until the next publish is due or publishing is stopped."""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+            
+    def _next_delay(self, success: bool) -> float:
+        """
+        Seconds to wait before the next status publish.
+        
+        Failed publishes, including earlier publishes whose JetStream ack failed
+        or timed out, back off exponentially with jitter so that agents do not
+        retry in lockstep against a degraded broker. Successful publishes whose
+        status has not changed for a while are spaced further apart.
+        """
+        failed_acks, self._failed_acks = self._failed_acks, 0
+        if success and not failed_acks:
+            self._consecutive_failures = 0
+            if self._unchanged_publishes >= IDLE_PUBLISHES:
+                return self.publish_interval * IDLE_INTERVAL_FACTOR
+            return self.publish_interval
+            
+        self._consecutive_failures += 1
+        backoff = min(self.publish_interval * 2 ** self._consecutive_failures, MAX_PUBLISH_BACKOFF)
+        return backoff * random.uniform(0.8, 1.2)
 
 
 # Convenience function for easy integration
-async def start_agent_status_publishing(agent_id: str, agent_name: str, js, publish_interval: int = 30) -> AgentStatusPublisher:
+async def start_agent_status_publishing(agent_id: str, agent_name: str, js, publish_interval: int = 30,
+                                        async_publish: bool = True) -> AgentStatusPublisher:
     """
     Convenience function to start agent status publishing.
     
     Args:
         agent_id: Unique identifier for the agent
         agent_name: Human-readable name
-        js: NATS JetStream instance
+        js: JetStream context of the agent's long-lived NATS connection
         publish_interval: Publishing interval in seconds
+        async_publish: Check JetStream acks in batches instead of per publish
         
     Returns:
         AgentStatusPublisher instance
     """
-    publisher = AgentStatusPublisher(agent_id, agent_name, js, publish_interval)
+    publisher = AgentStatusPublisher(agent_id, agent_name, js, publish_interval, async_publish)
     await publisher.start_publishing()
     return publisher
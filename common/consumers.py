@@ -0,0 +1,74 @@
+"""
+JetStream Consumer Helpers
+
+nats-py binds to an existing durable consumer without applying a changed
+config, so agents create or update their durables here before subscribing.
+"""
+
+import logging
+from typing import Optional
+from nats.js.api import ConsumerConfig, DeliverPolicy
+from nats.js.errors import NotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+async def _consumer_info(js, stream: str, durable: str):
+    """Consumer info for a durable, or None if the stream has no such consumer."""
+    try:
+        return await js.consumer_info(stream, durable)
+    except NotFoundError:
+        return None
+
+
+async def ensure_durable_consumer(js, subject: str, config: ConsumerConfig, stream: Optional[str] = None,
+                                  legacy_durable: Optional[str] = None) -> str:
+    """
+    Create the durable consumer described by config, or update it to config if it exists.
+
+    The start position and delivery subject of an existing durable cannot be
+    changed and are kept. A new durable replacing legacy_durable starts after the
+    legacy consumer's ack floor, so the switch neither replays acknowledged
+    messages nor skips pending ones, and the legacy consumer is then deleted.
+
+    Args:
+        js: JetStream context
+        subject: Subject the consumer reads, used as its filter subject
+        config: Desired consumer config; durable_name is required
+        stream: Stream holding the subject, looked up from the subject if omitted
+        legacy_durable: Durable this consumer replaces, e.g. a push consumer
+            superseded by a pull consumer under a new name
+
+    Returns:
+        The name of the stream the consumer belongs to
+    """
+    stream = stream or await js.find_stream_name_by_subject(subject)
+    durable = config.durable_name
+    config = config.evolve(name=durable, filter_subject=config.filter_subject or subject)
+
+    legacy = None
+    current = await _consumer_info(js, stream, durable)
+    if current is not None:
+        config = config.evolve(
+            deliver_policy=current.config.deliver_policy,
+            opt_start_seq=current.config.opt_start_seq,
+            opt_start_time=current.config.opt_start_time,
+            deliver_subject=current.config.deliver_subject
+        )
+    elif legacy_durable:
+        legacy = await _consumer_info(js, stream, legacy_durable)
+        if legacy is not None:
+            config = config.evolve(
+                deliver_policy=DeliverPolicy.BY_START_SEQUENCE,
+                opt_start_seq=legacy.ack_floor.stream_seq + 1 if legacy.ack_floor else 1
+            )
+
+    await js.add_consumer(stream, config)
+
+    if legacy is not None:
+        await js.delete_consumer(stream, legacy_durable)
+        logger.info(
+            f"Replaced consumer {legacy_durable} on {stream} with {durable}, "
+            f"starting at stream sequence {config.opt_start_seq}"
+        )
+    return stream
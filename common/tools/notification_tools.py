@@ -59,8 +59,7 @@ class NotificationTools:
         if not self.webex_default_room_id:
             logger.warning("WEBEX_DEFAULT_ROOM_ID not provided. Webex Teams messages will require explicit room ID.")
     
-    @tool("Send a notification to Slack")
-    def send_slack_message(self, message: str, channel: Optional[str] = None) -> Dict[str, Any]:
+    def deliver_slack_message(self, message: str, channel: Optional[str] = None) -> Dict[str, Any]:
         """
         Send a message to Slack
         
@@ -90,6 +89,11 @@ class NotificationTools:
         except SlackApiError as e:
             logger.error(f"Error sending Slack message: {str(e)}")
             return {"status": "error", "error": str(e), "message": message}
+
+    @tool("Send a notification to Slack")
+    def send_slack_message(self, message: str, channel: Optional[str] = None) -> Dict[str, Any]:
+        """Send a message to Slack"""
+        return self.deliver_slack_message(message, channel=channel)
     
     def _create_slack_blocks(self, message: str) -> list:
         """Create Slack message blocks for rich formatting"""
@@ -103,8 +107,7 @@ class NotificationTools:
             }
         ]
 
-    @tool("Create an incident in PagerDuty")
-    def create_pagerduty_incident(self, title: str, description: str, severity: str = "critical") -> Dict[str, Any]:
+    def deliver_pagerduty_incident(self, title: str, description: str, severity: str = "critical") -> Dict[str, Any]:
         """
         Create a PagerDuty incident
         
@@ -160,8 +163,12 @@ class NotificationTools:
             logger.error(f"Error creating PagerDuty incident: {str(e)}")
             return {"status": "error", "error": str(e), "title": title, "description": description}
 
-    @tool("Send a notification to Webex Teams")
-    def send_webex_message(self, message: str, room_id: Optional[str] = None) -> Dict[str, Any]:
+    @tool("Create an incident in PagerDuty")
+    def create_pagerduty_incident(self, title: str, description: str, severity: str = "critical") -> Dict[str, Any]:
+        """Create a PagerDuty incident"""
+        return self.deliver_pagerduty_incident(title, description, severity=severity)
+
+    def deliver_webex_message(self, message: str, room_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Send a message to Webex Teams
         
@@ -200,11 +207,15 @@ class NotificationTools:
             logger.error(f"Error sending Webex Teams message: {str(e)}")
             return {"status": "error", "error": str(e), "message": message}
 
-    @tool("Send notifications to multiple channels at once")
-    def send_multi_channel_notification(self, message: str, title: str = None, 
-                                       send_slack: bool = True, slack_channel: str = None,
-                                       send_pagerduty: bool = False, severity: str = "warning",
-                                       send_webex: bool = False, webex_room_id: str = None) -> Dict[str, Any]:
+    @tool("Send a notification to Webex Teams")
+    def send_webex_message(self, message: str, room_id: Optional[str] = None) -> Dict[str, Any]:
+        """Send a message to Webex Teams"""
+        return self.deliver_webex_message(message, room_id=room_id)
+
+    def deliver_multi_channel_notification(self, message: str, title: str = None, 
+                                          send_slack: bool = True, slack_channel: str = None,
+                                          send_pagerduty: bool = False, severity: str = "warning",
+                                          send_webex: bool = False, webex_room_id: str = None) -> Dict[str, Any]:
         """
         Send notifications to multiple channels at once
         
@@ -229,17 +240,17 @@ class NotificationTools:
         
         # Send to Slack if requested
         if send_slack:
-            slack_result = self.send_slack_message(message, channel=slack_channel)
+            slack_result = self.deliver_slack_message(message, channel=slack_channel)
             results["slack"] = slack_result
         
         # Send to PagerDuty if requested
         if send_pagerduty:
-            pd_result = self.create_pagerduty_incident(title, message, severity=severity)
+            pd_result = self.deliver_pagerduty_incident(title, message, severity=severity)
             results["pagerduty"] = pd_result
         
         # Send to Webex Teams if requested
         if send_webex:
-            webex_result = self.send_webex_message(message, room_id=webex_room_id)
+            webex_result = self.deliver_webex_message(message, room_id=webex_room_id)
             results["webex"] = webex_result
         
         # Determine overall status
@@ -262,4 +273,16 @@ class NotificationTools:
             "error": error_message,
             "channels": list(results.keys()),
             "results": results
-        }
\ No newline at end of file
+        }
+
+    @tool("Send notifications to multiple channels at once")
+    def send_multi_channel_notification(self, message: str, title: str = None, 
+                                       send_slack: bool = True, slack_channel: str = None,
+                                       send_pagerduty: bool = False, severity: str = "warning",
+                                       send_webex: bool = False, webex_room_id: str = None) -> Dict[str, Any]:
+        """Send notifications to multiple channels at once"""
+        return self.deliver_multi_channel_notification(
+            message, title=title, send_slack=send_slack, slack_channel=slack_channel,
+            send_pagerduty=send_pagerduty, severity=severity,
+            send_webex=send_webex, webex_room_id=webex_room_id
+        )
@@ -5,6 +5,7 @@ import time
 import logging
 import threading
 import asyncio
+import msgspec
 import nats
 from nats.js.api import ConsumerConfig, DeliverPolicy
 from datetime import datetime, timedelta
@@ -21,6 +22,14 @@ logger = logging.getLogger("orchestrator")
 
 load_dotenv()
 
+
+def _decode_payload(data):
+    """Decode an agent payload; agents may publish msgpack or JSON frames"""
+    if data[:1] == b"{":
+        return json.loads(data.decode())
+    return msgspec.msgpack.decode(data)
+
+
 class OrchestratorAgent:
     def __init__(self, nats_server=None, openai_model=None, response_timeout=300):
         # Get configuration from environment variables or use defaults
@@ -472,7 +481,7 @@ class OrchestratorAgent:
         """Handle incoming agent response messages"""
         try:
             # Parse the response data
-            response = json.loads(msg.data.decode())
+            response = _decode_payload(msg.data)
             logger.info(f"Received agent response: {response.get('agent')} for alert {response.get('alert_id')}")
 
             # Process the response
@@ -481,7 +490,7 @@ class OrchestratorAgent:
             # Acknowledge the message
             await msg.ack()
 
-        except json.JSONDecodeError as e:
+        except (json.JSONDecodeError, msgspec.DecodeError) as e:
             logger.error(f"Error decoding agent response: {str(e)}")
             await msg.nak()
         except Exception as e:
@@ -492,7 +501,7 @@ class OrchestratorAgent:
         """Handle incoming root cause result messages"""
         try:
             # Parse the root cause result
-            result = json.loads(msg.data.decode())
+            result = _decode_payload(msg.data)
             logger.info(f"Received root cause analysis for alert {result.get('alert_id')}")
 
             # Send to runbook agent for runbook generation
@@ -520,7 +529,7 @@ class OrchestratorAgent:
             # Acknowledge the message
             await msg.ack()
 
-        except json.JSONDecodeError as e:
+        except (json.JSONDecodeError, msgspec.DecodeError) as e:
             logger.error(f"Error decoding root cause result: {str(e)}")
             await msg.nak()
         except Exception as e:
@@ -531,7 +540,7 @@ class OrchestratorAgent:
         """Handle requests for alert data"""
         try:
             # Parse the request
-            request = json.loads(msg.data.decode())
+            request = _decode_payload(msg.data)
             alert_id = request.get('alert_id')
             logger.info(f"Received alert data request for alert ID: {alert_id}")
 
@@ -560,7 +569,7 @@ class OrchestratorAgent:
             # Acknowledge the message
             await msg.ack()
 
-        except json.JSONDecodeError as e:
+        except (json.JSONDecodeError, msgspec.DecodeError) as e:
             logger.error(f"Error decoding alert data request: {str(e)}")
             await msg.nak()
         except Exception as e:
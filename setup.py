@@ -7,11 +7,14 @@ setup(
     install_requires=[
         # Core dependencies
         "openai>=1.13.3,<2.0.0",
+        "httpx>=0.27.0",
         "python-dotenv==1.0.0",
         "crewai==0.120.1",
         "requests>=2.31.0",
         "PyYAML>=6.0",
-        "nats-py==2.4.0",
+        "nats-py>=2.8.0",  # First release with JetStreamContext.publish_async
+        "msgspec>=0.18.0",
+        "orjson>=3.8.0",
         "urllib3>=1.26.0",
 
         # Knowledge tools dependencies
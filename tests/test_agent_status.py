@@ -0,0 +1,26 @@
+import orjson
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+from common.agent_status import AgentStatusPublisher
+
+def test_timestamp_is_utc():
+    """Status timestamps are ISO 8601 in UTC with an explicit offset"""
+    publisher = AgentStatusPublisher('test-agent', 'Test Agent', MagicMock())
+    timestamp = publisher._get_timestamp()
+    parsed = datetime.fromisoformat(timestamp)
+    assert parsed.utcoffset() == timezone.utc.utcoffset(None)
+    assert abs((datetime.now(timezone.utc) - parsed).total_seconds()) < 5
+
+def test_status_json_carries_exact_metrics():
+    """Readings within the same bucket count as unchanged but are still published exactly"""
+    publisher = AgentStatusPublisher('test-agent', 'Test Agent', MagicMock())
+    metrics = {'memory_usage_mb': 100.5, 'cpu_usage_percent': 1.0, 'uptime_seconds': 3, 'error_count': 0}
+
+    first = orjson.loads(publisher._get_status_json('active', metrics))
+    second = orjson.loads(publisher._get_status_json('active', {**metrics, 'memory_usage_mb': 101.25}))
+
+    assert first['id'] == 'test-agent'
+    assert first['status'] == 'active'
+    assert first['memory_usage_mb'] == 100.5
+    assert second['memory_usage_mb'] == 101.25
+    assert publisher._unchanged_publishes == 1
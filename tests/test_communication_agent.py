@@ -0,0 +1,167 @@
+import os
+import asyncio
+from datetime import datetime, timezone
+import msgspec
+import pytest
+from unittest.mock import MagicMock, patch
+from agents.communication_agent.agent import (
+    CommunicationAgent,
+    AlertEnvelope,
+    Labels,
+    OrchestratorResponse,
+    _decode,
+    _DEC_ALERT,
+    _JSON_DEC_ALERT,
+)
+
+@pytest.fixture
+def mock_clients():
+    """Mock the notification clients used by NotificationTools"""
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test-key'}), \
+         patch('common.tools.notification_tools.WebClient') as mock_slack_client, \
+         patch('common.tools.notification_tools.PagerDutyClient') as mock_pd_client, \
+         patch('common.tools.notification_tools.WebexTeamsAPI') as mock_webex_client:
+        mock_slack_client.return_value.chat_postMessage.return_value = {'ok': True}
+        yield {
+            'slack': mock_slack_client.return_value,
+            'pagerduty': mock_pd_client.return_value,
+            'webex': mock_webex_client.return_value
+        }
+
+@pytest.fixture
+def communication_agent(mock_clients):
+    agent = CommunicationAgent()
+    agent.js = MagicMock()
+    return agent
+
+@pytest.mark.asyncio
+async def test_policy_notification_fast_path(communication_agent, mock_clients):
+    """A routine alert covered by the policy is sent without the crew and its result published"""
+    published = []
+
+    async def publish_async(subject, payload):
+        published.append((subject, payload))
+        ack = asyncio.get_running_loop().create_future()
+        ack.set_result(MagicMock())
+        return ack
+
+    communication_agent.js.publish_async = publish_async
+
+    with patch.object(communication_agent, '_kickoff') as mock_kickoff:
+        result = await communication_agent._process_notification(AlertEnvelope(
+            alert_id='test-alert',
+            labels=Labels(alertname='HighLatency', service='checkout', severity='warning')
+        ))
+
+    mock_kickoff.assert_not_called()
+    assert result['status'] == 'success'
+    assert result['channels'] == ['slack']
+
+    mock_clients['slack'].chat_postMessage.assert_called_once()
+    assert '[WARNING] HighLatency on checkout' in mock_clients['slack'].chat_postMessage.call_args.kwargs['text']
+    mock_clients['pagerduty'].create_incident.assert_not_called()
+    mock_clients['webex'].messages.create.assert_not_called()
+
+    assert len(published) == 1
+    subject, payload = published[0]
+    assert subject == 'orchestrator_response'
+    response = msgspec.msgpack.decode(payload, type=OrchestratorResponse)
+    assert response.sub_function == 'notification'
+    assert response.alert_id == 'test-alert'
+
+@pytest.fixture
+def policy_file(tmp_path):
+    path = tmp_path / 'notification_policy.yaml'
+    path.write_text(
+        'rules:\n'
+        '  - severity: Critical\n'
+        '    service: payments\n'
+        '    channels: [slack, pagerduty]\n'
+        '  - severity: critical\n'
+        '    service: "*"\n'
+        '    channels: [slack]\n'
+        '  - service: checkout\n'
+        '    channels: [webex]\n'
+    )
+    with patch.dict(os.environ, {'NOTIFICATION_POLICY_FILE': str(path)}):
+        yield path
+
+def test_policy_exact_service_precedes_wildcard(policy_file, communication_agent):
+    """An exact service rule wins over the "*" rule for the same severity"""
+    assert communication_agent._match_notification_policy('critical', 'payments') == ('slack', 'pagerduty')
+    assert communication_agent._match_notification_policy('CRITICAL', 'checkout') == ('slack',)
+    assert communication_agent._match_notification_policy('warning', 'payments') is None
+
+def test_policy_skips_rules_without_severity(policy_file, communication_agent):
+    """Rules without a severity are dropped instead of matching every alert"""
+    assert set(communication_agent._notification_policy) == {('critical', 'payments'), ('critical', '*')}
+    assert communication_agent._policy_severities == frozenset({'critical'})
+    assert communication_agent._match_notification_policy('none', 'checkout') is None
+
+def test_policy_is_read_only(policy_file, communication_agent):
+    """The loaded policy cannot be mutated at runtime"""
+    with pytest.raises(TypeError):
+        communication_agent._notification_policy[('info', '*')] = ('slack',)
+
+def test_decode_msgpack_frame():
+    """msgpack frames are decoded with the typed msgpack decoder"""
+    data = msgspec.msgpack.encode({'alert_id': 'a1', 'labels': {'severity': 'critical'}})
+    alert = _decode(data, _DEC_ALERT, _JSON_DEC_ALERT)
+    assert alert.alert_id == 'a1'
+    assert alert.labels.severity == 'critical'
+    assert alert.labels.service == 'unknown'
+
+def test_decode_legacy_json_frame():
+    """Frames starting with "{" come from JSON producers and decode to the same type"""
+    alert = _decode(b'{"alert_id": "a2", "task_type": "postmortem", "root_cause": "disk"}', _DEC_ALERT, _JSON_DEC_ALERT)
+    assert alert.alert_id == 'a2'
+    assert alert.task_type == 'postmortem'
+    assert alert.root_cause == 'disk'
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_concurrent_runs(communication_agent):
+    """Duplicate deliveries of a running task share its result instead of redoing the work"""
+    calls = 0
+    release = asyncio.Event()
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return 'sent'
+
+    first = asyncio.create_task(communication_agent._single_flight(('a1', 'notification'), work))
+    second = asyncio.create_task(communication_agent._single_flight(('a1', 'notification'), work))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(first, second) == ['sent', 'sent']
+    assert calls == 1
+    # A late redelivery inside the TTL reuses the cached result
+    assert await communication_agent._single_flight(('a1', 'notification'), work) == 'sent'
+    assert calls == 1
+
+@pytest.mark.asyncio
+async def test_single_flight_does_not_cache_failures(communication_agent):
+    """A failed run is not cached, so the redelivered message retries the work"""
+    attempts = []
+
+    async def work():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError('publish failed')
+        return 'sent'
+
+    with pytest.raises(RuntimeError):
+        await communication_agent._single_flight(('a2', 'postmortem'), work)
+    assert ('a2', 'postmortem') not in communication_agent._inflight
+
+    assert await communication_agent._single_flight(('a2', 'postmortem'), work) == 'sent'
+    assert len(attempts) == 2
+
+def test_timestamp_is_utc(communication_agent):
+    """Result timestamps are ISO 8601 in UTC"""
+    timestamp = communication_agent._get_current_timestamp()
+    assert timestamp.endswith('Z')
+    parsed = datetime.fromisoformat(timestamp[:-1] + '+00:00')
+    assert abs((datetime.now(timezone.utc) - parsed).total_seconds()) < 5
@@ -0,0 +1,43 @@
+import pytest
+from unittest.mock import MagicMock
+from agents.infrastructure_agent.agent import InfrastructureAgent
+
+@pytest.fixture
+def infrastructure_agent():
+    # The classifiers only use class-level rules, so no connections or crews are needed
+    return InfrastructureAgent.__new__(InfrastructureAgent)
+
+@pytest.mark.parametrize("analysis, expected", [
+    ("The deployment FAILED after the image pull", "Deployment failure detected"),
+    ("Configuration mismatch between environments", "Configuration issue identified"),
+    ("A rollback to the previous release is advised", "Rollback required"),
+    ("Resource quota exhausted in the namespace", "Resource constraint detected"),
+    ("Pods are unhealthy", "Service health issue"),
+    ("ArgoCD sync error on the application", "ArgoCD sync failure"),
+])
+def test_determine_infrastructure_issue(infrastructure_agent, analysis, expected):
+    assert infrastructure_agent._determine_infrastructure_issue({}, analysis) == expected
+
+def test_determine_infrastructure_issue_uses_priority(infrastructure_agent):
+    """Rules are checked in priority order across all analysis sections"""
+    analysis = {"config": "configuration mismatch", "deploy": "deployment failed"}
+    assert infrastructure_agent._determine_infrastructure_issue({}, analysis) == "Deployment failure detected"
+
+def test_determine_infrastructure_issue_falls_back_to_alert_name(infrastructure_agent):
+    alert = {"labels": {"alertname": "ConfigDrift"}}
+    assert infrastructure_agent._determine_infrastructure_issue(alert, "nothing notable") == "Configuration alert"
+    assert infrastructure_agent._determine_infrastructure_issue({}, None) == "Infrastructure anomaly detected"
+
+def test_split_analysis(infrastructure_agent):
+    """The five task outputs map to the orchestrator's analysis sections"""
+    crew_output = MagicMock(tasks_output=["deploy", "config", "search", "adapt", "summary"])
+    assert infrastructure_agent._split_analysis(crew_output) == {
+        "deployment": "deploy",
+        "configuration": "config",
+        "runbooks": "search\n\nadapt",
+        "summary": "summary"
+    }
+
+def test_split_analysis_without_task_outputs(infrastructure_agent):
+    """Output that does not match the task layout is passed on whole"""
+    assert infrastructure_agent._split_analysis("raw output") == {"combined": "raw output"}
@@ -0,0 +1,34 @@
+import pytest
+from agents.observability_agent.agent import ObservabilityAgent
+
+@pytest.fixture
+def observability_agent():
+    # The classifier only uses class-level rules, so no connections or crews are needed
+    return ObservabilityAgent.__new__(ObservabilityAgent)
+
+@pytest.mark.parametrize("analysis, expected", [
+    ("Container killed: OOM", "Memory exhaustion detected"),
+    ("CPU is saturated on all replicas", "CPU saturation detected"),
+    ("Error rate doubled after the release", "Application error increase"),
+    ("p99 latency regressed", "Performance degradation"),
+    ("Upstream calls hit the timeout", "Request timeout issues"),
+    ("The database is the bottleneck", "Performance bottleneck identified"),
+    ("A downstream dependency is unavailable", "Service dependency failure"),
+])
+def test_determine_observability_issue(observability_agent, analysis, expected):
+    assert observability_agent._determine_observability_issue({}, analysis) == expected
+
+def test_determine_observability_issue_requires_qualifier(observability_agent):
+    """CPU alone is not saturation without a qualifying keyword"""
+    alert = {"labels": {"alertname": "CPUThrottling"}}
+    assert observability_agent._determine_observability_issue(alert, "cpu usage is normal") == "CPU alert"
+
+def test_determine_observability_issue_falls_back_to_alert_name(observability_agent):
+    alert = {"labels": {"alertname": "HighErrorBudgetBurn"}}
+    assert observability_agent._determine_observability_issue(alert, {"metrics": None}) == "Error rate alert"
+    assert observability_agent._determine_observability_issue({}, None) == "Observability anomaly detected"
+
+def test_analysis_length(observability_agent):
+    assert observability_agent._analysis_length({"a": "abc", "b": None, "c": "de"}) == 5
+    assert observability_agent._analysis_length("abcd") == 4
+    assert observability_agent._analysis_length(None) == 0